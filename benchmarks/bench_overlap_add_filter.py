@@ -0,0 +1,94 @@
+"""
+Benchmark overlap-add FIR filtering throughput.
+
+Compares the batched real-FFT implementation of
+``mne.filter._overlap_add_filter`` with the previous approach, which
+filtered one channel at a time with full complex FFTs of power-of-2 lengths.
+Throughput is reported in channel-seconds of data filtered per second of
+wall-clock time (higher is better).
+
+Usage::
+
+    python benchmarks/bench_overlap_add_filter.py
+"""
+# License: BSD (3-clause)
+
+from __future__ import print_function
+
+import time
+
+import numpy as np
+
+from mne.filter import _overlap_add_filter, _smart_pad
+from mne.fixes import get_firwin2
+
+
+def _legacy_overlap_add_filter(x, h):
+    """Zero-phase per-channel complex-FFT overlap-add (previous approach)"""
+    n_h = len(h)
+    n_edge = n_h - 1
+    n_x = x.shape[1] + 2 * n_edge
+    n_tot = 2 * n_x
+    N = 2 ** np.arange(np.ceil(np.log2(2 * n_h - 1)),
+                       np.ceil(np.log2(n_x)) + 1, dtype=int)
+    n_h_cost = 2 * n_h - 1
+    cost = (np.ceil(n_tot / (N - n_h_cost + 1).astype(float)) *
+            N * (np.log2(N) + 1)) + 4e-5 * N * n_tot
+    n_fft = N[np.argmin(cost)]
+    h_fft = np.fft.fft(h, n_fft)
+    h_fft = (h_fft * h_fft.conj()).real
+    n_seg = n_fft - 2 * (n_h - 1) - 1
+    n_segments = int(np.ceil(n_x / float(n_seg)))
+    pre_pad, post_pad = n_h - 1, n_fft - (n_h - 1)
+    for p in range(len(x)):
+        x_ext = _smart_pad(x[p].astype(np.float64), n_edge)
+        x_filtered = np.zeros_like(x_ext)
+        for seg_idx in range(n_segments):
+            start = seg_idx * n_seg
+            seg = x_ext[start:start + n_seg]
+            seg = np.concatenate([np.zeros(pre_pad), seg,
+                                  np.zeros(post_pad - len(seg))])
+            prod = np.real(np.fft.ifft(h_fft * np.fft.fft(seg)))
+            start_filt = max(0, start - pre_pad)
+            stop_filt = min(start - pre_pad + n_fft, n_x)
+            start_prod = max(0, pre_pad - start)
+            stop_prod = start_prod + stop_filt - start_filt
+            x_filtered[start_filt:stop_filt] += prod[start_prod:stop_prod]
+        x[p] = x_filtered[n_edge:-n_edge]
+    return x
+
+
+def _time(func, x, h, n_repeats=3):
+    """Get the best wall-clock time of a few runs"""
+    times = list()
+    for _ in range(n_repeats):
+        x_copy = x.copy()
+        t0 = time.time()
+        func(x_copy, h)
+        times.append(time.time() - t0)
+    return min(times)
+
+
+def run(sfreq=1000., duration=60., n_channels=(1, 32, 128),
+        filter_length=8192, dtypes=(np.float64, np.float32)):
+    """Run the benchmark and print the throughput table"""
+    rng = np.random.RandomState(0)
+    h = get_firwin2()(filter_length + 1, [0, 0.05, 0.1, 1.], [1, 1, 0, 0],
+                      window='hann')
+    n_times = int(sfreq * duration)
+    print('%8s %8s %14s %14s %8s' % ('n_chan', 'dtype',
+                                     'before (ch*s/s)', 'after (ch*s/s)',
+                                     'speedup'))
+    for n_chan in n_channels:
+        x = rng.randn(n_chan, n_times)
+        t_before = _time(_legacy_overlap_add_filter, x, h)
+        for dtype in dtypes:
+            t_after = _time(_overlap_add_filter, x.astype(dtype), h)
+            print('%8d %8s %14.0f %14.0f %7.1fx'
+                  % (n_chan, np.dtype(dtype).name,
+                     n_chan * duration / t_before,
+                     n_chan * duration / t_after, t_before / t_after))
+
+
+if __name__ == '__main__':
+    run()
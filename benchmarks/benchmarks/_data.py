@@ -0,0 +1,86 @@
+"""Synthetic data generators for the benchmarks
+
+All the data are generated on the fly from a fixed seed, so that the
+benchmarks can run offline without the testing dataset.
+"""
+# License: BSD (3-clause)
+
+import numpy as np
+
+import mne
+from mne.io.constants import FIFF
+
+
+def make_info(n_channels, sfreq=1000.):
+    """Make the info of EEG channels spread on the upper half of a sphere
+
+    The sphere has a radius of 9 cm and is centered on (0, 0, 4) cm in head
+    coordinates, like the one of :func:`make_sphere_forward`.
+    """
+    rng = np.random.RandomState(0)
+    theta = np.arccos(rng.uniform(0.1, 1., n_channels))
+    phi = rng.uniform(0., 2 * np.pi, n_channels)
+    pos = 0.09 * np.array([np.sin(theta) * np.cos(phi),
+                           np.sin(theta) * np.sin(phi),
+                           np.cos(theta)]).T + [0., 0., 0.04]
+    info = mne.create_info(['EEG%03d' % ii for ii in range(n_channels)],
+                           sfreq, 'eeg')
+    for ch, this_pos in zip(info['chs'], pos):
+        ch['loc'][:3] = this_pos
+        ch['eeg_loc'] = np.c_[this_pos, [0.] * 3]
+        ch['coord_frame'] = FIFF.FIFFV_COORD_HEAD
+    return info
+
+
+def make_data(n_channels, n_times, sfreq=1000., seed=0):
+    """Make EEG-like data: 10 Hz oscillations in pink-ish noise (in V)"""
+    rng = np.random.RandomState(seed)
+    times = np.arange(n_times) / sfreq
+    data = np.cumsum(rng.randn(n_channels, n_times), axis=1)
+    data -= data.mean(axis=1)[:, np.newaxis]
+    data += 10 * np.sin(2 * np.pi * 10. * times)
+    return data * 1e-6
+
+
+def make_raw(n_channels, duration, sfreq=1000.):
+    """Make a RawArray of the given duration (in seconds)"""
+    info = make_info(n_channels, sfreq)
+    return mne.io.RawArray(make_data(n_channels, int(duration * sfreq),
+                                     sfreq), info, verbose=False)
+
+
+def make_events(n_events, sfreq=1000., interval=1.):
+    """Make regularly spaced events of ID 1, starting after one interval"""
+    samples = (np.arange(1, n_events + 1) * interval * sfreq).astype(int)
+    return np.array([samples, np.zeros(n_events, int),
+                     np.ones(n_events, int)]).T
+
+
+def make_epochs(n_epochs, n_channels, n_times, sfreq=1000.):
+    """Make an EpochsArray"""
+    info = make_info(n_channels, sfreq)
+    data = make_data(n_epochs * n_channels, n_times, sfreq)
+    return mne.EpochsArray(data.reshape(n_epochs, n_channels, n_times), info,
+                           make_events(n_epochs, sfreq), tmin=-0.2,
+                           verbose=False)
+
+
+def make_sphere_forward(info, pos=15.):
+    """Make a volume forward solution in a 4-layer sphere model
+
+    Parameters
+    ----------
+    info : instance of Info
+        The measurement info, e.g., from :func:`make_info`.
+    pos : float
+        The grid spacing of the volume source space in mm.
+    """
+    sphere = mne.make_sphere_model(r0=(0., 0., 0.04), head_radius=0.09,
+                                   verbose=False)
+    src = mne.setup_volume_source_space(None, pos=pos,
+                                        sphere=(0., 0., 40., 70.),
+                                        verbose=False)
+    trans = {'from': FIFF.FIFFV_COORD_MRI, 'to': FIFF.FIFFV_COORD_HEAD,
+             'trans': np.eye(4)}
+    return mne.make_forward_solution(info, trans, src, sphere, meg=False,
+                                     eeg=True, verbose=False)
@@ -0,0 +1,23 @@
+"""Benchmarks of connectivity estimation"""
+# License: BSD (3-clause)
+
+from mne.connectivity import spectral_connectivity
+
+from ._data import make_epochs
+
+
+class SpectralConnectivity(object):
+    """All-to-all multitaper connectivity of 1 s epochs"""
+    params = ([8, 32], ['coh', 'pli'])
+    param_names = ['n_signals', 'method']
+
+    def setup(self, n_signals, method):
+        self.epochs = make_epochs(30, n_signals, 1000)
+
+    def time_spectral_connectivity(self, n_signals, method):
+        spectral_connectivity(self.epochs, method=method, sfreq=1000.,
+                              fmin=4., fmax=40., verbose=False)
+
+    def peakmem_spectral_connectivity(self, n_signals, method):
+        spectral_connectivity(self.epochs, method=method, sfreq=1000.,
+                              fmin=4., fmax=40., verbose=False)
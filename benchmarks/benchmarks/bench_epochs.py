@@ -0,0 +1,24 @@
+"""Benchmarks of epoching"""
+# License: BSD (3-clause)
+
+import mne
+
+from ._data import make_raw, make_events
+
+
+class GetData(object):
+    """Extract 700 ms epochs every second from data that is not preloaded"""
+    params = ([32, 128], [60, 300])
+    param_names = ['n_channels', 'n_epochs']
+
+    def setup(self, n_channels, n_epochs):
+        raw = make_raw(n_channels, n_epochs + 2.)
+        self.epochs = mne.Epochs(raw, make_events(n_epochs), 1, -0.2, 0.5,
+                                 preload=False, add_eeg_ref=False,
+                                 verbose=False)
+
+    def time_get_data(self, n_channels, n_epochs):
+        self.epochs._get_data(verbose=False)
+
+    def peakmem_get_data(self, n_channels, n_epochs):
+        self.epochs._get_data(verbose=False)
@@ -0,0 +1,35 @@
+"""Benchmarks of filtering"""
+# License: BSD (3-clause)
+
+import numpy as np
+
+from mne.filter import _overlap_add_filter
+from mne.fixes import get_firwin2
+
+from ._data import make_data
+
+
+class OverlapAddFilter(object):
+    """Zero-phase FIR filtering of 60 s of data sampled at 1 kHz"""
+    params = ([1, 32, 128], [1024, 8192])
+    param_names = ['n_channels', 'filter_length']
+
+    def setup(self, n_channels, filter_length):
+        self.x = make_data(n_channels, 60000)
+        self.h = get_firwin2()(filter_length + 1, [0, 0.05, 0.1, 1.],
+                               [1, 1, 0, 0], window='hann')
+
+    def time_overlap_add_filter(self, n_channels, filter_length):
+        _overlap_add_filter(self.x.copy(), self.h)
+
+    def peakmem_overlap_add_filter(self, n_channels, filter_length):
+        _overlap_add_filter(self.x.copy(), self.h)
+
+
+class OverlapAddFilterFloat32(OverlapAddFilter):
+    """Zero-phase FIR filtering of 60 s of single-precision data"""
+    params = ([32, 128], [8192])
+
+    def setup(self, n_channels, filter_length):
+        super(OverlapAddFilterFloat32, self).setup(n_channels, filter_length)
+        self.x = self.x.astype(np.float32)
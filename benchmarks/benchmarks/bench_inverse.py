@@ -0,0 +1,30 @@
+"""Benchmarks of source estimation"""
+# License: BSD (3-clause)
+
+import mne
+from mne.minimum_norm import make_inverse_operator, apply_inverse
+
+from ._data import make_info, make_data, make_sphere_forward
+
+
+class ApplyInverse(object):
+    """Apply a dSPM inverse operator of a sphere model to evoked data"""
+    params = ([32, 128], [1000, 10000])
+    param_names = ['n_channels', 'n_times']
+    timeout = 300
+
+    def setup(self, n_channels, n_times):
+        info = make_info(n_channels)
+        info['projs'] = [mne.io.make_eeg_average_ref_proj(info,
+                                                          verbose=False)]
+        fwd = make_sphere_forward(info)
+        cov = mne.make_ad_hoc_cov(info, verbose=False)
+        self.inv = make_inverse_operator(info, fwd, cov, verbose=False)
+        self.evoked = mne.EvokedArray(make_data(n_channels, n_times), info,
+                                      tmin=0., verbose=False)
+
+    def time_apply_inverse(self, n_channels, n_times):
+        apply_inverse(self.evoked, self.inv, method='dSPM', verbose=False)
+
+    def peakmem_apply_inverse(self, n_channels, n_times):
+        apply_inverse(self.evoked, self.inv, method='dSPM', verbose=False)
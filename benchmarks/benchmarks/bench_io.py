@@ -0,0 +1,32 @@
+"""Benchmarks of reading raw data"""
+# License: BSD (3-clause)
+
+import os.path as op
+import shutil
+import tempfile
+
+import mne
+
+from ._data import make_raw
+
+
+class ReadSegment(object):
+    """Read all the data of a FIF file that is not preloaded"""
+    params = ([32, 128], [60., 300.])
+    param_names = ['n_channels', 'duration']
+
+    def setup(self, n_channels, duration):
+        self.tempdir = tempfile.mkdtemp()
+        fname = op.join(self.tempdir, 'test_raw.fif')
+        make_raw(n_channels, duration).save(fname, verbose=False)
+        self.raw = mne.io.Raw(fname, preload=False, verbose=False)
+
+    def teardown(self, n_channels, duration):
+        self.raw.close()
+        shutil.rmtree(self.tempdir)
+
+    def time_read_segment(self, n_channels, duration):
+        self.raw._read_segment(verbose=False)
+
+    def peakmem_read_segment(self, n_channels, duration):
+        self.raw._read_segment(verbose=False)
@@ -0,0 +1,25 @@
+"""Benchmarks of cluster-level statistics"""
+# License: BSD (3-clause)
+
+import numpy as np
+
+from mne.stats import permutation_cluster_1samp_test
+
+
+class ClusterTest1Samp(object):
+    """One-sample cluster-level permutation test in time on 20 subjects"""
+    params = ([100, 1000], [256, 1024])
+    param_names = ['n_times', 'n_permutations']
+
+    def setup(self, n_times, n_permutations):
+        rng = np.random.RandomState(0)
+        self.X = rng.randn(20, n_times)
+        self.X[:, n_times // 4:n_times // 2] += 0.5
+
+    def time_cluster_test(self, n_times, n_permutations):
+        permutation_cluster_1samp_test(self.X, n_permutations=n_permutations,
+                                       seed=0, verbose=False)
+
+    def peakmem_cluster_test(self, n_times, n_permutations):
+        permutation_cluster_1samp_test(self.X, n_permutations=n_permutations,
+                                       seed=0, verbose=False)
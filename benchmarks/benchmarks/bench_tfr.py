@@ -0,0 +1,26 @@
+"""Benchmarks of time-frequency transforms"""
+# License: BSD (3-clause)
+
+import numpy as np
+
+from mne.time_frequency import tfr_morlet
+
+from ._data import make_epochs
+
+
+class TFRMorlet(object):
+    """Morlet power and ITC of 1 s epochs between 4 and 40 Hz"""
+    params = ([20, 80], [8, 32], [False, True])
+    param_names = ['n_epochs', 'n_channels', 'use_fft']
+
+    def setup(self, n_epochs, n_channels, use_fft):
+        self.epochs = make_epochs(n_epochs, n_channels, 1000)
+        self.freqs = np.arange(4., 41., 2.)
+
+    def time_tfr_morlet(self, n_epochs, n_channels, use_fft):
+        tfr_morlet(self.epochs, self.freqs, self.freqs / 2., use_fft=use_fft,
+                   decim=4)
+
+    def peakmem_tfr_morlet(self, n_epochs, n_channels, use_fft):
+        tfr_morlet(self.epochs, self.freqs, self.freqs / 2., use_fft=use_fft,
+                   decim=4)
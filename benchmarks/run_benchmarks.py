@@ -0,0 +1,174 @@
+"""
+Run the benchmark suite without asv.
+
+The benchmarks in ``benchmarks/benchmarks`` follow the conventions of
+`asv <https://asv.readthedocs.io>`_ (classes with ``params``, ``setup`` and
+``time_*`` or ``peakmem_*`` methods) and use synthetic data only, so they
+can be run offline, either with asv in the current environment::
+
+    cd benchmarks
+    asv run --python=same
+
+or with this script, which runs each operation for every combination of
+parameters in a new process and reports its best wall-clock time and its
+peak memory, i.e., the maximum memory allocated by the operation (NumPy
+arrays included) as traced by ``tracemalloc``. With Python 2, the increase
+of the peak resident set size of the process is reported instead (Unix
+only)::
+
+    python benchmarks/run_benchmarks.py [pattern] [--repeat 3] [--output f]
+
+Only the benchmarks whose name (e.g., ``bench_filter.OverlapAddFilter``)
+contains ``pattern`` are run. With ``--output``, the results are also
+saved to a JSON file along with the current git commit, so that the
+scaling behaviour can be compared across commits.
+"""
+# License: BSD (3-clause)
+
+from __future__ import print_function
+
+import glob
+import importlib
+import itertools
+import json
+import multiprocessing
+from optparse import OptionParser
+import os.path as op
+import subprocess
+import sys
+import time
+
+bench_dir = op.dirname(op.abspath(__file__))
+sys.path.insert(0, bench_dir)
+
+
+def _get_peak_rss():
+    """Get the peak resident set size of the process in bytes"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _get_benchmarks(pattern):
+    """Get the (module name, class name, operation name) to run"""
+    benchmarks = list()
+    for fname in sorted(glob.glob(op.join(bench_dir, 'benchmarks',
+                                          'bench_*.py'))):
+        mod_name = op.splitext(op.basename(fname))[0]
+        mod = importlib.import_module('benchmarks.' + mod_name)
+        for cls_name in sorted(dir(mod)):
+            cls = getattr(mod, cls_name)
+            if not isinstance(cls, type) or cls.__module__ != mod.__name__:
+                continue
+            name = '%s.%s' % (mod_name, cls_name)
+            if pattern not in name:
+                continue
+            # the time_ and peakmem_ methods of an operation run the same
+            # code, so each operation is run once for both
+            ops = sorted(set(key.split('_', 1)[1] for key in dir(cls)
+                             if key.startswith(('time_', 'peakmem_'))))
+            benchmarks.extend((mod_name, cls_name, op_name)
+                              for op_name in ops)
+    return benchmarks
+
+
+def _run_one(mod_name, cls_name, op_name, params, repeat):
+    """Run an operation, returning its best time and peak memory"""
+    mod = importlib.import_module('benchmarks.' + mod_name)
+    bench = getattr(mod, cls_name)()
+    func = getattr(bench, 'time_' + op_name,
+                   getattr(bench, 'peakmem_' + op_name, None))
+    if hasattr(bench, 'setup'):
+        bench.setup(*params)
+    try:
+        times = list()
+        for _ in range(repeat):
+            t0 = time.time()
+            func(*params)
+            times.append(time.time() - t0)
+        # tracing allocations slows down the operation, so it is run once
+        # more to measure its peak memory
+        try:
+            import tracemalloc
+        except ImportError:  # Python 2
+            peak = _get_peak_rss()
+            func(*params)
+            peak = None if peak is None else _get_peak_rss() - peak
+        else:
+            tracemalloc.start()
+            try:
+                func(*params)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    finally:
+        if hasattr(bench, 'teardown'):
+            bench.teardown(*params)
+    return min(times), peak
+
+
+def _get_params(mod_name, cls_name):
+    """Get the names and combinations of the parameters of a benchmark"""
+    cls = getattr(importlib.import_module('benchmarks.' + mod_name),
+                  cls_name)
+    params = getattr(cls, 'params', [])
+    if len(params) > 0 and not isinstance(params[0], (list, tuple)):
+        params = [params]
+    names = getattr(cls, 'param_names', ['param%d' % (ii + 1)
+                                         for ii in range(len(params))])
+    return names, list(itertools.product(*params))
+
+
+def _get_commit():
+    """Get the current git commit"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=bench_dir).decode().strip()
+    except Exception:
+        return None
+
+
+def run(pattern='', repeat=3, output=None):
+    """Run the benchmarks and print the results"""
+    results = list()
+    print('%-60s %12s %12s' % ('benchmark', 'time (s)', 'peak (MB)'))
+    for mod_name, cls_name, op_name in _get_benchmarks(pattern):
+        names, all_params = _get_params(mod_name, cls_name)
+        for params in all_params:
+            label = '%s.%s.%s(%s)' % (mod_name, cls_name, op_name, ', '.join(
+                '%s=%s' % (name, param)
+                for name, param in zip(names, params)))
+            # each operation runs in a new process, so that the peak memory
+            # of previous operations does not hide its own
+            pool = multiprocessing.Pool(1)
+            try:
+                duration, peak = pool.apply(_run_one, (
+                    mod_name, cls_name, op_name, params, repeat))
+            except Exception as exp:
+                print('%-60s failed: %s' % (label, exp))
+                continue
+            finally:
+                pool.terminate()
+            print('%-60s %12.3f %12s' % (label, duration, '-' if peak is None
+                                         else '%0.1f' % (peak / 1e6)))
+            results.append(dict(benchmark='%s.%s.%s' % (mod_name, cls_name,
+                                                        op_name),
+                                params=dict(zip(names, params)),
+                                time=duration, peakmem=peak))
+    if output is not None:
+        with open(output, 'w') as fid:
+            json.dump(dict(commit=_get_commit(), results=results), fid,
+                      indent=1)
+
+
+if __name__ == '__main__':
+    parser = OptionParser(usage='%prog [pattern] [options]')
+    parser.add_option('-r', '--repeat', dest='repeat', type='int', default=3,
+                      help='Number of runs of each operation (best is kept)')
+    parser.add_option('-o', '--output', dest='output', default=None,
+                      help='JSON file to save the results to')
+    options, args = parser.parse_args()
+    run(args[0] if len(args) > 0 else '', options.repeat, options.output)
@@ -22,84 +22,85 @@ __version__ = '0.10.dev0'
 # have to import verbose first since it's needed by many things
 from .utils import (set_log_level, set_log_file, verbose, set_config,
                     get_config, get_config_path, set_cache_dir,
-                    set_memmap_min_size)
-from .io.pick import (pick_types, pick_channels,
-                      pick_channels_regexp, pick_channels_forward,
-                      pick_types_forward, pick_channels_cov,
-                      pick_channels_evoked, pick_info)
-from .io.base import concatenate_raws
-from .io.chpi import get_chpi_positions
-from .io.meas_info import create_info
-from .io.kit import read_epochs_kit
-from .bem import (make_sphere_model, make_bem_model, make_bem_solution,
-                  read_bem_surfaces, write_bem_surface, write_bem_surfaces,
-                  read_bem_solution, write_bem_solution)
-from .cov import (read_cov, write_cov, Covariance,
-                  compute_covariance, compute_raw_data_covariance,
-                  whiten_evoked, make_ad_hoc_cov)
-from .event import (read_events, write_events, find_events, merge_events,
-                    pick_events, make_fixed_length_events, concatenate_events,
-                    find_stim_steps)
-from .forward import (read_forward_solution, apply_forward, apply_forward_raw,
-                      do_forward_solution, average_forward_solutions,
-                      write_forward_solution, make_forward_solution,
-                      convert_forward_solution, make_field_map)
-from .source_estimate import (read_source_estimate, MixedSourceEstimate,
-                              SourceEstimate, VolSourceEstimate, morph_data,
-                              morph_data_precomputed, compute_morph_matrix,
-                              grade_to_tris, grade_to_vertices,
-                              spatial_src_connectivity,
-                              spatial_tris_connectivity,
-                              spatial_dist_connectivity,
-                              spatio_temporal_src_connectivity,
-                              spatio_temporal_tris_connectivity,
-                              spatio_temporal_dist_connectivity,
-                              save_stc_as_volume, extract_label_time_course)
-from .surface import (read_surface, write_surface, decimate_surface,
-                      read_morph_map, get_head_surf, get_meg_helmet_surf)
-from .source_space import (read_source_spaces, vertex_to_mni,
-                           write_source_spaces, setup_source_space,
-                           setup_volume_source_space, SourceSpaces,
-                           add_source_space_distances,
-                           get_volume_labels_from_aseg)
-from .epochs import Epochs, EpochsArray, read_epochs
-from .evoked import (Evoked, EvokedArray, read_evokeds, write_evokeds,
-                     grand_average, combine_evoked)
-from .label import (read_label, label_sign_flip,
-                    write_label, stc_to_label, grow_labels, Label, split_label,
-                    BiHemiLabel, read_labels_from_annot, write_labels_to_annot)
-from .misc import parse_config, read_reject_parameters
-from .coreg import (create_default_subject, scale_bem, scale_mri, scale_labels,
-                    scale_source_space)
-from .transforms import (transform_coordinates, read_trans, write_trans,
-                         transform_surface_to)
-from .proj import (read_proj, write_proj, compute_proj_epochs,
-                   compute_proj_evoked, compute_proj_raw, sensitivity_map)
-from .selection import read_selection
-from .dipole import read_dipole, Dipole, fit_dipole
-from . import channels
-from .channels import equalize_channels, rename_channels, find_layout
+                    set_memmap_min_size, set_disk_cache_dir, set_profile,
+                    _lazy_import)
 
-from . import beamformer
-from . import commands
-from . import connectivity
-from . import coreg
-from . import cuda
-from . import datasets
-from . import epochs
-from . import externals
-from . import io
-from . import filter
-from . import gui
-from . import minimum_norm
-from . import preprocessing
-from . import simulation
-from . import stats
-from . import time_frequency
-from . import viz
-from . import decoding
-from . import realtime
+# Functions and classes of the public API, by the submodule they are defined
+# in. With Python >= 3.7, they (and the submodules) are imported when first
+# accessed (see __getattr__) so that "import mne" is fast, otherwise they are
+# imported here.
+_lazy_attrs = [
+    ('io.pick', ['pick_types', 'pick_channels', 'pick_channels_regexp',
+                 'pick_channels_forward', 'pick_types_forward',
+                 'pick_channels_cov', 'pick_channels_evoked', 'pick_info']),
+    ('io.base', ['concatenate_raws']),
+    ('io.chpi', ['get_chpi_positions']),
+    ('io.meas_info', ['create_info']),
+    ('io.kit', ['read_epochs_kit']),
+    ('bem', ['make_sphere_model', 'make_bem_model', 'make_bem_solution',
+             'read_bem_surfaces', 'write_bem_surface', 'write_bem_surfaces',
+             'read_bem_solution', 'write_bem_solution']),
+    ('cov', ['read_cov', 'write_cov', 'Covariance', 'compute_covariance',
+             'compute_raw_data_covariance', 'whiten_evoked',
+             'make_ad_hoc_cov']),
+    ('event', ['read_events', 'write_events', 'find_events', 'merge_events',
+               'pick_events', 'make_fixed_length_events',
+               'concatenate_events', 'find_stim_steps']),
+    ('forward', ['read_forward_solution', 'apply_forward',
+                 'apply_forward_raw', 'do_forward_solution',
+                 'average_forward_solutions', 'write_forward_solution',
+                 'make_forward_solution', 'convert_forward_solution',
+                 'make_field_map']),
+    ('source_estimate', ['read_source_estimate', 'MixedSourceEstimate',
+                         'SourceEstimate', 'VolSourceEstimate', 'morph_data',
+                         'morph_data_precomputed', 'compute_morph_matrix',
+                         'grade_to_tris', 'grade_to_vertices',
+                         'spatial_src_connectivity',
+                         'spatial_tris_connectivity',
+                         'spatial_dist_connectivity',
+                         'spatio_temporal_src_connectivity',
+                         'spatio_temporal_tris_connectivity',
+                         'spatio_temporal_dist_connectivity',
+                         'save_stc_as_volume', 'extract_label_time_course']),
+    ('surface', ['read_surface', 'write_surface', 'decimate_surface',
+                 'read_morph_map', 'get_head_surf', 'get_meg_helmet_surf']),
+    ('source_space', ['read_source_spaces', 'vertex_to_mni',
+                      'write_source_spaces', 'setup_source_space',
+                      'setup_volume_source_space', 'SourceSpaces',
+                      'add_source_space_distances',
+                      'get_volume_labels_from_aseg']),
+    ('epochs', ['Epochs', 'EpochsArray', 'read_epochs']),
+    ('evoked', ['Evoked', 'EvokedArray', 'read_evokeds', 'write_evokeds',
+                'grand_average', 'combine_evoked']),
+    ('label', ['read_label', 'label_sign_flip', 'write_label', 'stc_to_label',
+               'grow_labels', 'Label', 'split_label', 'BiHemiLabel',
+               'read_labels_from_annot', 'write_labels_to_annot']),
+    ('misc', ['parse_config', 'read_reject_parameters']),
+    ('coreg', ['create_default_subject', 'scale_bem', 'scale_mri',
+               'scale_labels', 'scale_source_space']),
+    ('transforms', ['transform_coordinates', 'read_trans', 'write_trans',
+                    'transform_surface_to']),
+    ('proj', ['read_proj', 'write_proj', 'compute_proj_epochs',
+              'compute_proj_evoked', 'compute_proj_raw', 'sensitivity_map']),
+    ('selection', ['read_selection']),
+    ('dipole', ['read_dipole', 'Dipole', 'fit_dipole']),
+    ('channels', ['equalize_channels', 'rename_channels', 'find_layout']),
+]
+# Submodules that are attributes of mne
+_submodules = ['baseline', 'beamformer', 'bem', 'channels', 'commands',
+               'connectivity', 'coreg', 'cov', 'cuda', 'datasets',
+               'decoding', 'defaults', 'dipole', 'epochs', 'event', 'evoked',
+               'externals', 'fft', 'filter', 'fixes', 'forward', 'gui', 'io',
+               'label', 'minimum_norm', 'misc', 'parallel', 'preprocessing',
+               'proj', 'realtime', 'selection', 'simulation',
+               'source_estimate', 'source_space', 'stats', 'surface',
+               'time_frequency', 'transforms', 'utils', 'viz']
+__getattr__, __dir__, __all__ = _lazy_import(globals(), _lazy_attrs,
+                                             _submodules)
 
 # initialize logging
 set_log_level(None, False)
 set_log_file()
+
+# initialize profiling
+set_profile(None)
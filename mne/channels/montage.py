@@ -14,7 +14,6 @@ import os.path as op
 
 import numpy as np
 
-from ..viz import plot_montage
 from .channels import _contains_ch_type
 from ..transforms import (_sphere_to_cartesian, apply_trans,
                           get_ras_to_neuromag_trans)
@@ -70,6 +69,7 @@ class Montage(object):
         fig : Instance of matplotlib.figure.Figure
             The figure object.
         """
+        from ..viz import plot_montage
         return plot_montage(self, scale_factor=scale_factor,
                             show_names=show_names)
 
@@ -3,8 +3,8 @@
 # License: BSD (3-clause)
 
 import numpy as np
-from scipy.fftpack import fft, ifft
 
+from .fft import get_fft_backend
 from .utils import sizeof_fmt, logger, get_config
 
 
@@ -128,6 +128,8 @@ def setup_cuda_fft_multiply_repeated(n_jobs, h_fft):
                 frequency-domain multiplication.
             x : instance of gpuarray
                 Empty allocated GPU space for the data to filter.
+            fft_backend : instance of FFTBackend
+                The CPU FFT backend to use if CUDA is not used.
     h_fft : array | instance of gpuarray
         This will either be a gpuarray (if CUDA enabled) or np.ndarray.
         If CUDA is enabled, h_fft will be modified appropriately for use
@@ -138,7 +140,7 @@ def setup_cuda_fft_multiply_repeated(n_jobs, h_fft):
     This function is designed to be used with fft_multiply_repeated().
     """
     cuda_dict = dict(use_cuda=False, fft_plan=None, ifft_plan=None,
-                     x_fft=None, x=None)
+                     x_fft=None, x=None, fft_backend=get_fft_backend())
     n_fft = len(h_fft)
     cuda_fft_len = int((n_fft - (n_fft % 2)) / 2 + 1)
     if n_jobs == 'cuda':
@@ -188,8 +190,14 @@ def fft_multiply_repeated(h_fft, x, cuda_dict=dict(use_cuda=False)):
         Filtered version of x.
     """
     if not cuda_dict['use_cuda']:
-        # do the fourier-domain operations
-        x = np.real(ifft(h_fft * fft(x), overwrite_x=True)).ravel()
+        # do the fourier-domain operations, using real-input transforms since
+        # h_fft is the (Hermitian-symmetric) spectrum of a real filter
+        backend = cuda_dict.get('fft_backend', None)
+        if backend is None:
+            backend = get_fft_backend()
+        n_fft = len(h_fft)
+        x = backend.irfft(h_fft[:n_fft // 2 + 1] * backend.rfft(x, n_fft),
+                          n_fft).ravel()
     else:
         from scikits.cuda import fft as cudafft
         # do the fourier-domain operations, results in second param
@@ -242,6 +250,8 @@ def setup_cuda_fft_resample(n_jobs, W, new_len):
                 frequency-domain multiplication.
             x : instance of gpuarray
                 Empty allocated GPU space for the data to resample.
+            fft_backend : instance of FFTBackend
+                The CPU FFT backend to use if CUDA is not used.
     W : array | instance of gpuarray
         This will either be a gpuarray (if CUDA enabled) or np.ndarray.
         If CUDA is enabled, W will be modified appropriately for use
@@ -252,7 +262,8 @@ def setup_cuda_fft_resample(n_jobs, W, new_len):
     This function is designed to be used with fft_resample().
     """
     cuda_dict = dict(use_cuda=False, fft_plan=None, ifft_plan=None,
-                     x_fft=None, x=None, y_fft=None, y=None)
+                     x_fft=None, x=None, y_fft=None, y=None,
+                     fft_backend=get_fft_backend())
     n_fft_x, n_fft_y = len(W), new_len
     cuda_fft_len_x = int((n_fft_x - (n_fft_x % 2)) // 2 + 1)
     cuda_fft_len_y = int((n_fft_y - (n_fft_y % 2)) // 2 + 1)
@@ -315,14 +326,17 @@ def fft_resample(x, W, new_len, npad, to_remove,
     old_len = len(x)
     shorter = new_len < old_len
     if not cuda_dict['use_cuda']:
+        backend = cuda_dict.get('fft_backend', None)
+        if backend is None:
+            backend = get_fft_backend()
         N = int(min(new_len, old_len))
         sl_1 = slice((N + 1) // 2)
         y_fft = np.zeros(new_len, np.complex128)
-        x_fft = fft(x).ravel() * W
+        x_fft = backend.fft(x).ravel() * W
         y_fft[sl_1] = x_fft[sl_1]
         sl_2 = slice(-(N - 1) // 2, None)
         y_fft[sl_2] = x_fft[sl_2]
-        y = np.real(ifft(y_fft, overwrite_x=True)).ravel()
+        y = np.real(backend.ifft(y_fft)).ravel()
     else:
         from scikits.cuda import fft as cudafft
         cuda_dict['x'].set(np.concatenate((x, np.zeros(max(new_len - old_len,
@@ -359,13 +373,15 @@ def fft_resample(x, W, new_len, npad, to_remove,
 
 # this has to go in mne.cuda instead of mne.filter to avoid import errors
 def _smart_pad(x, n_pad):
-    """Pad vector x
+    """Pad x (along the last axis)
     """
     if n_pad == 0:
         return x
     elif n_pad < 0:
         raise RuntimeError('n_pad must be non-negative')
     # need to pad with zeros if len(x) <= npad
-    z_pad = np.zeros(max(n_pad - len(x) + 1, 0), dtype=x.dtype)
-    return np.concatenate([z_pad, 2 * x[0] - x[n_pad:0:-1], x,
-                           2 * x[-1] - x[-2:-n_pad - 2:-1], z_pad])
+    z_pad = np.zeros(x.shape[:-1] + (max(n_pad - x.shape[-1] + 1, 0),),
+                     dtype=x.dtype)
+    return np.concatenate([z_pad, 2 * x[..., :1] - x[..., n_pad:0:-1], x,
+                           2 * x[..., -1:] - x[..., -2:-n_pad - 2:-1], z_pad],
+                          axis=-1)
@@ -34,8 +34,6 @@ from .channels.channels import (ContainsMixin, UpdateChannelsMixin,
 from .filter import resample, detrend, FilterMixin
 from .event import _read_events_fif
 from .fixes import in1d
-from .viz import (plot_epochs, plot_epochs_trellis, _drop_log_stats,
-                  plot_epochs_psd, plot_epochs_psd_topomap)
 from .utils import (check_fname, logger, verbose, _check_type_picks,
                     _time_mask, check_random_state, object_hash)
 from .externals.six import iteritems, string_types
@@ -769,6 +767,7 @@ class _BaseEpochs(ProjMixin, ContainsMixin, UpdateChannelsMixin,
 
         .. versionadded:: 0.10.0
         """
+        from .viz import plot_epochs, plot_epochs_trellis
         if trellis is True:
             return plot_epochs_trellis(self, epoch_idx=epoch_idx, picks=picks,
                                        scalings=scalings, title_str=title_str,
@@ -824,6 +823,7 @@ class _BaseEpochs(ProjMixin, ContainsMixin, UpdateChannelsMixin,
         fig : instance of matplotlib figure
             Figure distributing one image per channel across sensor topography.
         """
+        from .viz import plot_epochs_psd
         return plot_epochs_psd(self, fmin=fmin, fmax=fmax, proj=proj,
                                n_fft=n_fft, picks=picks, ax=ax,
                                color=color, area_mode=area_mode,
@@ -911,6 +911,7 @@ class _BaseEpochs(ProjMixin, ContainsMixin, UpdateChannelsMixin,
         fig : instance of matplotlib figure
             Figure distributing one image per channel across sensor topography.
         """
+        from .viz import plot_epochs_psd_topomap
         return plot_epochs_psd_topomap(
             self, bands=bands, vmin=vmin, vmax=vmax, proj=proj, n_fft=n_fft,
             ch_type=ch_type, n_overlap=n_overlap, layout=layout, cmap=cmap,
@@ -976,6 +977,7 @@ class _BaseEpochs(ProjMixin, ContainsMixin, UpdateChannelsMixin,
         --------
         plot_drop_log
         """
+        from .viz import _drop_log_stats
         return _drop_log_stats(self.drop_log, ignore)
 
     def plot_drop_log(self, threshold=0, n_max_plot=20, subject='Unknown',
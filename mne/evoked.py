@@ -17,9 +17,6 @@ from .channels.channels import (ContainsMixin, UpdateChannelsMixin,
 from .filter import resample, detrend, FilterMixin
 from .fixes import in1d
 from .utils import check_fname, logger, verbose, object_hash, _time_mask
-from .viz import (plot_evoked, plot_evoked_topomap, plot_evoked_field,
-                  plot_evoked_image)
-from .viz.evoked import _plot_evoked_white
 from .externals.six import string_types
 
 from .io.constants import FIFF
@@ -386,6 +383,7 @@ class Evoked(ProjMixin, ContainsMixin, UpdateChannelsMixin,
             the same length as the number of channel types. If instance of
             Axes, there must be only one channel type plotted.
         """
+        from .viz import plot_evoked
         return plot_evoked(self, picks=picks, exclude=exclude, unit=unit,
                            show=show, ylim=ylim, proj=proj, xlim=xlim,
                            hline=hline, units=units, scalings=scalings,
@@ -432,6 +430,7 @@ class Evoked(ProjMixin, ContainsMixin, UpdateChannelsMixin,
         cmap : matplotlib colormap
             Colormap.
         """
+        from .viz import plot_evoked_image
         return plot_evoked_image(self, picks=picks, exclude=exclude, unit=unit,
                                  show=show, clim=clim, proj=proj, xlim=xlim,
                                  units=units, scalings=scalings,
@@ -552,6 +551,7 @@ class Evoked(ProjMixin, ContainsMixin, UpdateChannelsMixin,
             instance of Axes, ``times`` must be a float or a list of one float.
             Defaults to None.
         """
+        from .viz import plot_evoked_topomap
         return plot_evoked_topomap(self, times=times, ch_type=ch_type,
                                    layout=layout, vmin=vmin,
                                    vmax=vmax, cmap=cmap, sensors=sensors,
@@ -588,6 +588,7 @@ class Evoked(ProjMixin, ContainsMixin, UpdateChannelsMixin,
         fig : instance of mlab.Figure
             The mayavi figure.
         """
+        from .viz import plot_evoked_field
         return plot_evoked_field(self, surf_maps, time=time,
                                  time_label=time_label, n_jobs=n_jobs)
 
@@ -628,6 +629,7 @@ class Evoked(ProjMixin, ContainsMixin, UpdateChannelsMixin,
         -----
         .. versionadded:: 0.9.0
         """
+        from .viz.evoked import _plot_evoked_white
         return _plot_evoked_white(self, noise_cov=noise_cov, scalings=None,
                                   rank=None, show=show)
 
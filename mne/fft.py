@@ -0,0 +1,312 @@
+"""Pluggable FFT backends"""
+
+# License: BSD (3-clause)
+
+import multiprocessing
+
+import numpy as np
+
+from .externals.six import string_types
+from .utils import logger, get_config
+
+
+###############################################################################
+# FFT length helpers
+
+def next_fast_len(target):
+    """Find the next fast size of input data to FFT, for zero-padding
+
+    The returned size is a 5-smooth number (a composite of the prime factors
+    2, 3 and 5), which all supported FFT backends handle efficiently.
+
+    Parameters
+    ----------
+    target : int
+        Length to start searching from. Must be a positive integer.
+
+    Returns
+    -------
+    out : int
+        The first 5-smooth number greater than or equal to ``target``.
+
+    Examples
+    --------
+    >>> next_fast_len(1021)
+    1024
+    >>> next_fast_len(1025)
+    1080
+    """
+    target = int(target)
+    if target < 1:
+        raise ValueError('target must be a positive integer, got %s'
+                         % target)
+    if target <= 6:
+        return target
+    # quickly check if it's already a power of 2
+    if not (target & (target - 1)):
+        return target
+    match = np.inf
+    p5 = 1
+    while p5 < target:
+        p35 = p5
+        while p35 < target:
+            # ceiling integer division, avoiding conversion to float
+            quotient = -(-target // p35)
+            # the smallest power of two greater than or equal to quotient
+            p2 = 2 ** int(quotient - 1).bit_length()
+            n = p2 * p35
+            if n == target:
+                return n
+            elif n < match:
+                match = n
+            p35 *= 3
+            if p35 == target:
+                return p35
+        if p35 < match:
+            match = p35
+        p5 *= 5
+        if p5 == target:
+            return p5
+    if p5 < match:
+        match = p5
+    return int(match)
+
+
+def _fast_lens(low, high):
+    """Get all 5-smooth FFT lengths between low and next_fast_len(high)"""
+    high = next_fast_len(high)
+    lens = list()
+    p5 = 1
+    while p5 <= high:
+        p35 = p5
+        while p35 <= high:
+            n = p35
+            while n <= high:
+                if n >= low:
+                    lens.append(n)
+                n *= 2
+            p35 *= 3
+        p5 *= 5
+    return np.array(sorted(lens), int)
+
+
+###############################################################################
+# Backends
+
+def _setup_numpy(n_jobs):
+    """Get the (single-threaded) NumPy FFT functions"""
+    from numpy import fft
+    return dict(fft=fft.fft, ifft=fft.ifft, rfft=fft.rfft, irfft=fft.irfft)
+
+
+def _setup_scipy(n_jobs):
+    """Get the multi-threaded scipy.fft functions (SciPy >= 1.4)"""
+    import scipy.fft as fft
+    funcs = dict()
+    for key in ('fft', 'ifft', 'rfft', 'irfft'):
+        funcs[key] = _bind_kwargs(getattr(fft, key), workers=n_jobs)
+    return funcs
+
+
+def _setup_pyfftw(n_jobs):
+    """Get the pyFFTW NumPy-like interface with plan caching enabled"""
+    from pyfftw.interfaces import numpy_fft, cache
+    cache.enable()
+    funcs = dict()
+    for key in ('fft', 'ifft', 'rfft', 'irfft'):
+        funcs[key] = _bind_kwargs(getattr(numpy_fft, key), threads=n_jobs)
+    return funcs
+
+
+def _bind_kwargs(func, **kwargs):
+    """Bind keyword arguments, keeping the (x, n, axis) call signature"""
+    def wrapped(x, n=None, axis=-1):
+        return func(x, n, axis, **kwargs)
+    return wrapped
+
+
+# Registry of available backends, mapping names to setup functions that
+# return a dict of callables with the numpy.fft call signature
+_fft_backends = dict(numpy=_setup_numpy, scipy=_setup_scipy,
+                     pyfftw=_setup_pyfftw)
+_fft_cache = dict()
+_fft_unavailable = set()  # backends that failed to import
+
+
+class FFTBackend(object):
+    """Container for the FFT functions of a given backend
+
+    Instances are obtained with :func:`get_fft_backend` and are cheap to
+    pickle (only the backend name and number of threads are stored), so
+    they can be passed to parallel workers.
+
+    Parameters
+    ----------
+    name : str
+        The backend name.
+    n_jobs : int
+        The number of threads each transform may use.
+
+    Attributes
+    ----------
+    name : str
+        The backend name.
+    n_jobs : int
+        The number of threads each transform may use.
+    """
+    def __init__(self, name, n_jobs):
+        self.name = name
+        self.n_jobs = n_jobs
+
+    def __repr__(self):
+        return '<FFTBackend | %s, n_jobs=%d>' % (self.name, self.n_jobs)
+
+    def __getstate__(self):
+        return dict(name=self.name, n_jobs=self.n_jobs)
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _get(self, key):
+        key_cache = (self.name, self.n_jobs)
+        if key_cache not in _fft_cache:
+            _fft_cache[key_cache] = _fft_backends[self.name](self.n_jobs)
+        return _fft_cache[key_cache][key]
+
+    def fft(self, x, n=None, axis=-1):
+        """Compute the one-dimensional discrete Fourier transform
+
+        Parameters
+        ----------
+        x : array
+            The input array.
+        n : int | None
+            Length of the transformed axis of the output. The input is cropped
+            or zero-padded to this length. If None, the length of the input
+            along axis is used.
+        axis : int
+            Axis over which to compute the transform.
+
+        Returns
+        -------
+        out : array of complex
+            The transformed input.
+        """
+        return self._get('fft')(x, n, axis)
+
+    def ifft(self, x, n=None, axis=-1):
+        """Compute the one-dimensional inverse discrete Fourier transform
+
+        Parameters
+        ----------
+        x : array
+            The input array.
+        n : int | None
+            Length of the transformed axis of the output. The input is cropped
+            or zero-padded to this length. If None, the length of the input
+            along axis is used.
+        axis : int
+            Axis over which to compute the transform.
+
+        Returns
+        -------
+        out : array of complex
+            The transformed input.
+        """
+        return self._get('ifft')(x, n, axis)
+
+    def rfft(self, x, n=None, axis=-1):
+        """Compute the one-dimensional DFT for real input
+
+        Parameters
+        ----------
+        x : array of float
+            The input array.
+        n : int | None
+            Number of points along the transformed axis of the input to use.
+            The input is cropped or zero-padded to this length. If None, the
+            length of the input along axis is used.
+        axis : int
+            Axis over which to compute the transform.
+
+        Returns
+        -------
+        out : array of complex
+            The transformed input, with ``n // 2 + 1`` points along axis.
+        """
+        return self._get('rfft')(x, n, axis)
+
+    def irfft(self, x, n=None, axis=-1):
+        """Compute the inverse of the DFT for real input
+
+        Parameters
+        ----------
+        x : array of complex
+            The input array, as returned by :meth:`rfft`.
+        n : int | None
+            Length of the transformed axis of the output. If None,
+            ``2 * (m - 1)`` is used, where m is the length of the input along
+            axis.
+        axis : int
+            Axis over which to compute the transform.
+
+        Returns
+        -------
+        out : array of float
+            The real transformed input.
+        """
+        return self._get('irfft')(x, n, axis)
+
+
+def get_fft_backend(backend=None, n_jobs=None):
+    """Get the FFT backend to use
+
+    Parameters
+    ----------
+    backend : str | None
+        The backend to use, can be "numpy" (single-threaded), "scipy"
+        (multi-threaded ``scipy.fft``, requires SciPy >= 1.4) or "pyfftw"
+        (multi-threaded with plan caching, requires pyFFTW). If None, the
+        config variable MNE_FFT_BACKEND is used, defaulting to "numpy".
+        If the requested backend is not available, "numpy" is used.
+    n_jobs : int | None
+        Number of threads each FFT may use (only used by the "scipy" and
+        "pyfftw" backends). Negative values count back from the number of
+        CPUs like in joblib. If None, the config variable MNE_FFT_N_JOBS
+        is used, defaulting to 1.
+
+    Returns
+    -------
+    backend : instance of FFTBackend
+        The FFT backend.
+    """
+    if backend is None:
+        backend = get_config('MNE_FFT_BACKEND', 'numpy')
+    if not isinstance(backend, string_types) or \
+            backend not in _fft_backends:
+        raise ValueError('FFT backend must be one of %s, got %s'
+                         % (sorted(_fft_backends.keys()), backend))
+    if n_jobs is None:
+        n_jobs = get_config('MNE_FFT_N_JOBS', '1')
+    try:
+        n_jobs = int(n_jobs)
+    except ValueError:
+        raise ValueError('n_jobs must be an integer, got %s' % n_jobs)
+    if n_jobs <= 0:
+        n_cores = multiprocessing.cpu_count()
+        n_jobs = max(n_cores + n_jobs + 1, 1)
+    if backend == 'numpy':
+        n_jobs = 1
+    if backend in _fft_unavailable:
+        return FFTBackend('numpy', 1)
+    key_cache = (backend, n_jobs)
+    if key_cache not in _fft_cache:
+        try:
+            _fft_cache[key_cache] = _fft_backends[backend](n_jobs)
+        except ImportError:
+            # only warn once, not on each of the (many) calls
+            _fft_unavailable.add(backend)
+            logger.warning('FFT backend "%s" could not be imported, falling '
+                           'back to "numpy"' % backend)
+            backend, n_jobs = 'numpy', 1
+    return FFTBackend(backend, n_jobs)
@@ -3,7 +3,7 @@
 from .externals.six import string_types, integer_types
 import warnings
 import numpy as np
-from scipy.fftpack import fft, ifftshift, fftfreq
+from scipy.fftpack import ifftshift, fftfreq
 from copy import deepcopy
 
 from .fixes import get_firwin2, get_filtfilt
@@ -11,6 +11,7 @@ from .time_frequency.multitaper import dpss_windows, _mt_spectra
 from .parallel import parallel_func, check_n_jobs
 from .cuda import (setup_cuda_fft_multiply_repeated, fft_multiply_repeated,
                    setup_cuda_fft_resample, fft_resample, _smart_pad)
+from .fft import get_fft_backend, next_fast_len, _fast_lens
 from .utils import logger, verbose, sum_squared, check_scipy_version
 
 
@@ -38,6 +39,11 @@ def is_power2(num):
     return num != 0 and ((num & (num - 1)) == 0)
 
 
+# Maximum size in bytes of the segments transformed in one batch by
+# _overlap_add_filter (kept small so that each batch stays in the CPU cache)
+_ola_max_bytes = 2 ** 22
+
+
 def _overlap_add_filter(x, h, n_fft=None, zero_phase=True, picks=None,
                         n_jobs=1):
     """ Filter using overlap-add FFTs.
@@ -46,6 +52,10 @@ def _overlap_add_filter(x, h, n_fft=None, zero_phase=True, picks=None,
     If zero_phase==True, the the filter is applied twice, once in the forward
     direction and once backward , resulting in a zero-phase filter.
 
+    On the CPU, real FFTs are used and the rows of x are filtered in batches,
+    with one 2D FFT per segment. The dtype of x (float32 or float64) is
+    preserved.
+
     .. warning:: This operates on the data in-place.
 
     Parameters
@@ -72,6 +82,7 @@ def _overlap_add_filter(x, h, n_fft=None, zero_phase=True, picks=None,
     """
     if picks is None:
         picks = np.arange(x.shape[0])
+    picks = np.asarray(picks, int)
 
     # Extend the signal by mirroring the edges to reduce transient filter
     # response
@@ -93,10 +104,10 @@ def _overlap_add_filter(x, h, n_fft=None, zero_phase=True, picks=None,
             n_tot = 2 * n_x if zero_phase else n_x
 
             # cost function based on number of multiplications
-            N = 2 ** np.arange(np.ceil(np.log2(min_fft)),
-                               np.ceil(np.log2(max_fft)) + 1, dtype=int)
+            N = _fast_lens(min_fft, max_fft)
             # if doing zero-phase, h needs to be thought of as ~ twice as long
             n_h_cost = 2 * n_h - 1 if zero_phase else n_h
+            N = N[N > n_h_cost]
             cost = (np.ceil(n_tot / (N - n_h_cost + 1).astype(np.float)) *
                     N * (np.log2(N) + 1))
 
@@ -107,7 +118,8 @@ def _overlap_add_filter(x, h, n_fft=None, zero_phase=True, picks=None,
             n_fft = N[np.argmin(cost)]
         else:
             # Use only a single block
-            n_fft = 2 ** int(np.ceil(np.log2(n_x + n_h - 1)))
+            n_fft = next_fast_len(n_x + n_h - 1)
+    n_fft = int(n_fft)
 
     if zero_phase and n_fft <= 2 * n_h - 1:
         raise ValueError("n_fft is too short, has to be at least "
@@ -116,11 +128,13 @@ def _overlap_add_filter(x, h, n_fft=None, zero_phase=True, picks=None,
         raise ValueError("n_fft is too short, has to be at least "
                          "len(h) if zero_phase == False")
 
-    if not is_power2(n_fft):
-        warnings.warn("FFT length is not a power of 2. Can be slower.")
+    if next_fast_len(n_fft) != n_fft:
+        warnings.warn("FFT length is not a product of the primes 2, 3 and 5. "
+                      "Can be slower.")
 
     # Filter in frequency domain
-    h_fft = fft(np.concatenate([h, np.zeros(n_fft - n_h, dtype=h.dtype)]))
+    backend = get_fft_backend()
+    h_fft = backend.fft(h, n_fft)
     assert(len(h_fft) == n_fft)
 
     if zero_phase:
@@ -136,51 +150,101 @@ def _overlap_add_filter(x, h, n_fft=None, zero_phase=True, picks=None,
     # Figure out if we should use CUDA
     n_jobs, cuda_dict, h_fft = setup_cuda_fft_multiply_repeated(n_jobs, h_fft)
 
-    # Process each row separately
-    if n_jobs == 1:
+    if cuda_dict['use_cuda']:
+        # Process each row separately
         for p in picks:
             x[p] = _1d_overlap_filter(x[p], h_fft, n_h, n_edge, zero_phase,
                                       cuda_dict)
+        return x
+
+    # Only the non-negative frequencies are needed for real FFTs, and
+    # keeping h_fft in single precision avoids upcasting float32 data
+    h_fft = h_fft[:n_fft // 2 + 1]
+    if x.dtype == np.float32:
+        h_fft = h_fft.astype(np.complex64 if np.iscomplexobj(h_fft)
+                             else np.float32)
+
+    # Process the rows in batches of bounded size
+    n_rows = max(_ola_max_bytes // (x.itemsize * 2 * n_fft), 1)
+    n_batches = max(int(np.ceil(len(picks) / float(n_rows))), n_jobs)
+    batches = [b for b in np.array_split(picks, n_batches) if len(b) > 0]
+    if n_jobs == 1:
+        for batch in batches:
+            x[batch] = _overlap_add_rows(x[batch], h_fft, n_fft, n_h, n_edge,
+                                         zero_phase, backend)
     else:
-        parallel, p_fun, _ = parallel_func(_1d_overlap_filter, n_jobs)
-        data_new = parallel(p_fun(x[p], h_fft, n_h, n_edge, zero_phase,
-                                  cuda_dict)
-                            for p in picks)
-        for pp, p in enumerate(picks):
-            x[p] = data_new[pp]
+        parallel, p_fun, _ = parallel_func(_overlap_add_rows, n_jobs,
+                                           backend='threads')
+        data_new = parallel(p_fun(x[batch], h_fft, n_fft, n_h, n_edge,
+                                  zero_phase, backend)
+                            for batch in batches)
+        for batch, data in zip(batches, data_new):
+            x[batch] = data
 
     return x
 
 
-def _1d_overlap_filter(x, h_fft, n_h, n_edge, zero_phase, cuda_dict):
-    """Do one-dimensional overlap-add FFT FIR filtering"""
-    # pad to reduce ringing
-    if cuda_dict['use_cuda']:
-        n_fft = cuda_dict['x'].size  # account for CUDA's modification of h_fft
-    else:
-        n_fft = len(h_fft)
-    x_ext = _smart_pad(x, n_edge)
-    n_x = len(x_ext)
-    x_filtered = np.zeros_like(x_ext)
-
+def _overlap_segments(n_x, n_fft, n_h, zero_phase):
+    """Get the segment length and padding for overlap-add filtering"""
     if zero_phase:
         # Segment length for signal x (convolving twice)
         n_seg = n_fft - 2 * (n_h - 1) - 1
-
-        # Number of segments (including fractional segments)
-        n_segments = int(np.ceil(n_x / float(n_seg)))
-
         # padding parameters to ensure filtering is done properly
         pre_pad = n_h - 1
-        post_pad = n_fft - (n_h - 1)
     else:
         n_seg = n_fft - n_h + 1
-        n_segments = int(np.ceil(n_x / float(n_seg)))
         pre_pad = 0
-        post_pad = n_fft
+    # Number of segments (including fractional segments)
+    n_segments = int(np.ceil(n_x / float(n_seg)))
+    return n_seg, n_segments, pre_pad
+
+
+def _overlap_add_rows(x, h_fft, n_fft, n_h, n_edge, zero_phase, backend):
+    """Do overlap-add FFT FIR filtering of all rows of a 2D array at once"""
+    # pad to reduce ringing
+    x_ext = _smart_pad(x, n_edge)
+    n_x = x_ext.shape[1]
+    x_filtered = np.zeros_like(x_ext)
+    n_seg, n_segments, pre_pad = _overlap_segments(n_x, n_fft, n_h,
+                                                   zero_phase)
 
     # Now the actual filtering step is identical for zero-phase (filtfilt-like)
     # or single-pass
+    seg = np.zeros((len(x_ext), n_fft), x.dtype)
+    for seg_idx in range(n_segments):
+        start = seg_idx * n_seg
+        stop = min(start + n_seg, n_x)
+        seg.fill(0.)
+        seg[:, pre_pad:pre_pad + stop - start] = x_ext[:, start:stop]
+
+        prod = backend.irfft(backend.rfft(seg) * h_fft, n_fft)
+
+        start_filt = max(0, start - pre_pad)
+        stop_filt = min(start - pre_pad + n_fft, n_x)
+        start_prod = max(0, pre_pad - start)
+        stop_prod = start_prod + stop_filt - start_filt
+        x_filtered[:, start_filt:stop_filt] += prod[:, start_prod:stop_prod]
+
+    # Remove mirrored edges that we added
+    if n_edge > 0:
+        x_filtered = x_filtered[:, n_edge:-n_edge]
+    return x_filtered
+
+
+def _1d_overlap_filter(x, h_fft, n_h, n_edge, zero_phase, cuda_dict):
+    """Do one-dimensional overlap-add FFT FIR filtering"""
+    # pad to reduce ringing
+    if cuda_dict['use_cuda']:
+        n_fft = cuda_dict['x'].size  # account for CUDA's modification of h_fft
+    else:
+        n_fft = len(h_fft)
+    x_ext = _smart_pad(x, n_edge)
+    n_x = len(x_ext)
+    x_filtered = np.zeros_like(x_ext)
+    n_seg, n_segments, pre_pad = _overlap_segments(n_x, n_fft, n_h,
+                                                   zero_phase)
+    post_pad = n_fft - pre_pad
+
     for seg_idx in range(n_segments):
         start = seg_idx * n_seg
         stop = (seg_idx + 1) * n_seg
@@ -235,9 +299,9 @@ def _1d_fftmult_ext(x, B, extend_x, cuda_dict):
 
 def _prep_for_filtering(x, copy, picks=None):
     """Set up array as 2D for filtering ease"""
-    if x.dtype != np.float64:
+    if x.dtype not in (np.float32, np.float64):
         raise TypeError("Arrays passed for filtering must have a dtype of "
-                        "np.float64")
+                        "np.float32 or np.float64")
     if copy is True:
         x = x.copy()
     orig_shape = x.shape
@@ -333,7 +397,7 @@ def _filter(x, Fs, freq, gain, filter_length='10s', picks=None, n_jobs=1,
                           '%0.1fdB.' % (att_freq, att_db))
 
         # Make zero-phase filter function
-        B = np.abs(fft(h)).ravel()
+        B = np.abs(get_fft_backend().fft(h)).ravel()
 
         # Figure out if we should use CUDA
         n_jobs, cuda_dict, B = setup_cuda_fft_multiply_repeated(n_jobs, B)
@@ -342,39 +406,51 @@ def _filter(x, Fs, freq, gain, filter_length='10s', picks=None, n_jobs=1,
             for p in picks:
                 x[p] = _1d_fftmult_ext(x[p], B, extend_x, cuda_dict)
         else:
-            parallel, p_fun, _ = parallel_func(_1d_fftmult_ext, n_jobs)
+            parallel, p_fun, _ = parallel_func(_1d_fftmult_ext, n_jobs,
+                                               backend='auto')
             data_new = parallel(p_fun(x[p], B, extend_x, cuda_dict)
                                 for p in picks)
             for pp, p in enumerate(picks):
                 x[p] = data_new[pp]
     else:
         # Use overlap-add filter with a fixed length
-        N = filter_length
+        h = _fir_kernel(Fs, freq, gain, filter_length, zero_phase=True,
+                        min_att_db=min_att_db)
+        x = _overlap_add_filter(x, h, zero_phase=True, picks=picks,
+                                n_jobs=n_jobs)
 
-        if (gain[-1] == 0.0 and N % 2 == 1) \
-                or (gain[-1] == 1.0 and N % 2 != 1):
-            # Gain at Nyquist freq: 1: make N EVEN, 0: make N ODD
-            N += 1
+    x.shape = orig_shape
+    return x
 
-        # construct filter with gain resulting from forward-backward filtering
-        h = firwin2(N, freq, gain, window='hann')
 
-        att_db, att_freq = _filter_attenuation(h, freq, gain)
+def _fir_kernel(Fs, freq, gain, N, zero_phase, min_att_db=20):
+    """Construct a linear-phase FIR filter of (at least) N taps
+
+    freq must be normalized to the Nyquist frequency. If zero_phase is True,
+    the filter is designed to be applied twice (forward and backward).
+    """
+    firwin2 = get_firwin2()
+    if (gain[-1] == 0.0 and N % 2 == 1) \
+            or (gain[-1] == 1.0 and N % 2 != 1):
+        # Gain at Nyquist freq: 1: make N EVEN, 0: make N ODD
+        N += 1
+
+    # construct filter with gain resulting from forward-backward filtering
+    h = firwin2(N, freq, gain, window='hann')
+
+    att_db, att_freq = _filter_attenuation(h, freq, gain)
+    if zero_phase:
         att_db += 6  # the filter is applied twice (zero phase)
-        if att_db < min_att_db:
-            att_freq *= Fs / 2
-            warnings.warn('Attenuation at stop frequency %0.1fHz is only '
-                          '%0.1fdB. Increase filter_length for higher '
-                          'attenuation.' % (att_freq, att_db))
+    if att_db < min_att_db:
+        att_freq *= Fs / 2
+        warnings.warn('Attenuation at stop frequency %0.1fHz is only '
+                      '%0.1fdB. Increase filter_length for higher '
+                      'attenuation.' % (att_freq, att_db))
 
+    if zero_phase:
         # reconstruct filter, this time with appropriate gain for fwd-bkwd
-        gain = np.sqrt(gain)
-        h = firwin2(N, freq, gain, window='hann')
-        x = _overlap_add_filter(x, h, zero_phase=True, picks=picks,
-                                n_jobs=n_jobs)
-
-    x.shape = orig_shape
-    return x
+        h = firwin2(N, freq, np.sqrt(gain), window='hann')
+    return h
 
 
 def _check_coefficients(b, a):
@@ -398,7 +474,7 @@ def _filtfilt(x, b, a, padlen, picks, n_jobs, copy):
         for p in picks:
             x[p] = filtfilt(b, a, x[p], padlen=padlen)
     else:
-        parallel, p_fun, _ = parallel_func(filtfilt, n_jobs)
+        parallel, p_fun, _ = parallel_func(filtfilt, n_jobs, backend='auto')
         data_new = parallel(p_fun(b, a, x[p], padlen=padlen)
                             for p in picks)
         for pp, p in enumerate(picks):
@@ -982,7 +1058,8 @@ def high_pass_filter(x, Fs, Fp, filter_length='10s', trans_bandwidth=0.5,
 def notch_filter(x, Fs, freqs, filter_length='10s', notch_widths=None,
                  trans_bandwidth=1, method='fft',
                  iir_params=None, mt_bandwidth=None,
-                 p_value=0.05, picks=None, n_jobs=1, copy=True, verbose=None):
+                 p_value=0.05, picks=None, n_jobs=1, copy=True,
+                 mt_window=None, verbose=None):
     """Notch filter for the signal x.
 
     Applies a zero-phase notch filter to the signal x, operating on the last
@@ -1038,6 +1115,14 @@ def notch_filter(x, Fs, freqs, filter_length='10s', notch_widths=None,
     copy : bool
         If True, a copy of x, filtered, is returned. Otherwise, it operates
         on x in place.
+    mt_window : float | None
+        Length (in seconds) of the sliding windows used in 'spectrum_fit'
+        mode. Consecutive windows overlap by half their length and the
+        cleaned windows are combined using Hann weights, which allows
+        removing non-stationary line noise with bounded memory usage.
+        If None (default), the whole signal is used as a single window.
+
+        .. versionadded:: 0.10
     verbose : bool, str, int, or None
         If not None, override default verbose level (see mne.verbose).
 
@@ -1080,18 +1165,7 @@ def notch_filter(x, Fs, freqs, filter_length='10s', notch_widths=None,
                          'spectrum_fit')
 
     # Only have to deal with notch_widths for non-autodetect
-    if freqs is not None:
-        if notch_widths is None:
-            notch_widths = freqs / 200.0
-        elif np.any(notch_widths < 0):
-            raise ValueError('notch_widths must be >= 0')
-        else:
-            notch_widths = np.atleast_1d(notch_widths)
-            if len(notch_widths) == 1:
-                notch_widths = notch_widths[0] * np.ones_like(freqs)
-            elif len(notch_widths) != len(freqs):
-                raise ValueError('notch_widths must be None, scalar, or the '
-                                 'same length as freqs')
+    notch_widths = _check_notch_widths(freqs, notch_widths)
 
     if method in ['fft', 'iir']:
         # Speed this up by computing the fourier coefficients once
@@ -1104,22 +1178,105 @@ def notch_filter(x, Fs, freqs, filter_length='10s', notch_widths=None,
                               method, iir_params, picks, n_jobs, copy)
     elif method == 'spectrum_fit':
         xf = _mt_spectrum_proc(x, Fs, freqs, notch_widths, mt_bandwidth,
-                               p_value, picks, n_jobs, copy)
+                               p_value, picks, n_jobs, copy, mt_window)
 
     return xf
 
 
+def _check_notch_widths(freqs, notch_widths):
+    """Helper to get one notch width per frequency"""
+    if freqs is None:
+        return notch_widths
+    if notch_widths is None:
+        notch_widths = freqs / 200.0
+    elif np.any(notch_widths < 0):
+        raise ValueError('notch_widths must be >= 0')
+    else:
+        notch_widths = np.atleast_1d(notch_widths)
+        if len(notch_widths) == 1:
+            notch_widths = notch_widths[0] * np.ones_like(freqs)
+        elif len(notch_widths) != len(freqs):
+            raise ValueError('notch_widths must be None, scalar, or the '
+                             'same length as freqs')
+    return notch_widths
+
+
+# memory budget (in bytes) for the temporary arrays of a block of signals
+# in spectrum_fit mode
+_mt_max_bytes = 2 ** 28
+
+
 def _mt_spectrum_proc(x, sfreq, line_freqs, notch_widths, mt_bandwidth,
-                      p_value, picks, n_jobs, copy):
+                      p_value, picks, n_jobs, copy, mt_window=None):
     """Helper to more easily call _mt_spectrum_remove"""
-    from scipy import stats
     # set up array for filtering, reshape to 2D, operate on last axis
     n_jobs = check_n_jobs(n_jobs)
     x, orig_shape, picks = _prep_for_filtering(x, copy, picks)
-
-    # XXX need to implement the moving window version for raw files
+    picks = np.unique(picks)
     n_times = x.shape[1]
+    n_win = _mt_window_length(mt_window, sfreq, n_times)
+
+    if n_win == n_times:
+        # a single window, so we can operate in place
+        window_fun, threshold = _mt_spectrum_setup(n_times, sfreq,
+                                                   mt_bandwidth, p_value)
+        freq_list = _mt_spectrum_rows(x, picks, sfreq, line_freqs,
+                                      notch_widths, window_fun, threshold,
+                                      n_jobs)
+    else:
+        out = np.zeros((len(picks), n_times), x.dtype)
+        freq_list = _mt_spectrum_windowed(
+            lambda start, stop: x[picks, start:stop], out,
+            np.arange(len(picks)), n_times, sfreq, line_freqs, notch_widths,
+            mt_bandwidth, p_value, n_win, n_jobs)
+        x[picks] = out
+        del out
+    _mt_log_freqs(freq_list, line_freqs)
+
+    x.shape = orig_shape
+    return x
+
+
+def _mt_window_length(mt_window, sfreq, n_times):
+    """Helper to get the length (in samples) of the multitaper windows"""
+    if mt_window is None:
+        return n_times
+    n_win = int(round(float(mt_window) * sfreq))
+    if n_win < 2:
+        raise ValueError('mt_window must be at least two samples long, got '
+                         '%s sec' % mt_window)
+    return min(n_win, n_times)
+
 
+def _mt_window_weights(n_times, n_win):
+    """Get the extent and overlap-add weights of sliding windows
+
+    Consecutive windows overlap by half their length and are weighted by
+    Hann windows (flat at the signal edges), normalized so that the
+    weights of all windows sum to one at each sample.
+    """
+    if n_win >= n_times:
+        return [(0, n_times, np.ones(n_times))]
+    step = max(n_win // 2, 1)
+    starts = list(range(0, n_times - n_win, step)) + [n_times - n_win]
+    hann = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n_win) / float(n_win))
+    windows = list()
+    w_sum = np.zeros(n_times)
+    for ii, start in enumerate(starts):
+        weights = hann.copy()
+        if ii == 0:
+            weights[:n_win // 2] = 1.
+        if ii == len(starts) - 1:
+            weights[n_win // 2:] = 1.
+        w_sum[start:start + n_win] += weights
+        windows.append((start, start + n_win, weights))
+    return [(start, stop, weights / w_sum[start:stop])
+            for start, stop, weights in windows]
+
+
+def _mt_spectrum_setup(n_times, sfreq, mt_bandwidth, p_value):
+    """Compute the tapers and F-test threshold for a window length"""
+    from scipy import stats
     # max taper size chosen because it has an max error < 1e-3:
     # >>> np.max(np.diff(dpss_windows(953, 4, 100)[0]))
     # 0.00099972447657578449
@@ -1140,44 +1297,79 @@ def _mt_spectrum_proc(x, sfreq, line_freqs, notch_widths, mt_bandwidth,
                                                        dpss_n_times_max))
     # F-stat of 1-p point
     threshold = stats.f.ppf(1 - p_value / n_times, 2, 2 * len(window_fun) - 2)
+    return window_fun, threshold
 
-    if n_jobs == 1:
-        freq_list = list()
-        for ii, x_ in enumerate(x):
-            if ii in picks:
-                x[ii], f = _mt_spectrum_remove(x_, sfreq, line_freqs,
-                                               notch_widths, window_fun,
-                                               threshold)
-                freq_list.append(f)
-    else:
-        parallel, p_fun, _ = parallel_func(_mt_spectrum_remove, n_jobs)
-        data_new = parallel(p_fun(x_, sfreq, line_freqs, notch_widths,
-                                  window_fun, threshold)
-                            for xi, x_ in enumerate(x)
-                            if xi in picks)
-        freq_list = [d[1] for d in data_new]
-        data_new = np.array([d[0] for d in data_new])
-        x[picks, :] = data_new
-
-    # report found frequencies
-    for rm_freqs in freq_list:
-        if line_freqs is None:
+
+def _mt_spectrum_windowed(read_data, out, out_rows, n_times, sfreq,
+                          line_freqs, notch_widths, mt_bandwidth, p_value,
+                          n_win, n_jobs):
+    """Remove sinusoids in overlapping windows and overlap-add the result
+
+    ``read_data(start, stop)`` must return a new array with the signals to
+    clean, which get accumulated into ``out[out_rows, start:stop]``.
+    """
+    n_jobs = check_n_jobs(n_jobs)
+    window_fun = threshold = None
+    freq_list = [list() for _ in range(len(out_rows))]
+    rows = np.arange(len(out_rows))
+    for start, stop, weights in _mt_window_weights(n_times, n_win):
+        if window_fun is None or window_fun.shape[1] != stop - start:
+            window_fun, threshold = _mt_spectrum_setup(
+                stop - start, sfreq, mt_bandwidth, p_value)
+        x_win = read_data(start, stop)
+        freqs = _mt_spectrum_rows(x_win, rows, sfreq, line_freqs,
+                                  notch_widths, window_fun, threshold, n_jobs)
+        x_win *= weights
+        out[out_rows, start:stop] += x_win
+        for fl, f in zip(freq_list, freqs):
+            fl.append(f)
+    return [np.unique(np.concatenate(fl)) for fl in freq_list]
+
+
+def _mt_spectrum_rows(x, rows, sfreq, line_freqs, notch_widths, window_fun,
+                      threshold, n_jobs):
+    """Clean rows of x in place, in blocks of bounded memory size"""
+    if len(rows) == 0:
+        return list()
+    # each row needs n_tapers complex spectra of length n_times / 2
+    n_tapers, n_times = window_fun.shape
+    row_bytes = 16 * n_tapers * (n_times // 2 + 1)
+    n_block = max(int(_mt_max_bytes // (row_bytes * n_jobs)), 1)
+    blocks = np.array_split(rows, max(int(np.ceil(len(rows) /
+                                                  float(n_block))), n_jobs))
+    blocks = [block for block in blocks if len(block) > 0]
+    parallel, p_fun, _ = parallel_func(_mt_spectrum_remove, n_jobs,
+                                       backend='threads')
+    freq_list = list()
+    for ii in range(0, len(blocks), n_jobs):
+        these_blocks = blocks[ii:ii + n_jobs]
+        out = parallel(p_fun(x[block], sfreq, line_freqs, notch_widths,
+                             window_fun, threshold)
+                       for block in these_blocks)
+        for block, (x_block, f) in zip(these_blocks, out):
+            x[block] = x_block
+            freq_list.extend(f)
+    return freq_list
+
+
+def _mt_log_freqs(freq_list, line_freqs):
+    """Report found frequencies"""
+    if line_freqs is None:
+        for rm_freqs in freq_list:
             if len(rm_freqs) > 0:
                 logger.info('Detected notch frequencies:\n%s'
                             % ', '.join([str(rm_f) for rm_f in rm_freqs]))
             else:
                 logger.info('Detected notch frequecies:\nNone')
 
-    x.shape = orig_shape
-    return x
-
 
 def _mt_spectrum_remove(x, sfreq, line_freqs, notch_widths,
                         window_fun, threshold):
     """Use MT-spectrum to remove line frequencies
 
     Based on Chronux. If line_freqs is specified, all freqs within notch_width
-    of each line_freq is set to zero.
+    of each line_freq is set to zero. The tapered spectra, F-statistics and
+    sinusoid fits are computed for all signals (rows of x) at once.
     """
     # drop the even tapers
     n_tapers = len(window_fun)
@@ -1191,13 +1383,10 @@ def _mt_spectrum_remove(x, sfreq, line_freqs, notch_widths,
     # sum of squares across tapers (1, )
     H0_sq = sum_squared(H0)
 
-    # make "time" vector
-    rads = 2 * np.pi * (np.arange(x.size) / float(sfreq))
-
     # compute mt_spectrum (returning n_ch, n_tapers, n_freq)
-    x_p, freqs = _mt_spectra(x[np.newaxis, :], window_fun, sfreq)
+    x_p, freqs = _mt_spectra(x, window_fun, sfreq)
 
-    # sum of the product of x_p and H0 across tapers (1, n_freqs)
+    # sum of the product of x_p and H0 across tapers (n_ch, n_freqs)
     x_p_H0 = np.sum(x_p[:, tapers_odd, :] *
                     H0[np.newaxis, :, np.newaxis], axis=1)
 
@@ -1208,7 +1397,7 @@ def _mt_spectrum_remove(x, sfreq, line_freqs, notch_widths,
         # figure out which freqs to remove using F stat
 
         # estimated coefficient
-        x_hat = A * H0[:, np.newaxis]
+        x_hat = A[:, np.newaxis, :] * H0[np.newaxis, :, np.newaxis]
 
         # numerator for F-statistic
         num = (n_tapers - 1) * (A * A.conj()).real * H0_sq
@@ -1217,34 +1406,41 @@ def _mt_spectrum_remove(x, sfreq, line_freqs, notch_widths,
                np.sum(np.abs(x_p[:, tapers_even, :]) ** 2, 1))
         den[den == 0] = np.inf
         f_stat = num / den
+        del x_hat
 
         # find frequencies to remove
-        indices = np.where(f_stat > threshold)[1]
-        rm_freqs = freqs[indices]
+        mask = f_stat > threshold
     else:
         # specify frequencies
         indices_1 = np.unique([np.argmin(np.abs(freqs - lf))
                                for lf in line_freqs])
-        notch_widths /= 2.0
+        half_widths = np.asarray(notch_widths) / 2.0
         indices_2 = [np.logical_and(freqs > lf - nw, freqs < lf + nw)
-                     for lf, nw in zip(line_freqs, notch_widths)]
+                     for lf, nw in zip(line_freqs, half_widths)]
         indices_2 = np.where(np.any(np.array(indices_2), axis=0))[0]
-        indices = np.unique(np.r_[indices_1, indices_2])
-        rm_freqs = freqs[indices]
-
-    fits = list()
-    for ind in indices:
-        c = 2 * A[0, ind]
-        fit = np.abs(c) * np.cos(freqs[ind] * rads + np.angle(c))
-        fits.append(fit)
-
-    if len(fits) == 0:
-        datafit = 0.0
-    else:
-        # fitted sinusoids are summed, and subtracted from data
-        datafit = np.sum(np.atleast_2d(fits), axis=0)
-
-    return x - datafit, rm_freqs
+        indices = np.unique(np.r_[indices_1, indices_2]).astype(int)
+        mask = np.zeros(A.shape, bool)
+        mask[:, indices] = True
+    del x_p
+    rm_freqs = [freqs[m] for m in mask]
+
+    # fitted sinusoids (c * exp(i * 2 * pi * f * t)) are summed, and
+    # subtracted from data
+    used = np.where(mask.any(axis=0))[0]
+    if len(used) == 0:
+        return x, rm_freqs
+    c = 2 * A[:, used] * mask[:, used]
+    n_times = x.shape[1]
+    # do this in time blocks to keep the sinusoid matrices small
+    n_step = max(int(_mt_max_bytes // (16 * len(used))), 1)
+    x = x.copy() if not x.flags.writeable else x
+    for start in range(0, n_times, n_step):
+        stop = min(start + n_step, n_times)
+        rads = 2 * np.pi * (np.arange(start, stop) / float(sfreq))
+        phase = freqs[used][:, np.newaxis] * rads[np.newaxis, :]
+        x[:, start:stop] -= (np.dot(c.real, np.cos(phase)) -
+                             np.dot(c.imag, np.sin(phase)))
+    return x, rm_freqs
 
 
 @verbose
@@ -1346,7 +1542,8 @@ def resample(x, up, down, npad=100, axis=-1, window='boxcar', n_jobs=1,
             y[xi] = fft_resample(x_, W, new_len, npad, to_remove,
                                  cuda_dict)
     else:
-        parallel, p_fun, _ = parallel_func(fft_resample, n_jobs)
+        parallel, p_fun, _ = parallel_func(fft_resample, n_jobs,
+                                           backend='auto')
         y = parallel(p_fun(x_, W, new_len, npad, to_remove, cuda_dict)
                      for x_ in x_flat)
         y = np.array(y)
@@ -1414,6 +1611,58 @@ def _resample_stim_channels(stim_data, up, down):
     return stim_resampled
 
 
+def _analytic_signal(x, backend):
+    """Compute the analytic signal along the last axis with a fast FFT"""
+    n_times = x.shape[-1]
+    n_fft = next_fast_len(n_times)
+    n_pos = n_fft // 2 + 1
+    h = np.zeros(n_pos)
+    h[0] = 1.
+    h[1:(n_fft + 1) // 2] = 2.
+    if n_fft % 2 == 0:
+        h[-1] = 1.
+    x_a = np.zeros(x.shape[:-1] + (n_fft,), np.complex128)
+    x_a[..., :n_pos] = backend.rfft(x, n_fft) * h
+    return backend.ifft(x_a)[..., :n_times]
+
+
+def _hilbert_windowed(read_data, out, out_rows, n_times, n_chunk, kind,
+                      n_jobs):
+    """Compute the analytic signal, its envelope or its phase in chunks
+
+    Each chunk of n_chunk samples is transformed together with up to n_chunk
+    samples on each side to limit the edge effects. The result for a chunk
+    is written to out only after the next chunk has been read, so read_data
+    can read from out itself.
+    """
+    n_jobs = check_n_jobs(n_jobs)
+    backend = get_fft_backend()
+    if n_jobs > 1:
+        parallel, p_fun, _ = parallel_func(_analytic_signal, n_jobs,
+                                           backend='threads')
+    pending = None
+    for start in range(0, n_times, n_chunk):
+        stop = min(start + n_chunk, n_times)
+        read_start = max(start - n_chunk, 0)
+        x = read_data(read_start, min(stop + n_chunk, n_times))
+        if pending is not None:
+            out[out_rows, pending[0]:pending[1]] = pending[2]
+        if n_jobs == 1:
+            x_a = _analytic_signal(x, backend)
+        else:
+            x_a = np.concatenate(parallel(
+                p_fun(x_split, backend)
+                for x_split in np.array_split(x, min(n_jobs, len(x)))))
+        x_a = x_a[:, start - read_start:stop - read_start]
+        if kind == 'envelope':
+            x_a = np.abs(x_a)
+        elif kind == 'phase':
+            x_a = np.angle(x_a)
+        pending = (start, stop, x_a)
+    if pending is not None:
+        out[out_rows, pending[0]:pending[1]] = pending[2]
+
+
 def detrend(x, order=1, axis=-1):
     """Detrend the array x.
 
@@ -1497,6 +1746,225 @@ def _get_filter_length(filter_length, sfreq, min_length=128, len_x=np.inf):
     return filter_length
 
 
+def _group_delay(b, a, freq, step=1e-5):
+    """Group delay (in samples) of a digital filter at a normalized freq"""
+    from scipy.signal import freqz
+    w = np.pi * freq + np.array([-step, step])
+    _, h = freqz(b, a, worN=w)
+    return -np.angle(h[1] / h[0]) / (2 * step)
+
+
+class StreamingFilter(object):
+    """Causal filter that keeps its state between consecutive data blocks
+
+    Unlike the (zero-phase) filtering functions in this module, which need
+    the whole signal, this filter processes data arriving in blocks, e.g.
+    the buffers of a :class:`mne.realtime.RtClient`, such that filtering
+    the blocks one after the other gives the same result as filtering their
+    concatenation. The filter is causal, so its output is delayed with
+    respect to its input (see the ``delay`` attribute).
+
+    l_freq and h_freq are the frequencies below which and above which,
+    respectively, to filter out of the data. Thus the uses are:
+
+        * ``l_freq < h_freq``: band-pass filter
+        * ``l_freq > h_freq``: band-stop filter
+        * ``l_freq is not None and h_freq is None``: high-pass filter
+        * ``l_freq is None and h_freq is not None``: low-pass filter
+
+    Parameters
+    ----------
+    sfreq : float
+        The sampling frequency in Hz.
+    l_freq : float | None
+        Low cut-off frequency in Hz. If None the data are only low-passed.
+    h_freq : float | None
+        High cut-off frequency in Hz. If None the data are only high-passed.
+    filter_length : str (Default: '10s') | int
+        Length of the FIR filter to use (only used with method='fft'). If
+        int, the filter has (about) this number of taps. If str, a
+        human-readable time in units of "s" or "ms" (e.g., "10s" or "5500ms")
+        will be converted to the shortest power-of-two length at least that
+        duration. The delay of the filter is half its length.
+    l_trans_bandwidth : float
+        Width of the transition band at the low cut-off frequency in Hz.
+        Not used if 'order' is specified in iir_params.
+    h_trans_bandwidth : float
+        Width of the transition band at the high cut-off frequency in Hz.
+        Not used if 'order' is specified in iir_params.
+    method : str
+        'fft' will use a linear-phase FIR filter applied with FFTs. 'iir'
+        will use IIR forward filtering (see scipy.signal.lfilter).
+    iir_params : dict | None
+        Dictionary of parameters to use for IIR filtering.
+        See mne.filter.construct_iir_filter for details. If iir_params
+        is None and method="iir", 4th order Butterworth will be used.
+    picks : array-like of int | None
+        Indices of the channels (rows of the data blocks) to filter. The
+        other channels are returned unchanged. If None all channels are
+        filtered.
+    verbose : bool, str, int, or None
+        If not None, override default verbose level (see mne.verbose).
+
+    Attributes
+    ----------
+    b : array
+        The numerator coefficients of the filter (the FIR filter taps if
+        method == 'fft').
+    a : array
+        The denominator coefficients of the filter (``[1.]`` if
+        method == 'fft').
+    delay : float
+        The group delay of the filter in samples. FIR filters are
+        linear-phase, so all frequencies are delayed by ``(len(b) - 1) / 2``
+        samples. IIR filters are not, and the delay is evaluated at the
+        center of the pass-band (at 0 Hz for low-pass and band-stop filters).
+
+    Notes
+    -----
+    Before the first block, the signal is assumed to have been constant
+    (equal to the first sample of each channel), which avoids a large
+    transient at the start of high-pass filtered data.
+
+    Each block is processed in time proportional to its length (plus the
+    filter length for FIR filters), so the cost does not grow with the
+    amount of data already processed.
+
+    .. versionadded:: 0.10
+    """
+    @verbose
+    def __init__(self, sfreq, l_freq, h_freq, filter_length='10s',
+                 l_trans_bandwidth=0.5, h_trans_bandwidth=0.5, method='fft',
+                 iir_params=None, picks=None, verbose=None):
+        iir_params = _check_method(method, iir_params, [])
+        if l_freq is None and h_freq is None:
+            raise ValueError('At least one of l_freq and h_freq must be '
+                             'specified')
+        sfreq = float(sfreq)
+        nyq = sfreq / 2.
+        if l_freq is not None and h_freq is not None and l_freq > h_freq:
+            # band-stop
+            f_pass = [h_freq, l_freq]
+            f_stop = [h_freq + h_trans_bandwidth, l_freq - l_trans_bandwidth]
+            btype, ref_freq = 'bandstop', 0.
+            freq = [0, f_pass[0], f_stop[0], f_stop[1], f_pass[1], nyq]
+            gain = [1, 1, 0, 0, 1, 1]
+        elif l_freq is not None and h_freq is not None:
+            f_pass = [l_freq, h_freq]
+            f_stop = [l_freq - l_trans_bandwidth, h_freq + h_trans_bandwidth]
+            btype, ref_freq = 'bandpass', (l_freq + h_freq) / 2.
+            freq = [0, f_stop[0], f_pass[0], f_pass[1], f_stop[1], nyq]
+            gain = [0, 0, 1, 1, 0, 0]
+        elif l_freq is not None:
+            f_pass, f_stop = l_freq, l_freq - l_trans_bandwidth
+            btype, ref_freq = 'high', (l_freq + nyq) / 2.
+            freq = [0, f_stop, f_pass, nyq]
+            gain = [0, 0, 1, 1]
+        else:
+            f_pass, f_stop = h_freq, h_freq + h_trans_bandwidth
+            btype, ref_freq = 'low', 0.
+            freq = [0, f_pass, f_stop, nyq]
+            gain = [1, 1, 0, 0]
+        freq = np.array(freq, float)
+        if method == 'fft':
+            if freq[1] <= 0 or freq[-2] > nyq or np.any(np.diff(freq) < 0):
+                raise ValueError('Filter specification invalid: the '
+                                 'transition bands (%s) must lie between 0 '
+                                 'and the Nyquist frequency (%s Hz) without '
+                                 'overlapping' % (freq[1:-1], nyq))
+            filter_length = _get_filter_length(filter_length, sfreq)
+            if not isinstance(filter_length, integer_types):
+                raise ValueError('filter_length must be str or int for '
+                                 'streaming filters')
+            self.b = _fir_kernel(sfreq, freq / nyq, np.array(gain, float),
+                                 filter_length, zero_phase=False)
+            self.a = np.array([1.])
+            self.delay = (len(self.b) - 1) / 2.
+        else:
+            iir_params = construct_iir_filter(iir_params, f_pass, f_stop,
+                                              sfreq, btype)
+            self.b = np.atleast_1d(np.array(iir_params['b'], float))
+            self.a = np.atleast_1d(np.array(iir_params['a'], float))
+            _check_coefficients(self.b, self.a)
+            self.delay = float(_group_delay(self.b, self.a, ref_freq / nyq))
+        self.method = method
+        self.sfreq = sfreq
+        self.picks = None if picks is None else np.asarray(picks, int)
+        self._h_fft = dict()
+        self.reset()
+        logger.info('Streaming %s filter with a delay of %0.1f samples '
+                    '(%0.3f sec)' % (method.upper(), self.delay,
+                                     self.delay / sfreq))
+
+    def __repr__(self):
+        return ('<StreamingFilter | %s, %d coefficients, delay: %0.1f '
+                'samples>' % (self.method, len(self.b) + len(self.a) - 1,
+                              self.delay))
+
+    def reset(self):
+        """Forget the filter state, e.g. to start a new recording"""
+        self._state = None
+
+    def _init_state(self, x0):
+        """Set the state for a signal that was constant before x0"""
+        x0 = x0[:, np.newaxis]
+        if self.method == 'fft':
+            # the tail of the convolution of h with the constant past
+            tail = np.cumsum(self.b[::-1])[::-1][1:]
+            self._state = x0 * tail
+        else:
+            from scipy.signal import lfilter_zi
+            self._state = x0 * lfilter_zi(self.b, self.a)
+
+    def process(self, data):
+        """Filter the next block of data
+
+        Parameters
+        ----------
+        data : array, shape (n_channels, n_times)
+            The next block of data. The number of channels must be the same
+            for all blocks, but their lengths can differ.
+
+        Returns
+        -------
+        data_filt : array, shape (n_channels, n_times)
+            The filtered block (a copy of data if no channels are picked).
+            The float32 and float64 dtypes are preserved.
+        """
+        data = np.array(data, copy=True)
+        if data.ndim != 2:
+            raise ValueError('data must be 2D (n_channels, n_times), got '
+                             'shape %s' % (data.shape,))
+        if data.dtype not in (np.float32, np.float64):
+            data = data.astype(np.float64)
+        picks = np.arange(len(data)) if self.picks is None else self.picks
+        x = data[picks].astype(np.float64)
+        if self._state is None:
+            if x.shape[1] == 0:
+                return data
+            self._init_state(x[:, 0])
+        elif len(self._state) != len(x):
+            raise ValueError('The number of channels changed from %d to %d, '
+                             'use reset() to start a new stream'
+                             % (len(self._state), len(x)))
+        if self.method == 'fft':
+            n_times, n_h = x.shape[1], len(self.b)
+            n_fft = next_fast_len(n_times + n_h - 1)
+            backend = get_fft_backend()
+            if n_fft not in self._h_fft:
+                self._h_fft[n_fft] = backend.rfft(self.b, n_fft)
+            y = backend.irfft(backend.rfft(x, n_fft) * self._h_fft[n_fft],
+                              n_fft)[:, :n_times + n_h - 1]
+            y[:, :n_h - 1] += self._state
+            x, self._state = y[:, :n_times], y[:, n_times:]
+        else:
+            from scipy.signal import lfilter
+            x, self._state = lfilter(self.b, self.a, x, axis=-1,
+                                     zi=self._state)
+        data[picks] = x
+        return data
+
+
 class FilterMixin(object):
     """Object for Epoch/Evoked filtering"""
 
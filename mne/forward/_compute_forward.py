@@ -86,7 +86,8 @@ def _lin_field_coeff(surf, mult, rmags, cosmags, ws, n_int, n_jobs):
         Linear coefficients with lead fields for each BEM vertex on each sensor
         (?)
     """
-    parallel, p_fun, _ = parallel_func(_do_lin_field_coeff, n_jobs)
+    parallel, p_fun, _ = parallel_func(_do_lin_field_coeff, n_jobs,
+                                       backend='auto')
     nas = np.array_split
     coeffs = parallel(p_fun(surf['rr'], t, tn, ta, rmags, cosmags, ws, n_int)
                       for t, tn, ta in zip(nas(surf['tris'], n_jobs),
@@ -409,7 +410,8 @@ def _bem_pot_or_field(rr, mri_rr, mri_Q, coils, solution, bem_rr, n_jobs,
     # Both MEG and EEG have the inifinite-medium potentials
     # This could be just vectorized, but eats too much memory, so instead we
     # reduce memory by chunking within _do_inf_pots and parallelize, too:
-    parallel, p_fun, _ = parallel_func(_do_inf_pots, n_jobs)
+    parallel, p_fun, _ = parallel_func(_do_inf_pots, n_jobs,
+                                       backend='threads')
     nas = np.array_split
     B = np.sum(parallel(p_fun(mri_rr, sr.copy(), mri_Q, sol.copy())
                         for sr, sol in zip(nas(bem_rr, n_jobs),
@@ -420,7 +422,8 @@ def _bem_pot_or_field(rr, mri_rr, mri_Q, coils, solution, bem_rr, n_jobs,
     # Only MEG coils are sensitive to the primary current distribution.
     if coil_type == 'meg':
         # Primary current contribution (can be calc. in coil/dipole coords)
-        parallel, p_fun, _ = parallel_func(_do_prim_curr, n_jobs)
+        parallel, p_fun, _ = parallel_func(_do_prim_curr, n_jobs,
+                                           backend='threads')
         pcc = np.concatenate(parallel(p_fun(rr, c)
                                       for c in nas(coils, n_jobs)), axis=1)
         B += pcc
@@ -499,7 +502,7 @@ def _sphere_pot_or_field(rr, mri_rr, mri_Q, coils, sphere, bem_rr,
                          n_jobs, coil_type):
     """Do potential or field for spherical model."""
     fun = _eeg_spherepot_coil if coil_type == 'eeg' else _sphere_field
-    parallel, p_fun, _ = parallel_func(fun, n_jobs)
+    parallel, p_fun, _ = parallel_func(fun, n_jobs, backend='auto')
     B = np.concatenate(parallel(p_fun(r, coils, sphere)
                        for r in np.array_split(rr, n_jobs)))
     return B
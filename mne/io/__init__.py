@@ -5,32 +5,29 @@
 #
 # License: BSD (3-clause)
 
-from .open import fiff_open, show_fiff, _fiff_get_fid
-from .meas_info import read_fiducials, write_fiducials, read_info, write_info
+from ..utils import _lazy_import
 
-from .proj import make_eeg_average_ref_proj
-from . import array
-from . import base
-from . import brainvision
-from . import bti
-from . import constants
-from . import edf
-from . import egi
-from . import fiff
-from . import kit
-from . import pick
-
-from .array import RawArray
-from .brainvision import read_raw_brainvision
-from .bti import read_raw_bti
-from .edf import read_raw_edf
-from .egi import read_raw_egi
-from .kit import read_raw_kit, read_epochs_kit
-from .fiff import read_raw_fif
-
-# for backward compatibility
-from .fiff import RawFIF
-from .fiff import RawFIF as Raw
-from .base import concatenate_raws
-from .chpi import  get_chpi_positions
-from .reference import set_eeg_reference, set_bipolar_reference, add_reference_channels
+# The readers (and the rest of the public API) are imported when first
+# accessed with Python >= 3.7, see mne/__init__.py
+_lazy_attrs = [
+    ('open', ['fiff_open', 'show_fiff', '_fiff_get_fid']),
+    ('meas_info', ['read_fiducials', 'write_fiducials', 'read_info',
+                   'write_info']),
+    ('proj', ['make_eeg_average_ref_proj']),
+    ('array', ['RawArray']),
+    ('brainvision', ['read_raw_brainvision']),
+    ('bti', ['read_raw_bti']),
+    ('edf', ['read_raw_edf']),
+    ('egi', ['read_raw_egi']),
+    ('kit', ['read_raw_kit', 'read_epochs_kit']),
+    # RawFIF is also available as Raw for backward compatibility
+    ('fiff', ['read_raw_fif', 'RawFIF', ('Raw', 'RawFIF')]),
+    ('base', ['concatenate_raws']),
+    ('chpi', ['get_chpi_positions']),
+    ('reference', ['set_eeg_reference', 'set_bipolar_reference',
+                   'add_reference_channels']),
+]
+_submodules = ['array', 'base', 'brainvision', 'bti', 'constants', 'edf',
+               'egi', 'fiff', 'kit', 'pick']
+__getattr__, __dir__, __all__ = _lazy_import(globals(), _lazy_attrs,
+                                             _submodules)
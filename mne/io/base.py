@@ -31,14 +31,15 @@ from .write import (start_file, end_file, start_block, end_block,
 
 from ..filter import (low_pass_filter, high_pass_filter, band_pass_filter,
                       notch_filter, band_stop_filter, resample,
-                      _resample_stim_channels)
+                      _resample_stim_channels, _check_notch_widths,
+                      _mt_window_length, _mt_spectrum_windowed,
+                      _mt_log_freqs, _hilbert_windowed)
 from ..fixes import in1d
 from ..parallel import parallel_func
 from ..utils import (_check_fname, _check_pandas_installed,
                      _check_pandas_index_arguments,
                      check_fname, _get_stim_channel, object_hash,
                      logger, verbose, _time_mask)
-from ..viz import plot_raw, plot_raw_psd
 from ..defaults import _handle_default
 from ..externals.six import string_types
 from ..event import find_events, concatenate_events
@@ -639,7 +640,8 @@ class _BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
                 self._data[p, :] = data_picks_new[pp]
 
     @verbose
-    def apply_hilbert(self, picks, envelope=False, n_jobs=1, verbose=None):
+    def apply_hilbert(self, picks, envelope=False, n_jobs=1, phase=False,
+                      chunk_duration=None, verbose=None):
         """ Compute analytic signal or envelope for a subset of channels.
 
         If envelope=False, the analytic signal for the channels defined in
@@ -650,6 +652,9 @@ class _BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
         channels defined in "picks" is computed, resulting in the envelope
         signal.
 
+        If phase=True, the angle of the analytic signal (the instantaneous
+        phase, in radians) is computed instead.
+
         Note: DO NOT use envelope=True if you intend to compute an inverse
               solution from the raw data. If you want to compute the
               envelope in source space, use envelope=False and compute the
@@ -663,6 +668,12 @@ class _BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
               "len(picks) * n_times" additional time points need to be
               temporaily stored in memory.
 
+        Note: If chunk_duration is not None, the computation is done in
+              chunks, so that only a few chunks of complex data are stored
+              in memory at a time, and the envelope or phase is written
+              directly to the (real-valued) data. The data are then loaded
+              chunk by chunk if the Raw object was not preloaded.
+
         Parameters
         ----------
         picks : array-like of int
@@ -671,6 +682,18 @@ class _BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
             Compute the envelope signal of each channel.
         n_jobs: int
             Number of jobs to run in parallel.
+        phase : bool (default: False)
+            Compute the instantaneous phase of each channel. Cannot be used
+            together with envelope=True.
+        chunk_duration : float | None
+            If not None, the duration (in seconds) of the chunks in which
+            the analytic signal is computed. Each chunk is padded on both
+            sides with the same duration of data to limit edge effects,
+            which are small when this duration is much longer than the
+            period of the lowest frequency present in the data (e.g., after
+            band-pass filtering). If None (default), the analytic signal of
+            each channel is computed at once, which requires the data to be
+            preloaded.
         verbose : bool, str, int, or None
             If not None, override default verbose level (see mne.verbose).
             Defaults to self.verbose.
@@ -688,12 +711,55 @@ class _BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
         MNE inverse solution, the enevlope in source space can be obtained
         by computing the analytic signal in sensor space, applying the MNE
         inverse, and computing the envelope in source space.
+
+        .. versionadded:: 0.10
+           The ``phase`` and ``chunk_duration`` parameters.
         """
-        if envelope:
-            self.apply_function(_envelope, picks, None, n_jobs)
+        if envelope and phase:
+            raise ValueError('envelope and phase cannot both be True')
+        if chunk_duration is None:
+            if envelope:
+                self.apply_function(_envelope, picks, None, n_jobs)
+            elif phase:
+                self.apply_function(_phase, picks, None, n_jobs)
+            else:
+                from scipy.signal import hilbert
+                self.apply_function(hilbert, picks, np.complex64, n_jobs)
+            return
+
+        n_chunk = int(round(chunk_duration * self.info['sfreq']))
+        if n_chunk < 1:
+            raise ValueError('chunk_duration must be at least one sample '
+                             'long, got %s sec' % chunk_duration)
+        if picks is None:
+            picks = pick_types(self.info, meg=True, eeg=True, exclude=[])
+        picks = np.unique(picks)
+        if len(picks) == 0:
+            raise ValueError('picks must contain at least one channel')
+        kind = 'envelope' if envelope else 'phase' if phase else 'analytic'
+        dtype = np.complex64 if kind == 'analytic' else None
+        if self.preload:
+            if dtype is not None and dtype != self._data.dtype:
+                self._data = self._data.astype(dtype)
+
+            def read_data(start, stop):
+                return self._data[picks, start:stop].real
+            _hilbert_windowed(read_data, self._data, picks, self.n_times,
+                              n_chunk, kind, n_jobs)
         else:
-            from scipy.signal import hilbert
-            self.apply_function(hilbert, picks, np.complex64, n_jobs)
+            others = np.setdiff1d(np.arange(self.info['nchan']), picks)
+            data = np.zeros((self.info['nchan'], self.n_times),
+                            self._dtype if dtype is None else dtype)
+
+            def read_data(start, stop):
+                this_data = self._read_segment(start, stop)[0]
+                data[others, start:stop] = this_data[others]
+                return this_data[picks]
+            _hilbert_windowed(read_data, data, picks, self.n_times, n_chunk,
+                              kind, n_jobs)
+            self._data = data
+            self.preload = True
+            self.close()
 
     @verbose
     def filter(self, l_freq, h_freq, picks=None, filter_length='10s',
@@ -844,13 +910,17 @@ class _BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
     def notch_filter(self, freqs, picks=None, filter_length='10s',
                      notch_widths=None, trans_bandwidth=1.0, n_jobs=1,
                      method='fft', iir_params=None,
-                     mt_bandwidth=None, p_value=0.05, verbose=None):
+                     mt_bandwidth=None, p_value=0.05, mt_window=None,
+                     verbose=None):
         """Notch filter a subset of channels.
 
         Applies a zero-phase notch filter to the channels selected by
         "picks". The data of the Raw object is modified inplace.
 
-        The Raw object has to be constructed using preload=True (or string).
+        The Raw object has to be constructed using preload=True (or string),
+        unless method='spectrum_fit' and mt_window is not None. In that
+        case, the data are read and cleaned window by window and the
+        cleaned data are then stored in memory.
 
         Note: If n_jobs > 1, more memory is required as "len(picks) * n_times"
               additional time points need to be temporaily stored in memory.
@@ -897,6 +967,12 @@ class _BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
             sinusoidal components to remove when method='spectrum_fit' and
             freqs=None. Note that this will be Bonferroni corrected for the
             number of frequencies, so large p-values may be justified.
+        mt_window : float | None
+            Length (in seconds) of the half-overlapping sliding windows used
+            in 'spectrum_fit' mode. If None (default), the whole recording
+            is used as a single window.
+
+            .. versionadded:: 0.10
         verbose : bool, str, int, or None
             If not None, override default verbose level (see mne.verbose).
             Defaults to self.verbose.
@@ -920,6 +996,11 @@ class _BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
                                    'your Raw object. Please contact the '
                                    'MNE-Python developers.')
         if not self.preload:
+            if method == 'spectrum_fit' and mt_window is not None:
+                self._notch_filter_windowed(fs, freqs, picks, notch_widths,
+                                            mt_bandwidth, p_value, mt_window,
+                                            n_jobs)
+                return
             raise RuntimeError('Raw data needs to be preloaded to filter. Use '
                                'preload=True (or string) in the constructor.')
 
@@ -929,7 +1010,32 @@ class _BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
                                   trans_bandwidth=trans_bandwidth,
                                   method=method, iir_params=iir_params,
                                   mt_bandwidth=mt_bandwidth, p_value=p_value,
-                                  picks=picks, n_jobs=n_jobs, copy=False)
+                                  picks=picks, n_jobs=n_jobs, copy=False,
+                                  mt_window=mt_window)
+
+    def _notch_filter_windowed(self, sfreq, freqs, picks, notch_widths,
+                               mt_bandwidth, p_value, mt_window, n_jobs):
+        """Helper to remove sinusoids while reading windows from disk"""
+        if freqs is not None:
+            freqs = np.atleast_1d(freqs)
+        notch_widths = _check_notch_widths(freqs, notch_widths)
+        picks = np.unique(picks)
+        others = np.setdiff1d(np.arange(self.info['nchan']), picks)
+        n_win = _mt_window_length(mt_window, sfreq, self.n_times)
+        data = np.zeros((self.info['nchan'], self.n_times), self._dtype)
+
+        def read_data(start, stop):
+            this_data = self._read_segment(start, stop)[0]
+            data[others, start:stop] = this_data[others]
+            return this_data[picks]
+
+        freq_list = _mt_spectrum_windowed(
+            read_data, data, picks, self.n_times, sfreq, freqs, notch_widths,
+            mt_bandwidth, p_value, n_win, n_jobs)
+        _mt_log_freqs(freq_list, freqs)
+        self._data = data
+        self.preload = True
+        self.close()
 
     @verbose
     def resample(self, sfreq, npad=100, window='boxcar', stim_picks=None,
@@ -1355,6 +1461,7 @@ class _BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
         series. The changes will be reflected immediately in the raw object's
         ``raw.info['bads']`` entry.
         """
+        from ..viz import plot_raw
         return plot_raw(self, events, duration, start, n_channels, bgcolor,
                         color, bad_color, event_color, scalings, remove_dc,
                         order, show_options, title, show, block, highpass,
@@ -1413,6 +1520,7 @@ class _BaseRaw(ProjMixin, ContainsMixin, UpdateChannelsMixin,
         fig : instance of matplotlib figure
             Figure distributing one image per channel across sensor topography.
         """
+        from ..viz import plot_raw_psd
         return plot_raw_psd(self, tmin=tmin, tmax=tmax, fmin=fmin, fmax=fmax,
                             proj=proj, n_fft=n_fft, picks=picks, ax=ax,
                             color=color, area_mode=area_mode,
@@ -2067,6 +2175,12 @@ def _envelope(x):
     return np.abs(hilbert(x))
 
 
+def _phase(x):
+    """ Compute instantaneous phase signal """
+    from scipy.signal import hilbert
+    return np.angle(hilbert(x))
+
+
 def _check_raw_compatibility(raw):
     """Check to make sure all instances of Raw
     in the input list raw have compatible parameters"""
@@ -723,6 +723,78 @@ def test_filter():
     assert_array_almost_equal(data, data_notch, sig_dec_notch_fit)
 
 
+def test_notch_filter_windowed():
+    """Test windowed sinusoid removal on non-preloaded raw data"""
+    tempdir = _TempDir()
+    sfreq = 500.
+    rng = np.random.RandomState(0)
+    t = np.arange(int(10 * sfreq)) / sfreq
+    data = 1e-12 * (rng.randn(3, len(t)) + np.sin(2 * np.pi * 60. * t))
+    info = create_info(['MEG1', 'MEG2', 'STI'], sfreq,
+                       ['grad', 'grad', 'stim'])
+    fname = op.join(tempdir, 'test_raw.fif')
+    RawArray(data, info).save(fname)
+    picks = pick_types(info, meg=True)
+    kwargs = dict(picks=picks, method='spectrum_fit', mt_window=2.)
+    raw = Raw(fname, preload=True)
+    raw.notch_filter(60., **kwargs)
+    raw_stream = Raw(fname, preload=False)
+    raw_stream.notch_filter(60., **kwargs)
+    assert_true(raw_stream.preload)
+    assert_allclose(raw_stream[:][0], raw[:][0], rtol=1e-6, atol=1e-20)
+    assert_array_equal(raw_stream[2][0], Raw(fname)[2][0])
+    assert_true(np.std(raw[picks][0]) < 0.8 * np.std(data[picks]))
+    # other methods still need preloaded data
+    assert_raises(RuntimeError, Raw(fname).notch_filter, 60.,
+                  method='spectrum_fit')
+
+
+def test_hilbert_chunked():
+    """Test chunked computation of the envelope and phase"""
+    from scipy.signal import hilbert
+    tempdir = _TempDir()
+    sfreq = 500.
+    rng = np.random.RandomState(0)
+    t = np.arange(int(10 * sfreq)) / sfreq
+    env = 1. + 0.5 * np.sin(2 * np.pi * 0.5 * t)
+    data = 1e-12 * np.array([env * np.sin(2 * np.pi * 20. * t),
+                             env * np.cos(2 * np.pi * 30. * t),
+                             rng.randn(len(t))])
+    info = create_info(['MEG1', 'MEG2', 'STI'], sfreq,
+                       ['grad', 'grad', 'stim'])
+    fname = op.join(tempdir, 'test_raw.fif')
+    RawArray(data, info).save(fname)
+    picks = pick_types(info, meg=True)
+    data = Raw(fname)[:][0]  # saved in single precision
+    analytic = hilbert(data[picks])
+    inner = slice(int(sfreq), -int(sfreq))  # the full FFT has edge effects
+    for preload in (True, False):
+        for kwargs, expected in ((dict(envelope=True), np.abs(analytic)),
+                                 (dict(phase=True), np.angle(analytic)),
+                                 (dict(), analytic)):
+            raw = Raw(fname, preload=preload)
+            raw.apply_hilbert(picks, chunk_duration=1., **kwargs)
+            assert_true(raw.preload)
+            assert_equal(np.iscomplexobj(raw._data), kwargs == dict())
+            got = raw._data[picks, inner]
+            if kwargs.get('phase', False):  # compare modulo 2 pi
+                got, expected = np.exp(1j * got), np.exp(1j * expected)
+            assert_allclose(got, expected[:, inner], rtol=1e-2, atol=1e-14)
+            assert_allclose(raw._data[2], data[2], rtol=1e-6)
+    assert_allclose(raw._data[picks, inner].real, data[picks, inner],
+                    rtol=1e-5, atol=1e-20)
+    assert_allclose(np.abs(raw._data[picks, inner]),
+                    1e-12 * np.tile(env[inner], (2, 1)), rtol=1e-2)
+    raw = Raw(fname, preload=True)
+    raw.apply_hilbert(picks, envelope=True, chunk_duration=1., n_jobs=2)
+    assert_allclose(raw._data[picks, inner], np.abs(analytic)[:, inner],
+                    rtol=1e-2)
+    assert_raises(ValueError, raw.apply_hilbert, picks, envelope=True,
+                  phase=True)
+    assert_raises(ValueError, raw.apply_hilbert, picks, chunk_duration=0.)
+    assert_raises(RuntimeError, Raw(fname).apply_hilbert, picks)
+
+
 @testing.requires_testing_data
 def test_crop():
     """Test cropping raw files
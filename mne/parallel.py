@@ -7,8 +7,14 @@
 
 from .externals.six import string_types
 import inspect
+from itertools import chain
 import logging
+import multiprocessing
 import os
+import threading
+import traceback
+
+import numpy as np
 
 from . import get_config
 from .utils import logger, verbose
@@ -19,8 +25,20 @@ else:
     _force_serial = None
 
 
+# Stack of the worker pools that are currently active (see pool)
+_pools = list()
+
+# Executor jobs are submitted to (see set_executor)
+_executor = dict(executor=None)
+
+# With backend='auto', threads are used if an argument of the first task is
+# an array of at least this size (in bytes)
+_auto_threads_nbytes = 1e6
+
+
 @verbose
-def parallel_func(func, n_jobs, verbose=None, max_nbytes='auto'):
+def parallel_func(func, n_jobs, verbose=None, max_nbytes='auto',
+                  backend='processes'):
     """Return parallel instance with delayed function
 
     Util function to use joblib only if available
@@ -40,6 +58,14 @@ def parallel_func(func, n_jobs, verbose=None, max_nbytes='auto'):
         or a human-readable string, e.g., '1M' for 1 megabyte.
         Use None to disable memmaping of large arrays. Use 'auto' to
         use the value set using mne.set_memmap_min_size.
+    backend : str
+        Can be "processes" (default) to run the jobs in separate processes,
+        "threads" to run them in threads of the current process, which
+        avoids copying (or memory-mapping) the inputs and is faster for
+        functions that spend most of their time in code releasing the GIL
+        (e.g., NumPy, BLAS or FFT routines), or "auto" to use threads if
+        the first task has an array argument of at least 1 MB and processes
+        otherwise.
 
     Returns
     -------
@@ -49,7 +75,29 @@ def parallel_func(func, n_jobs, verbose=None, max_nbytes='auto'):
         func if not parallel or delayed(func)
     n_jobs: int
         Number of jobs >= 0
+
+    Notes
+    -----
+    If called within a :class:`pool` context and n_jobs is not 1, the
+    workers of the pool are used to run jobs in processes (and n_jobs is
+    the number of workers of the pool).
+
+    If an executor was set with :func:`set_executor` and n_jobs is not 1,
+    jobs are submitted to it, unless backend is "threads".
+
+    Within a daemonic process, e.g., a worker of a :class:`LocalExecutor`,
+    jobs that would run in processes are run serially instead, because such
+    processes cannot start child processes.
+
+    To avoid oversubscribing the CPUs, the BLAS and OpenMP libraries are
+    limited to ``budget // n_jobs`` threads while a job runs, where the
+    thread budget is given by :func:`get_thread_budget`. This requires
+    threadpoolctl, otherwise only the environment variables read by these
+    libraries when they are loaded (e.g., OMP_NUM_THREADS) are set.
     """
+    if backend not in ('processes', 'threads', 'auto'):
+        raise ValueError('backend must be "processes", "threads" or "auto", '
+                         'got %s' % (backend,))
     # for a single job, we don't need joblib
     if n_jobs == 1:
         n_jobs = 1
@@ -57,6 +105,17 @@ def parallel_func(func, n_jobs, verbose=None, max_nbytes='auto'):
         parallel = list
         return parallel, my_func, n_jobs
 
+    if multiprocessing.current_process().daemon and backend != 'threads':
+        # we are in a worker of a process pool (e.g., a job submitted to a
+        # LocalExecutor by map_subjects), which cannot start processes
+        logger.debug('Running jobs serially in a daemonic process')
+        return list, func, 1
+
+    if _executor['executor'] is not None and backend != 'threads':
+        n_jobs = check_n_jobs(n_jobs)
+        parallel = _ExecutorParallel(_executor['executor'])
+        return parallel, _get_budgeted_func(_delayed, func, n_jobs), n_jobs
+
     try:
         from joblib import Parallel, delayed
     except ImportError:
@@ -69,6 +128,72 @@ def parallel_func(func, n_jobs, verbose=None, max_nbytes='auto'):
             parallel = list
             return parallel, my_func, n_jobs
 
+    if backend != 'processes' and \
+            'backend' not in inspect.getargspec(Parallel.__init__).args:
+        logger.info('A newer version of joblib is needed to run jobs in '
+                    'threads, using processes.')
+        backend = 'processes'
+    if backend == 'processes' and len(_pools) > 0 and \
+            _pools[-1]._parallel is not None:
+        # reuse the workers of the innermost active pool
+        n_jobs = _pools[-1].n_jobs
+        return _pools[-1]._parallel, _get_budgeted_func(delayed, func,
+                                                        n_jobs), n_jobs
+
+    n_jobs = check_n_jobs(n_jobs)
+    my_func = _get_budgeted_func(delayed, func, n_jobs)
+    if backend == 'threads':
+        parallel = _get_threads_parallel(Parallel, n_jobs)
+    elif backend == 'processes':
+        parallel = Parallel(n_jobs, **_get_parallel_kwargs(Parallel,
+                                                           max_nbytes))
+    else:
+        parallel = _AutoParallel(Parallel, n_jobs, max_nbytes)
+    return parallel, my_func, n_jobs
+
+
+def _get_threads_parallel(Parallel, n_jobs):
+    """Get a joblib.Parallel instance running jobs in threads"""
+    verbose = 5 if logger.level <= logging.INFO else 0
+    return Parallel(n_jobs, backend='threading', verbose=verbose)
+
+
+def _has_large_array(task, min_nbytes):
+    """Check if a delayed task has an array argument of min_nbytes or more"""
+    _, args, kwargs = task
+    return any(isinstance(arg, np.ndarray) and arg.nbytes >= min_nbytes
+               for arg in chain(args, kwargs.values()))
+
+
+class _AutoParallel(object):
+    """Run jobs in threads or processes depending on the size of inputs
+
+    The choice is made from the arguments of the first task.
+    """
+    def __init__(self, Parallel, n_jobs, max_nbytes):
+        self.Parallel = Parallel
+        self.n_jobs = n_jobs
+        self.max_nbytes = max_nbytes
+
+    def __call__(self, iterable):
+        iterable = iter(iterable)
+        try:
+            first = next(iterable)
+        except StopIteration:
+            return list()
+        if _has_large_array(first, _auto_threads_nbytes):
+            logger.debug('Large array arguments, running jobs in threads')
+            parallel = _get_threads_parallel(self.Parallel, self.n_jobs)
+        elif len(_pools) > 0 and _pools[-1]._parallel is not None:
+            parallel = _pools[-1]._parallel
+        else:
+            parallel = self.Parallel(self.n_jobs, **_get_parallel_kwargs(
+                self.Parallel, self.max_nbytes))
+        return parallel(chain([first], iterable))
+
+
+def _get_parallel_kwargs(Parallel, max_nbytes, require_cache_dir=True):
+    """Get the keyword arguments to create a joblib.Parallel instance"""
     # check if joblib is recent enough to support memmaping
     p_args = inspect.getargspec(Parallel.__init__).args
     joblib_mmap = ('temp_folder' in p_args and 'max_nbytes' in p_args)
@@ -81,7 +206,7 @@ def parallel_func(func, n_jobs, verbose=None, max_nbytes='auto'):
         if not joblib_mmap and cache_dir is not None:
             logger.warning('"MNE_CACHE_DIR" is set but a newer version of '
                            'joblib is needed to use the memmapping pool.')
-        if joblib_mmap and cache_dir is None:
+        if joblib_mmap and cache_dir is None and require_cache_dir:
             logger.info('joblib supports memapping pool but "MNE_CACHE_DIR" '
                         'is not set in MNE-Python config. To enable it, use, '
                         'e.g., mne.set_cache_dir(\'/tmp/shm\'). This will '
@@ -92,15 +217,542 @@ def parallel_func(func, n_jobs, verbose=None, max_nbytes='auto'):
     kwargs = {'verbose': 5 if logger.level <= logging.INFO else 0}
 
     if joblib_mmap:
-        if cache_dir is None:
+        if cache_dir is None and require_cache_dir:
             max_nbytes = None  # disable memmaping
         kwargs['temp_folder'] = cache_dir
         kwargs['max_nbytes'] = max_nbytes
+    return kwargs
 
-    n_jobs = check_n_jobs(n_jobs)
-    parallel = Parallel(n_jobs, **kwargs)
-    my_func = delayed(func)
-    return parallel, my_func, n_jobs
+
+def _warm_up():
+    """Import MNE and its main dependencies in a worker"""
+    import scipy.linalg  # noqa
+    import scipy.signal  # noqa
+    import mne  # noqa
+    return os.getpid()
+
+
+class pool(object):
+    """Context manager that keeps a pool of parallel workers alive
+
+    Within the ``with`` block, the functions that use :func:`parallel_func`
+    to run in parallel (e.g., filtering, time-frequency transforms or
+    cluster-level permutation tests with ``n_jobs != 1``) reuse the workers
+    of this pool instead of starting new ones at each call, which saves
+    the cost of spawning processes and importing modules in them.
+
+    Parameters
+    ----------
+    n_jobs : int
+        The number of workers. Negative values count back from the number
+        of CPUs (e.g., -1 uses all of them).
+    warm_up : bool
+        If True (default), MNE and its main dependencies are imported in
+        the workers when entering the context, so that the first parallel
+        call does not pay for it.
+    max_nbytes : int, str, or None
+        Threshold on the size of arrays passed to the workers above which
+        they are memory-mapped (shared) instead of copied, e.g., '1M' for
+        1 megabyte (default). Contrary to :func:`parallel_func`, this does
+        not require "MNE_CACHE_DIR" to be set: if it is not, the joblib
+        default (e.g., /dev/shm) is used. Within the context, an array
+        passed to the workers several times is only written once. Use None
+        to disable memmaping. Use 'auto' to use the value set using
+        mne.set_memmap_min_size.
+    verbose : bool, str, int, or None
+        If not None, override default verbose level (see mne.verbose).
+
+    Attributes
+    ----------
+    n_jobs : int
+        The number of workers.
+
+    Notes
+    -----
+    Pools can be nested, in which case the innermost one is used. This
+    requires a version of joblib where ``joblib.Parallel`` can be used as
+    a context manager; with older versions, the workers are not reused.
+
+    .. versionadded:: 0.10
+
+    Examples
+    --------
+    Filter and epoch the data using the same 8 workers::
+
+        >>> with mne.parallel.pool(n_jobs=8):  # doctest: +SKIP
+        ...     raw.filter(1., 40., n_jobs=8)
+        ...     power = tfr_morlet(epochs, freqs, n_cycles, n_jobs=8)
+    """
+    @verbose
+    def __init__(self, n_jobs, warm_up=True, max_nbytes='1M', verbose=None):
+        self.n_jobs = check_n_jobs(n_jobs)
+        self.warm_up = warm_up
+        self.max_nbytes = max_nbytes
+        self.verbose = verbose
+        self._parallel = None
+
+    def __repr__(self):
+        status = 'active' if self._parallel is not None else 'inactive'
+        return '<pool | %d workers, %s>' % (self.n_jobs, status)
+
+    def __enter__(self):
+        if self._parallel is not None:
+            raise RuntimeError('This pool is already active')
+        if self.n_jobs > 1:
+            try:
+                from joblib import Parallel, delayed
+            except ImportError:
+                try:
+                    from sklearn.externals.joblib import Parallel, delayed
+                except ImportError:
+                    Parallel = None
+            if Parallel is None:
+                logger.warning('joblib not installed. Cannot run in '
+                               'parallel.')
+            elif not hasattr(Parallel, '__enter__'):
+                logger.warning('A newer version of joblib is needed to reuse '
+                               'workers across calls.')
+            else:
+                kwargs = _get_parallel_kwargs(Parallel, self.max_nbytes,
+                                              require_cache_dir=False)
+                self._parallel = Parallel(self.n_jobs, **kwargs)
+                self._parallel.__enter__()
+                if self.warm_up:
+                    pids = self._parallel(delayed(_warm_up)()
+                                          for _ in range(self.n_jobs))
+                    logger.info('Started a pool of %d workers (PIDs: %s)'
+                                % (self.n_jobs, ', '.join(
+                                    str(pid) for pid in sorted(set(pids)))))
+        _pools.append(self)
+        return self
+
+    def __exit__(self, *args):
+        _pools.remove(self)
+        if self._parallel is not None:
+            self._parallel.__exit__(*args)
+            self._parallel = None
+
+
+def set_executor(executor):
+    """Set the executor parallel jobs are submitted to
+
+    Parameters
+    ----------
+    executor : instance of Executor | None
+        An executor with the interface of ``concurrent.futures.Executor``,
+        i.e., with a ``submit(fn, *args, **kwargs)`` method returning a
+        future whose ``result()`` method returns the output of the job (or
+        raises its exception). This can be, e.g., a
+        :class:`LocalExecutor`, a ``concurrent.futures.ProcessPoolExecutor``
+        or the executor of a cluster scheduler. If None, jobs are run with
+        joblib again.
+
+    Returns
+    -------
+    old_executor : instance of Executor | None
+        The executor that was previously set.
+
+    Notes
+    -----
+    While an executor is set, :func:`parallel_func` (and therefore all
+    functions taking an ``n_jobs`` argument, when it is not 1) and
+    :func:`map_subjects` submit their jobs to it. The functions and
+    arguments of the jobs must then be picklable. The executor is not
+    shut down by MNE.
+
+    .. versionadded:: 0.10
+    """
+    if executor is not None and not callable(getattr(executor, 'submit',
+                                                     None)):
+        raise TypeError('executor must have a submit method, got %s'
+                        % type(executor))
+    old_executor = _executor['executor']
+    _executor['executor'] = executor
+    return old_executor
+
+
+def get_executor():
+    """Get the executor parallel jobs are submitted to
+
+    Returns
+    -------
+    executor : instance of Executor | None
+        The executor set with :func:`set_executor`, None if jobs are run
+        with joblib.
+
+    .. versionadded:: 0.10
+    """
+    return _executor['executor']
+
+
+def _delayed(func):
+    """Turn func into a function returning a (func, args, kwargs) task"""
+    def delayed_func(*args, **kwargs):
+        return func, args, kwargs
+    return delayed_func
+
+
+class _ExecutorParallel(object):
+    """Run delayed tasks with an executor, returning the results in order"""
+    def __init__(self, executor):
+        self.executor = executor
+
+    def __call__(self, iterable):
+        futures = [self.executor.submit(func, *args, **kwargs)
+                   for func, args, kwargs in iterable]
+        return [future.result() for future in futures]
+
+
+class LocalExecutor(object):
+    """Executor running jobs in a pool of local processes
+
+    This is a minimal stand-in for the executors of cluster schedulers,
+    with the ``submit`` and ``shutdown`` methods of
+    ``concurrent.futures.Executor``, which can be passed to
+    :func:`set_executor`.
+
+    Parameters
+    ----------
+    n_workers : int
+        The number of processes. Negative values count back from the number
+        of CPUs (e.g., -1 uses all of them).
+
+    Attributes
+    ----------
+    n_workers : int
+        The number of processes.
+
+    Notes
+    -----
+    The processes are started by the first call to ``submit`` and stopped
+    by ``shutdown``, which is called when exiting the executor used as a
+    context manager.
+
+    .. versionadded:: 0.10
+
+    Examples
+    --------
+    Process subjects in 4 processes::
+
+        >>> with mne.parallel.LocalExecutor(4) as executor:  # doctest: +SKIP
+        ...     mne.parallel.set_executor(executor)
+        ...     results, failures = mne.parallel.map_subjects(process,
+        ...                                                   subjects)
+        ...     mne.parallel.set_executor(None)
+    """
+    def __init__(self, n_workers=1):
+        self.n_workers = check_n_jobs(n_workers)
+        self._pool = None
+
+    def __repr__(self):
+        status = 'running' if self._pool is not None else 'stopped'
+        return '<LocalExecutor | %d workers, %s>' % (self.n_workers, status)
+
+    def submit(self, fn, *args, **kwargs):
+        """Submit a job
+
+        Parameters
+        ----------
+        fn : callable
+            The function to run, which must be picklable.
+        *args
+            The positional arguments of fn.
+        **kwargs
+            The keyword arguments of fn.
+
+        Returns
+        -------
+        future : instance of LocalFuture
+            The future of the job.
+        """
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(self.n_workers)
+        return LocalFuture(self._pool.apply_async(fn, args, kwargs))
+
+    def shutdown(self, wait=True):
+        """Stop the processes
+
+        Parameters
+        ----------
+        wait : bool
+            If True (default), wait for the submitted jobs to finish,
+            otherwise they are cancelled.
+        """
+        if self._pool is not None:
+            if wait:
+                self._pool.close()
+            else:
+                self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+
+
+class LocalFuture(object):
+    """Future of a job submitted to a LocalExecutor
+
+    Parameters
+    ----------
+    async_result : instance of multiprocessing.pool.AsyncResult
+        The pending result of the job.
+
+    .. versionadded:: 0.10
+    """
+    def __init__(self, async_result):
+        self._async_result = async_result
+
+    def done(self):
+        """Check if the job is finished
+
+        Returns
+        -------
+        done : bool
+            True if the job is finished.
+        """
+        return self._async_result.ready()
+
+    def result(self, timeout=None):
+        """Get the output of the job, waiting for it if needed
+
+        Parameters
+        ----------
+        timeout : float | None
+            The maximum number of seconds to wait. If None, there is no
+            limit.
+
+        Returns
+        -------
+        result : object
+            The output of the job. If the job raised an exception, it is
+            raised here.
+        """
+        return self._async_result.get(timeout)
+
+    def exception(self, timeout=None):
+        """Get the exception raised by the job, waiting for it if needed
+
+        Parameters
+        ----------
+        timeout : float | None
+            The maximum number of seconds to wait. If None, there is no
+            limit.
+
+        Returns
+        -------
+        exception : instance of Exception | None
+            The exception raised by the job, None if it succeeded.
+        """
+        try:
+            self.result(timeout)
+        except multiprocessing.TimeoutError:
+            raise
+        except Exception as exp:
+            return exp
+        return None
+
+
+def _run_task(func, subject, args, kwargs):
+    """Run a task, returning its output or its exception and traceback"""
+    try:
+        return func(subject, *args, **kwargs), None, None
+    except Exception as exp:
+        return None, exp, traceback.format_exc()
+
+
+@verbose
+def map_subjects(func, subjects, args=(), kwargs=None, n_jobs=1,
+                 verbose=None):
+    """Run a function on each subject, collecting results and failures
+
+    Parameters
+    ----------
+    func : callable
+        The function, called as ``func(subject, *args, **kwargs)``. When
+        run in parallel, it must be picklable (e.g., defined at the module
+        level).
+    subjects : list
+        The subjects (e.g., names), which must be hashable.
+    args : tuple
+        Additional positional arguments of func.
+    kwargs : dict | None
+        Keyword arguments of func.
+    n_jobs : int
+        Number of subjects processed in parallel, in local processes, if
+        no executor was set with :func:`set_executor`.
+    verbose : bool, str, int, or None
+        If not None, override default verbose level (see mne.verbose).
+
+    Returns
+    -------
+    results : dict
+        The outputs of func for the subjects it succeeded for.
+    failures : dict
+        The exceptions raised by func for the other subjects. The
+        tracebacks are logged as warnings.
+
+    Notes
+    -----
+    A failure does not stop the processing of the other subjects.
+
+    .. versionadded:: 0.10
+    """
+    subjects = list(subjects)
+    if len(set(subjects)) != len(subjects):
+        raise ValueError('subjects must be unique')
+    kwargs = dict() if kwargs is None else kwargs
+    executor = _executor['executor']
+    own_executor = executor is None and check_n_jobs(n_jobs) > 1
+    if own_executor:
+        executor = LocalExecutor(n_jobs)
+    try:
+        if executor is None:
+            outs = [_run_task(func, subject, args, kwargs)
+                    for subject in subjects]
+        else:
+            futures = [executor.submit(_run_task, func, subject, args, kwargs)
+                       for subject in subjects]
+            outs = list()
+            for future in futures:
+                try:
+                    outs.append(future.result())
+                except Exception as exp:  # e.g., the task could not be run
+                    outs.append((None, exp, '%s: %s'
+                                 % (type(exp).__name__, exp)))
+    finally:
+        if own_executor:
+            executor.shutdown()
+    results, failures = dict(), dict()
+    for subject, (result, exp, tb) in zip(subjects, outs):
+        if exp is None:
+            results[subject] = result
+        else:
+            logger.warning('Processing subject %s failed:\n%s'
+                           % (subject, tb))
+            failures[subject] = exp
+    logger.info('Processed %d subjects, %d failed'
+                % (len(subjects), len(failures)))
+    return results, failures
+
+
+# Environment variables controlling the size of BLAS/OpenMP thread pools
+_thread_env_vars = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS',
+                    'MKL_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS',
+                    'NUMEXPR_NUM_THREADS')
+# Number of jobs running with a thread limit in this process, and how to
+# restore the original limits once they are all done
+_thread_limit = dict(count=0, restore=None)
+_thread_limit_lock = threading.Lock()
+
+
+def get_thread_budget():
+    """Get the total number of CPU threads parallel jobs may use
+
+    The budget is shared among the jobs run by :func:`parallel_func` (and
+    therefore by all functions taking an ``n_jobs`` argument): each of the
+    ``n_jobs`` jobs can use ``budget // n_jobs`` BLAS/OpenMP threads.
+
+    Returns
+    -------
+    budget : int
+        The thread budget, given by the config variable MNE_THREAD_BUDGET
+        if set, and the number of CPUs otherwise.
+    """
+    budget = get_config('MNE_THREAD_BUDGET', None)
+    if budget is None:
+        return multiprocessing.cpu_count()
+    try:
+        budget = int(budget)
+    except ValueError:
+        budget = 0
+    if budget < 1:
+        raise ValueError('MNE_THREAD_BUDGET must be a positive integer, got '
+                         '%s' % get_config('MNE_THREAD_BUDGET'))
+    return budget
+
+
+def _get_budgeted_func(delayed, func, n_jobs):
+    """Delay func, limiting its threads to the budget of each job"""
+    budget = get_thread_budget()
+    n_threads = max(budget // n_jobs, 1)
+    logger.debug('Parallel layout: %d jobs x %d BLAS/OpenMP threads '
+                 '(thread budget: %d)' % (n_jobs, n_threads, budget))
+    return delayed(_BudgetedFunc(func, n_threads))
+
+
+class _BudgetedFunc(object):
+    """Run a function with a limited number of BLAS/OpenMP threads"""
+    def __init__(self, func, n_threads):
+        self.func = func
+        self.n_threads = n_threads
+
+    def __call__(self, *args, **kwargs):
+        with _ThreadLimit(self.n_threads):
+            # the OpenMP limit applies to the calling thread only, so it is
+            # set in each job (which may run in its own thread)
+            restore = _limit_threadpools(self.n_threads, 'openmp')
+            try:
+                return self.func(*args, **kwargs)
+            finally:
+                restore()
+
+
+class _ThreadLimit(object):
+    """Limit the BLAS threads of the process while in this context
+
+    The limit is set by the first (concurrent) user and restored when the
+    last one exits, so it can be used by jobs running in threads.
+    """
+    def __init__(self, n_threads):
+        self.n_threads = n_threads
+
+    def __enter__(self):
+        with _thread_limit_lock:
+            if _thread_limit['count'] == 0:
+                _thread_limit['restore'] = _set_thread_limit(self.n_threads)
+            _thread_limit['count'] += 1
+        return self
+
+    def __exit__(self, *args):
+        with _thread_limit_lock:
+            _thread_limit['count'] -= 1
+            if _thread_limit['count'] == 0:
+                _thread_limit['restore']()
+                _thread_limit['restore'] = None
+
+
+def _limit_threadpools(n_threads, user_api):
+    """Limit the thread pools of the loaded libraries of an API ("blas" or
+    "openmp"), returning a function to restore them"""
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return lambda: None
+    limits = threadpool_limits(limits=n_threads, user_api=user_api)
+    return (getattr(limits, 'restore_original_limits', None) or
+            limits.unregister)
+
+
+def _set_thread_limit(n_threads):
+    """Limit the BLAS threads of the process and the threads of the
+    libraries loaded later, returning a function to restore them"""
+    old_env = dict((key, os.environ.get(key)) for key in _thread_env_vars)
+    for key in _thread_env_vars:
+        os.environ[key] = str(n_threads)
+    restore_blas = _limit_threadpools(n_threads, 'blas')
+
+    def restore():
+        restore_blas()
+        for key, value in old_env.items():
+            if value is None:
+                del os.environ[key]
+            else:
+                os.environ[key] = value
+    return restore
 
 
 def check_n_jobs(n_jobs, allow_cuda=False):
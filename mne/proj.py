@@ -155,7 +155,7 @@ def compute_proj_epochs(epochs, n_grad=2, n_mag=2, n_eeg=2, n_jobs=1,
 
 def _compute_cov_epochs(epochs, n_jobs):
     """Helper function for computing epochs covariance"""
-    parallel, p_fun, _ = parallel_func(np.dot, n_jobs)
+    parallel, p_fun, _ = parallel_func(np.dot, n_jobs, backend='threads')
     data = parallel(p_fun(e, e.T) for e in epochs)
     n_epochs = len(data)
     if n_epochs == 0:
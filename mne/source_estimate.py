@@ -21,8 +21,8 @@ from .parallel import parallel_func
 from .surface import (read_surface, _get_ico_surface, read_morph_map,
                       _compute_nearest)
 from .utils import (get_subjects_dir, _check_subject, logger, verbose,
-                    _time_mask)
-from .viz import plot_source_estimates
+                    _time_mask, _get_disk_cache_fname, _read_disk_cache,
+                    _write_disk_cache)
 from .fixes import in1d, sparse_block_diag
 from .externals.six.moves import zip
 from .io.base import ToDataFrameMixin
@@ -1351,6 +1351,7 @@ class SourceEstimate(_BaseSourceEstimate):
         brain : Brain
             A instance of surfer.viz.Brain from PySurfer.
         """
+        from .viz import plot_source_estimates
         brain = plot_source_estimates(self, subject, surface=surface,
                                       hemi=hemi, colormap=colormap,
                                       time_label=time_label,
@@ -1811,6 +1812,7 @@ class MixedSourceEstimate(_BaseSourceEstimate):
         stc = SourceEstimate(data, vertices, self.tmin, self.tstep,
                              self.subject, self.verbose)
 
+        from .viz import plot_source_estimates
         return plot_source_estimates(stc, subject, surface=surface, hemi=hemi,
                                      colormap=colormap, time_label=time_label,
                                      smoothing_steps=smoothing_steps,
@@ -2374,11 +2376,11 @@ def spatio_temporal_src_connectivity(src, n_times, dist=None, verbose=None):
         lh_tris = np.searchsorted(used_verts[0], src[0]['use_tris'])
         rh_tris = np.searchsorted(used_verts[1], src[1]['use_tris'])
         tris = np.concatenate((lh_tris, rh_tris + np.max(lh_tris) + 1))
-        connectivity = spatio_temporal_tris_connectivity(tris, n_times)
+        edges = _get_tris_edges(tris)
 
         # deal with source space only using a subset of vertices
         masks = [in1d(u, s['vertno']) for s, u in zip(src, used_verts)]
-        if sum(u.size for u in used_verts) != connectivity.shape[0] / n_times:
+        if sum(u.size for u in used_verts) != edges.shape[0]:
             raise ValueError('Used vertices do not match connectivity shape')
         if [np.sum(m) for m in masks] != [len(s['vertno']) for s in src]:
             raise ValueError('Vertex mask does not match number of vertices')
@@ -2390,15 +2392,12 @@ def spatio_temporal_src_connectivity(src, n_times, dist=None, verbose=None):
                           'Consider using distance-based connectivity or '
                           'morphing data to all source space vertices.'
                           % missing)
-            masks = np.tile(masks, n_times)
+            # masking the spatial edges before adding the time dimension is
+            # the same as masking the spatio-temporal connectivity
             masks = np.where(masks)[0]
-            connectivity = connectivity.tocsr()
-            connectivity = connectivity[masks]
-            connectivity = connectivity[:, masks]
-            # return to original format
-            connectivity = connectivity.tocoo()
+            edges = edges.tocsr()[masks][:, masks].tocoo()
 
-        return connectivity
+        return _get_connectivity_from_edges(edges, n_times)
     else:  # use distances computed and saved in the source space file
         return spatio_temporal_dist_connectivity(src, n_times, dist)
 
@@ -2455,10 +2454,28 @@ def spatio_temporal_tris_connectivity(tris, n_times, remap_vertices=False,
         logger.info('Reassigning vertex indices.')
         tris = np.searchsorted(np.unique(tris), tris)
 
-    edges = mesh_edges(tris).tocoo()
+    edges = _get_tris_edges(tris)
     return _get_connectivity_from_edges(edges, n_times)
 
 
+def _get_tris_edges(tris):
+    """Get the mesh edges of triangles as a COO matrix
+
+    The edges are cached on disk if a cache directory is set (see
+    :func:`mne.set_disk_cache_dir`).
+    """
+    tris = np.asarray(tris)
+    fname = _get_disk_cache_fname('tris-edges', tris)
+    cache = _read_disk_cache(fname)
+    if cache is not None:
+        return coo_matrix((cache['data'], (cache['row'], cache['col'])),
+                          shape=tuple(cache['shape']))
+    edges = mesh_edges(tris).tocoo()
+    _write_disk_cache(fname, row=edges.row, col=edges.col, data=edges.data,
+                      shape=edges.shape)
+    return edges
+
+
 @verbose
 def spatio_temporal_dist_connectivity(src, n_times, dist, verbose=None):
     """Compute connectivity from distances in a source space and time instants
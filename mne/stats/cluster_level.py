@@ -16,9 +16,12 @@ from scipy import sparse
 
 from .parametric import f_oneway
 from ..parallel import parallel_func, check_n_jobs
-from ..utils import split_list, logger, verbose, ProgressBar
-from ..fixes import in1d, unravel_index
+from ..utils import (split_list, logger, verbose, ProgressBar,
+                     _get_disk_cache_fname, _read_disk_cache,
+                     _write_disk_cache)
+from ..fixes import in1d, unravel_index, partial
 from ..source_estimate import SourceEstimate
+from ..externals.six import string_types
 
 
 def _get_clusters_spatial(s, neighbors):
@@ -97,11 +100,11 @@ def _get_clusters_st_1step(keepers, neighbors):
     for check1, check2, k in zip(check[:-1], check[1:], keepers[:-1]):
         # go through each one that needs reassignment
         inds = k[check2[k] - check1[k] > 0]
-        check1_d = check1[inds]
         n = check2[inds]
         nexts = np.unique(n)
         for num in nexts:
-            prevs = check1_d[n == num]
+            # previous clusters may have been merged for another num
+            prevs = check1[inds[n == num]]
             base = np.min(prevs)
             for pr in np.unique(prevs[prevs != base]):
                 _reassign(check1, clusters, base, pr)
@@ -171,6 +174,10 @@ def _get_clusters_st_multistep(keepers, neighbors, max_step=1):
 
 def _get_clusters_st(x_in, neighbors, max_step=1):
     """Helper function to choose the most efficient version"""
+    cs_graph_components = _get_cs_graph_components()
+    if cs_graph_components is not None:
+        return _get_clusters_st_graph(x_in, neighbors, max_step,
+                                      cs_graph_components)
     n_src = len(neighbors)
     n_times = x_in.size // n_src
     cl_goods = np.where(x_in)[0]
@@ -199,25 +206,131 @@ def _get_clusters_st(x_in, neighbors, max_step=1):
         return []
 
 
-def _get_components(x_in, connectivity, return_list=True):
-    """get connected components from a mask and a connectivity matrix"""
+# the CSR structure of the last neighbor lists used by _get_clusters_st_graph
+_neighbors_csr = dict(neighbors=None, indptr=None, indices=None)
+
+
+def _get_neighbors_csr(neighbors):
+    """Get the CSR structure (indptr, indices) of spatial neighbor lists"""
+    if _neighbors_csr['neighbors'] is not neighbors:
+        indptr = np.cumsum([0] + [len(n) for n in neighbors])
+        if len(neighbors) > 0:
+            indices = np.concatenate(neighbors).astype(int)
+        else:
+            indices = np.array([], dtype=int)
+        _neighbors_csr.update(neighbors=neighbors, indptr=indptr,
+                              indices=indices)
+    return _neighbors_csr['indptr'], _neighbors_csr['indices']
+
+
+def _get_st_edges(x_in, neighbors, max_step):
+    """Get the spatio-temporal edges between the points of a mask
+
+    The points are connected to their spatial neighbors at the same time
+    point and to the same vertex up to max_step time points away. Returns
+    the indices of the points and the edges in terms of these indices.
+    """
+    n_src = len(neighbors)
+    n_times = x_in.size // n_src
+    idx = np.where(x_in)[0]
+    t, s = divmod(idx, n_src)
+    nodes = np.empty(x_in.size, dtype=int)
+    nodes[idx] = np.arange(len(idx))
+
+    # spatial edges: all neighbors of each node at the same time point
+    indptr, indices = _get_neighbors_csr(neighbors)
+    starts = indptr[s]
+    counts = indptr[s + 1] - starts
+    n_edges = counts.sum()
+    offsets = np.arange(n_edges) - np.repeat(np.cumsum(counts) - counts,
+                                             counts)
+    row = np.repeat(np.arange(len(idx)), counts)
+    col = (np.repeat(t * n_src, counts) +
+           indices[np.repeat(starts, counts) + offsets])
+    keep = x_in[col]
+    rows, cols = [row[keep]], [nodes[col[keep]]]
+
+    # temporal edges: the same vertex up to max_step time points later
+    for step in range(1, min(max_step, n_times - 1) + 1):
+        later = idx + step * n_src
+        keep = later < x_in.size
+        keep[keep] = x_in[later[keep]]
+        rows.append(np.where(keep)[0])
+        cols.append(nodes[later[keep]])
+    return idx, np.concatenate(rows), np.concatenate(cols)
+
+
+def _get_clusters_st_graph(x_in, neighbors, max_step, cs_graph_components):
+    """Form spatio-temporal clusters as connected components of a graph
+
+    The graph only contains the supra-threshold points, with the edges given
+    by _get_st_edges. This is equivalent to _get_clusters_st_1step and
+    _get_clusters_st_multistep.
+    """
+    x_in = x_in.astype(bool)
+    if not np.any(x_in):
+        return []
+    idx, row, col = _get_st_edges(x_in, neighbors, max_step)
+    return [idx[c] for c in _get_components_from_edges(
+        row, col, len(idx), cs_graph_components)]
+
+
+def _get_cs_graph_components():
+    """Get a function labeling the connected components of a sparse graph"""
     try:
-        from sklearn.utils._csgraph import cs_graph_components
+        from scipy.sparse.csgraph import connected_components
+        cs_graph_components = connected_components
     except ImportError:
         try:
-            from scikits.learn.utils._csgraph import cs_graph_components
+            from sklearn.utils._csgraph import cs_graph_components
         except ImportError:
             try:
-                from sklearn.utils.sparsetools import connected_components
-                cs_graph_components = connected_components
+                from scikits.learn.utils._csgraph import cs_graph_components
             except ImportError:
-                # in theory we might be able to shoehorn this into using
-                # _get_clusters_spatial if we transform connectivity into
-                # a neighbor list, and it might end up being faster anyway,
-                # but for now:
-                raise ImportError('scikit-learn must be installed')
+                try:
+                    from sklearn.utils.sparsetools import connected_components
+                    cs_graph_components = connected_components
+                except ImportError:
+                    cs_graph_components = None
+    return cs_graph_components
+
+
+def _get_components_from_edges(row, col, n_nodes, cs_graph_components):
+    """Get the lists of nodes of the connected components of a graph"""
+    if n_nodes == 0:
+        return []
+    # each node is connected to itself so that none is left unlabeled
+    nodes = np.arange(n_nodes)
+    row = np.concatenate((row, nodes))
+    col = np.concatenate((col, nodes))
+    graph = sparse.coo_matrix((np.ones(len(row)), (row, col)),
+                              shape=(n_nodes, n_nodes))
+    _, components = cs_graph_components(graph)
+    # components are labeled in the order of their first node
+    order = np.argsort(components, kind='mergesort')
+    splits = np.where(np.diff(components[order]) != 0)[0] + 1
+    return np.split(order, splits)
+
+
+def _get_components(x_in, connectivity, return_list=True):
+    """get connected components from a mask and a connectivity matrix"""
+    cs_graph_components = _get_cs_graph_components()
+    if cs_graph_components is None:
+        # in theory we might be able to shoehorn this into using
+        # _get_clusters_spatial if we transform connectivity into
+        # a neighbor list, and it might end up being faster anyway,
+        # but for now:
+        raise ImportError('scipy >= 0.11 or scikit-learn must be installed')
 
     mask = np.logical_and(x_in[connectivity.row], x_in[connectivity.col])
+    if return_list:
+        # only the points in the mask need to be labeled
+        idx = np.where(x_in)[0]
+        nodes = np.empty(len(x_in), dtype=int)
+        nodes[idx] = np.arange(len(idx))
+        return [idx[c] for c in _get_components_from_edges(
+            nodes[connectivity.row[mask]], nodes[connectivity.col[mask]],
+            len(idx), cs_graph_components)]
     data = connectivity.data[mask]
     row = connectivity.row[mask]
     col = connectivity.col[mask]
@@ -228,18 +341,7 @@ def _get_components(x_in, connectivity, return_list=True):
     data = np.concatenate((data, np.ones(len(idx), dtype=data.dtype)))
     connectivity = sparse.coo_matrix((data, (row, col)), shape=shape)
     _, components = cs_graph_components(connectivity)
-    if return_list:
-        labels = np.unique(components)
-        clusters = list()
-        for l in labels:
-            c = np.where(components == l)[0]
-            if np.any(x_in[c]):
-                clusters.append(c)
-        # logger.info("-- number of components : %d"
-        #             % np.unique(components).size)
-        return clusters
-    else:
-        return components
+    return components
 
 
 def _find_clusters(x, threshold, tail=0, connectivity=None, max_step=1,
@@ -335,7 +437,6 @@ def _find_clusters(x, threshold, tail=0, connectivity=None, max_step=1,
                             'computation (h_power=%0.2f, e_power=%0.2f)'
                             % (len(thresholds), thresholds[0], thresholds[-1],
                                h_power, e_power))
-        scores = np.zeros(x.size)
     else:
         thresholds = [threshold]
         tfce = False
@@ -348,10 +449,17 @@ def _find_clusters(x, threshold, tail=0, connectivity=None, max_step=1,
         raise RuntimeError('Threshold misconfiguration, must be monotonically'
                            ' increasing')
 
+    if tfce is True:
+        # the score of each point is the sum of the h^H * e^E for each
+        # supporting section "rectangle" h x e
+        scores = _tfce_scores(x, thresholds, tail, connectivity, max_step,
+                              include, partitions, h_power, e_power)
+        thresholds = list()
+
     # set these here just in case thresholds == []
     clusters = list()
     sums = np.empty(0)
-    for ti, thresh in enumerate(thresholds):
+    for thresh in thresholds:
         # these need to be reset on each run
         clusters = list()
         sums = np.empty(0)
@@ -370,25 +478,6 @@ def _find_clusters(x, threshold, tail=0, connectivity=None, max_step=1,
                                                 ndimage)
                 clusters += out[0]
                 sums = np.concatenate((sums, out[1]))
-        if tfce is True:
-            # the score of each point is the sum of the h^H * e^E for each
-            # supporting section "rectangle" h x e.
-            if ti == 0:
-                h = abs(thresh)
-            else:
-                h = abs(thresh - thresholds[ti - 1])
-            h = h ** h_power
-            for c in clusters:
-                # triage based on cluster storage type
-                if isinstance(c, slice):
-                    len_c = c.stop - c.start
-                elif isinstance(c, tuple):
-                    len_c = len(c)
-                elif c.dtype == bool:
-                    len_c = np.sum(c)
-                else:
-                    len_c = len(c)
-                scores[c] += h * (len_c ** e_power)
     if tfce is True:
         # each point gets treated independently
         clusters = np.arange(x.size)
@@ -476,6 +565,138 @@ def _find_clusters_1dir(x, x_in, connectivity, max_step, t_power, ndimage):
     return clusters, np.atleast_1d(sums)
 
 
+def _get_mask_edges(x_in, connectivity, max_step, partitions):
+    """Get the edges between the points of a mask for a given connectivity
+
+    Returns the indices of the points of the (raveled) mask and the edges in
+    terms of these indices. Without connectivity, the points are connected
+    to their direct neighbors along each dimension (as for ndimage.label).
+    """
+    if isinstance(connectivity, list):
+        idx, row, col = _get_st_edges(x_in.ravel(), connectivity, max_step)
+    else:
+        idx = np.where(x_in.ravel())[0]
+        nodes = np.empty(x_in.size, dtype=int)
+        nodes[idx] = np.arange(len(idx))
+        if connectivity is None:
+            inds = np.arange(x_in.size).reshape(x_in.shape)
+            row, col = list(), list()
+            for axis in range(x_in.ndim):
+                first = [slice(None)] * x_in.ndim
+                second = [slice(None)] * x_in.ndim
+                first[axis] = slice(None, -1)
+                second[axis] = slice(1, None)
+                first, second = tuple(first), tuple(second)
+                keep = np.logical_and(x_in[first], x_in[second])
+                row.append(nodes[inds[first][keep]])
+                col.append(nodes[inds[second][keep]])
+            row, col = np.concatenate(row), np.concatenate(col)
+        else:
+            row, col = connectivity.row, connectivity.col
+            keep = np.logical_and(x_in[row], x_in[col])
+            row, col = nodes[row[keep]], nodes[col[keep]]
+    if partitions is not None:
+        # clusters do not span several partitions
+        partitions = partitions.ravel()[idx]
+        keep = partitions[row] == partitions[col]
+        row, col = row[keep], col[keep]
+    return idx, row, col
+
+
+def _tfce_sweep(y, thresholds, h_power, e_power, row, col):
+    """Compute the TFCE scores of points in one sweep
+
+    This is equivalent to summing, over the thresholds T[i] below y of each
+    point, h[i] ** h_power * e[i] ** e_power, with h[i] the step between
+    consecutive thresholds and e[i] the size of the cluster (connected
+    component of {y > T[i]} with edges row, col) of the point. The points
+    are connected from the highest threshold down, and clusters are merged
+    with a union-find structure. The scores are accumulated on the roots
+    between changes of cluster size, relative to the parent of each point.
+    """
+    # level of each point, i.e. the index of the highest threshold below it
+    levels = np.searchsorted(thresholds, y) - 1
+    h = np.abs(np.diff(np.concatenate(([0.], thresholds))))
+    # the sum of the heights of the levels below k is level_h[k]
+    level_h = np.concatenate(([0.], np.cumsum(h ** h_power))).tolist()
+
+    # points start as their own cluster at their level, and the edges are
+    # added from the highest level down
+    edge_levels = np.minimum(levels[row], levels[col])
+    order = np.argsort(-edge_levels, kind='mergesort')
+    order = order[edge_levels[order] >= 0]
+
+    n_points = len(y)
+    parent = list(range(n_points))
+    size = [1] * n_points
+    since = levels.tolist()  # the level of the last size change of roots
+    acc = [0.] * n_points
+
+    def find(ii):
+        path = list()
+        while parent[ii] != ii:
+            path.append(ii)
+            ii = parent[ii]
+        # compress the path, accumulating the scores of the skipped parents
+        score = 0.
+        for jj in path[::-1]:
+            score += acc[jj]
+            acc[jj] = score
+            parent[jj] = ii
+        return ii
+
+    for level, first, second in zip(edge_levels[order].tolist(),
+                                    row[order].tolist(), col[order].tolist()):
+        first, second = find(first), find(second)
+        if first == second:
+            continue
+        # add the scores of both clusters above this level
+        below = level_h[level + 1]
+        acc[first] += (size[first] ** e_power *
+                       (level_h[since[first] + 1] - below))
+        acc[second] += (size[second] ** e_power *
+                        (level_h[since[second] + 1] - below))
+        if size[first] < size[second]:
+            first, second = second, first
+        parent[second] = first
+        acc[second] -= acc[first]
+        size[first] += size[second]
+        since[first] = level
+
+    scores = np.zeros(n_points)
+    for ii in np.where(levels >= 0)[0].tolist():
+        root = find(ii)
+        if root == ii:
+            acc[ii] += size[ii] ** e_power * level_h[since[ii] + 1]
+    for ii in np.where(levels >= 0)[0].tolist():
+        root = parent[ii]
+        scores[ii] = acc[ii] + (acc[root] if root != ii else 0.)
+    return scores
+
+
+def _tfce_scores(x, thresholds, tail, connectivity, max_step, include,
+                 partitions, h_power, e_power):
+    """Get the TFCE scores of the points of x (raveled)"""
+    scores = np.zeros(x.size)
+    if len(thresholds) == 0:
+        return scores
+    thresholds = np.asarray(thresholds, float)
+    if tail == 0:
+        tails = [(x, thresholds), (-x, thresholds)]
+    elif tail == -1:
+        tails = [(-x, -thresholds)]
+    else:  # tail == 1
+        tails = [(x, thresholds)]
+    for y, this_thresholds in tails:
+        x_in = np.logical_and(y > this_thresholds[0], include)
+        if np.any(x_in):
+            idx, row, col = _get_mask_edges(x_in, connectivity, max_step,
+                                            partitions)
+            scores[idx] += _tfce_sweep(y.ravel()[idx], this_thresholds,
+                                       h_power, e_power, row, col)
+    return scores
+
+
 def _cluster_indices_to_mask(components, n_tot):
     """Convert to the old format of clusters, which were bool arrays"""
     for ci, c in enumerate(components):
@@ -520,12 +741,35 @@ def _setup_connectivity(connectivity, n_vertices, n_times):
     else:  # use temporal adjacency algorithm
         if not round(n_vertices / float(connectivity.shape[0])) == n_times:
             raise ValueError('connectivity must be of the correct size')
+        connectivity = _get_neighbors_from_spatial(connectivity)
+    return connectivity
+
+
+def _get_neighbors_from_spatial(connectivity):
+    """Get the neighbor lists of the vertices from a spatial connectivity
+
+    The neighbors at the other time points are implied, so the
+    spatio-temporal connectivity never needs to be built. The lists are
+    cached on disk if a cache directory is set (see
+    :func:`mne.set_disk_cache_dir`).
+    """
+    connectivity = connectivity.tocoo()
+    fname = _get_disk_cache_fname(
+        'neighbors', [int(n) for n in connectivity.shape] +
+        [connectivity.row, connectivity.col])
+    cache = _read_disk_cache(fname)
+    if cache is not None:
+        indptr, indices = cache['indptr'], cache['indices']
+    else:
         # we claim to only use upper triangular part... not true here
         connectivity = (connectivity + connectivity.transpose()).tocsr()
-        connectivity = [connectivity.indices[connectivity.indptr[i]:
-                        connectivity.indptr[i + 1]] for i in
-                        range(len(connectivity.indptr) - 1)]
-    return connectivity
+        indptr, indices = connectivity.indptr, connectivity.indices
+        _write_disk_cache(fname, indptr=indptr, indices=indices)
+    indices = indices.astype(int)
+    neighbors = np.split(indices, indptr[1:-1])
+    # the CSR structure does not need to be rebuilt by _get_neighbors_csr
+    _neighbors_csr.update(neighbors=neighbors, indptr=indptr, indices=indices)
+    return neighbors
 
 
 def _do_permutations(X_full, slices, threshold, tail, connectivity, stat_fun,
@@ -596,18 +840,97 @@ def _do_permutations(X_full, slices, threshold, tail, connectivity, stat_fun,
     return max_cluster_sums
 
 
+# Maximum size (in bytes) of the statistics of a batch of permutations
+# computed at once by _do_1samp_permutations
+_perm_batch_nbytes = 2 ** 25
+
+
+def _get_1samp_signs(seed, n_samp):
+    """Get the signs of the samples for a one-sample permutation"""
+    if isinstance(seed, np.ndarray):
+        # new surrogate data with specified sign flip
+        if not seed.size == n_samp:
+            raise ValueError('rng string must be n_samples long')
+        signs = 2 * seed.astype(int) - 1
+        if not np.all(np.equal(np.abs(signs), 1)):
+            raise ValueError('signs from rng must be +/- 1')
+    else:
+        rng = np.random.RandomState(seed)
+        # new surrogate data with random sign flip
+        signs = np.sign(0.5 - rng.rand(n_samp))
+    return signs
+
+
+def _get_ttest_1samp_kwargs(stat_fun):
+    """Get the keyword arguments of stat_fun if it is ttest_1samp_no_p"""
+    if stat_fun is ttest_1samp_no_p:
+        return dict()
+    if isinstance(stat_fun, partial) and stat_fun.func is ttest_1samp_no_p \
+            and len(stat_fun.args) == 0:
+        return dict(stat_fun.keywords or {})
+    return None
+
+
+def _ttest_1samp_sign_flips(X, X2, signs, sigma=0, method='relative'):
+    """Compute ttest_1samp_no_p for a batch of sign flips at once
+
+    The means of the flipped data are obtained with a matrix product and
+    the sum of squares X2 of the data does not change with the signs.
+    """
+    if method not in ['absolute', 'relative']:
+        raise ValueError('method must be "absolute" or "relative", not %s'
+                         % method)
+    n_samp = X.shape[0]
+    mean = np.dot(signs, X)
+    mean /= n_samp
+    var = mean ** 2
+    var *= -n_samp
+    var += X2
+    var /= n_samp - 1
+    if sigma > 0:
+        if method == 'relative':
+            var += sigma * np.max(var, axis=1)[:, np.newaxis]
+        else:
+            var += sigma
+    var /= n_samp
+    np.sqrt(var, out=var)
+    mean /= var
+    return mean
+
+
 def _do_1samp_permutations(X, slices, threshold, tail, connectivity, stat_fun,
                            max_step, include, partitions, t_power, seeds,
                            sample_shape, buffer_size, progress_bar):
     n_samp, n_vars = X.shape
     assert slices is None  # should be None for the 1 sample case
 
-    if buffer_size is not None and n_vars <= buffer_size:
-        buffer_size = None  # don't use buffer for few variables
-
     # allocate space for output
     max_cluster_sums = np.empty(len(seeds), dtype=np.double)
 
+    ttest_kwargs = _get_ttest_1samp_kwargs(stat_fun)
+    if ttest_kwargs is not None:
+        # the t-test is linear in the signs, so we compute it for batches of
+        # permutations using matrix products
+        X2 = np.sum(X ** 2, axis=0)
+        n_batch = int(max(min(len(seeds),
+                              _perm_batch_nbytes // (8 * 2 * n_vars)), 1))
+        for start in range(0, len(seeds), n_batch):
+            if progress_bar is not None:
+                progress_bar.update(start + 1)
+            signs = np.array([_get_1samp_signs(seed, n_samp)
+                              for seed in seeds[start:start + n_batch]],
+                             dtype=X.dtype)
+            T_obs_surrs = _ttest_1samp_sign_flips(X, X2, signs,
+                                                  **ttest_kwargs)
+            for ii, T_obs_surr in enumerate(T_obs_surrs):
+                max_cluster_sums[start + ii] = _max_cluster_sum(
+                    T_obs_surr, sample_shape, threshold, tail, max_step,
+                    connectivity, partitions, include, t_power)
+        return max_cluster_sums
+
+    if buffer_size is not None and n_vars <= buffer_size:
+        buffer_size = None  # don't use buffer for few variables
+
     if buffer_size is not None:
         # allocate a buffer so we don't need to allocate memory in loop
         X_flip_buffer = np.empty((n_samp, buffer_size), dtype=X.dtype)
@@ -617,18 +940,7 @@ def _do_1samp_permutations(X, slices, threshold, tail, connectivity, stat_fun,
             if not (seed_idx + 1) % 32 or seed_idx == 0:
                 progress_bar.update(seed_idx + 1)
 
-        if isinstance(seed, np.ndarray):
-            # new surrogate data with specified sign flip
-            if not seed.size == n_samp:
-                raise ValueError('rng string must be n_samples long')
-            signs = 2 * seed[:, None].astype(int) - 1
-            if not np.all(np.equal(np.abs(signs), 1)):
-                raise ValueError('signs from rng must be +/- 1')
-        else:
-            rng = np.random.RandomState(seed)
-            # new surrogate data with random sign flip
-            signs = np.sign(0.5 - rng.rand(n_samp))
-            signs = signs[:, np.newaxis]
+        signs = _get_1samp_signs(seed, n_samp)[:, np.newaxis]
 
         if buffer_size is None:
             # be careful about non-writable memmap (GH#1507)
@@ -655,31 +967,63 @@ def _do_1samp_permutations(X, slices, threshold, tail, connectivity, stat_fun,
                 tmp = stat_fun(X_flip_buffer)
                 T_obs_surr[pos: pos + n_var_loop] = tmp[:n_var_loop]
 
-        # The stat should have the same shape as the samples for no conn.
-        if connectivity is None:
-            T_obs_surr.shape = sample_shape
-
-        # Find cluster on randomized stats
-        out = _find_clusters(T_obs_surr, threshold=threshold, tail=tail,
-                             max_step=max_step, connectivity=connectivity,
-                             partitions=partitions, include=include,
-                             t_power=t_power)
-        perm_clusters_sums = out[1]
-        if len(perm_clusters_sums) > 0:
-            # get max with sign info
-            idx_max = np.argmax(np.abs(perm_clusters_sums))
-            max_cluster_sums[seed_idx] = perm_clusters_sums[idx_max]
-        else:
-            max_cluster_sums[seed_idx] = 0
+        max_cluster_sums[seed_idx] = _max_cluster_sum(
+            T_obs_surr, sample_shape, threshold, tail, max_step,
+            connectivity, partitions, include, t_power)
 
     return max_cluster_sums
 
 
+def _max_cluster_sum(T_obs_surr, sample_shape, threshold, tail, max_step,
+                     connectivity, partitions, include, t_power):
+    """Find the clusters of a permutation and get the largest (with sign)"""
+    # The stat should have the same shape as the samples for no conn.
+    if connectivity is None:
+        T_obs_surr.shape = sample_shape
+
+    # Find cluster on randomized stats
+    out = _find_clusters(T_obs_surr, threshold=threshold, tail=tail,
+                         max_step=max_step, connectivity=connectivity,
+                         partitions=partitions, include=include,
+                         t_power=t_power)
+    perm_clusters_sums = out[1]
+    if len(perm_clusters_sums) > 0:
+        # get max with sign info
+        idx_max = np.argmax(np.abs(perm_clusters_sums))
+        return perm_clusters_sums[idx_max]
+    else:
+        return 0
+
+
+# Permutations done at once and at most with n_permutations='auto', and
+# confidence level of the cluster p-values used to stop early
+_auto_perm_batch = 100
+_auto_perm_max = 10000
+_auto_perm_ci = 0.99
+
+
+def _pval_ci_clear(cluster_pv, n_permutations, p_tol):
+    """Check if the confidence intervals of p-values are all beyond p_tol
+
+    The number of permutations at least as extreme as each cluster follows
+    a binomial distribution, whose Clopper-Pearson interval is used.
+    """
+    from scipy import stats
+    n = n_permutations
+    k = np.round(cluster_pv * (n + 1.) - 1.)
+    alpha = 1. - _auto_perm_ci
+    with np.errstate(invalid='ignore'):
+        lower = np.where(k > 0, stats.beta.ppf(alpha / 2., k, n - k + 1), 0.)
+        upper = np.where(k < n, stats.beta.ppf(1. - alpha / 2., k + 1, n - k),
+                         1.)
+    return bool(np.all(np.logical_or(upper < p_tol, lower > p_tol)))
+
+
 @verbose
 def _permutation_cluster_test(X, threshold, n_permutations, tail, stat_fun,
                               connectivity, verbose, n_jobs, seed, max_step,
                               exclude, step_down_p, t_power, out_type,
-                              check_disjoint, buffer_size):
+                              check_disjoint, buffer_size, p_tol=0.05):
     n_jobs = check_n_jobs(n_jobs)
     """ Aux Function
 
@@ -689,6 +1033,14 @@ def _permutation_cluster_test(X, threshold, n_permutations, tail, stat_fun,
     """
     if out_type not in ['mask', 'indices']:
         raise ValueError('out_type must be either \'mask\' or \'indices\'')
+    auto = isinstance(n_permutations, string_types)
+    if auto:
+        if n_permutations != 'auto':
+            raise ValueError('n_permutations must be an int or "auto", got '
+                             '"%s"' % n_permutations)
+        if not 0 < p_tol < 1:
+            raise ValueError('p_tol must be between 0 and 1, got %s' % p_tol)
+        n_permutations = _auto_perm_max
 
     # check dimensions for each group in X (a list at this stage).
     X = [x[:, np.newaxis] if x.ndim == 1 else x for x in X]
@@ -798,12 +1150,20 @@ def _permutation_cluster_test(X, threshold, n_permutations, tail, stat_fun,
                 # convert to binary array representation
                 seeds = [np.fromiter(np.binary_repr(s, n_samples), dtype=int)
                          for s in range(1, max_perms)]
+                auto = False  # the exact test needs all permutations
 
         if seeds is None:
             if seed is None:
                 seeds = [None] * n_permutations
             else:
                 seeds = list(seed + np.arange(n_permutations))
+        if auto:
+            # run batches of permutations until the p-values are known well
+            # enough
+            seed_batches = [seeds[start:start + _auto_perm_batch] for start
+                            in range(0, len(seeds), _auto_perm_batch)]
+        else:
+            seed_batches = [seeds]
 
         # Step 3: repeat permutations for step-down-in-jumps procedure
         n_removed = 1  # number of new clusters added
@@ -821,12 +1181,25 @@ def _permutation_cluster_test(X, threshold, n_permutations, tail, stat_fun,
             else:
                 this_include = step_down_include
             logger.info('Permuting ...')
-            H0 = parallel(my_do_perm_func(X_full, slices, threshold, tail,
-                          connectivity, stat_fun, max_step, this_include,
-                          partitions, t_power, s, sample_shape, buffer_size,
-                          get_progress_bar(s))
-                          for s in split_list(seeds, n_jobs))
+            H0 = list()
+            for batch_seeds in seed_batches:
+                H0 += parallel(my_do_perm_func(X_full, slices, threshold,
+                               tail, connectivity, stat_fun, max_step,
+                               this_include, partitions, t_power, s,
+                               sample_shape, buffer_size, get_progress_bar(s))
+                               for s in split_list(batch_seeds, n_jobs))
+                if auto:
+                    n_perms = sum(len(h) for h in H0)
+                    cluster_pv = _pval_from_histogram(
+                        cluster_stats, np.concatenate(H0), tail)
+                    if _pval_ci_clear(cluster_pv, n_perms, p_tol):
+                        logger.info('Stopping after %d permutations, all '
+                                    'cluster p-values are known relative to '
+                                    'p_tol=%s' % (n_perms, p_tol))
+                        break
             H0 = np.concatenate(H0)
+            if auto and len(H0) == len(seeds):
+                logger.info('Used the maximum of %d permutations' % len(H0))
             logger.info('Computing cluster p-values')
             cluster_pv = _pval_from_histogram(cluster_stats, H0, tail)
 
@@ -904,7 +1277,8 @@ def permutation_cluster_test(X, threshold=None, n_permutations=1024,
                              connectivity=None, verbose=None, n_jobs=1,
                              seed=None, max_step=1, exclude=None,
                              step_down_p=0, t_power=1, out_type='mask',
-                             check_disjoint=False, buffer_size=1000):
+                             check_disjoint=False, buffer_size=1000,
+                             p_tol=0.05):
     """Cluster-level statistical permutation test
 
     For a list of nd-arrays of data, e.g. 2d for time series or 3d for
@@ -929,8 +1303,10 @@ def permutation_cluster_test(X, threshold=None, n_permutations=1024,
         p < 0.05 for the given number of (within-subject) observations.
         If a dict is used, then threshold-free cluster enhancement (TFCE)
         will be used.
-    n_permutations : int
-        The number of permutations to compute.
+    n_permutations : int | 'auto'
+        The number of permutations to compute. If 'auto', permutations are
+        computed in batches until the p-value of each cluster is known to be
+        below or above p_tol (or up to 10000 permutations).
     tail : -1 or 0 or 1 (default = 0)
         If tail is 1, the statistic is thresholded above threshold.
         If tail is -1, the statistic is thresholded below threshold.
@@ -987,6 +1363,12 @@ def permutation_cluster_test(X, threshold=None, n_permutations=1024,
         processes is enabled (see set_cache_dir()), as X will be shared
         between processes and each process only needs to allocate space
         for a small block of variables.
+    p_tol : float
+        The significance level used with n_permutations='auto'. Permutations
+        stop once the 99% confidence interval of each cluster p-value lies
+        entirely below or above p_tol.
+
+        .. versionadded:: 0.10
 
     Returns
     -------
@@ -997,7 +1379,9 @@ def permutation_cluster_test(X, threshold=None, n_permutations=1024,
     cluster_pv : array
         P-value for each cluster
     H0 : array of shape [n_permutations]
-        Max cluster level stats observed under permutation.
+        Max cluster level stats observed under permutation. With
+        n_permutations='auto', its length is the number of permutations
+        that were used.
 
     Notes
     -----
@@ -1027,7 +1411,7 @@ def permutation_cluster_test(X, threshold=None, n_permutations=1024,
                                      exclude=exclude, step_down_p=step_down_p,
                                      t_power=t_power, out_type=out_type,
                                      check_disjoint=check_disjoint,
-                                     buffer_size=buffer_size)
+                                     buffer_size=buffer_size, p_tol=p_tol)
 
 
 permutation_cluster_test.__test__ = False
@@ -1039,7 +1423,8 @@ def permutation_cluster_1samp_test(X, threshold=None, n_permutations=1024,
                                    connectivity=None, verbose=None, n_jobs=1,
                                    seed=None, max_step=1, exclude=None,
                                    step_down_p=0, t_power=1, out_type='mask',
-                                   check_disjoint=False, buffer_size=1000):
+                                   check_disjoint=False, buffer_size=1000,
+                                   p_tol=0.05):
     """Non-parametric cluster-level 1 sample T-test
 
     From a array of observations, e.g. signal amplitudes or power spectrum
@@ -1059,8 +1444,10 @@ def permutation_cluster_1samp_test(X, threshold=None, n_permutations=1024,
         p < 0.05 for the given number of (within-subject) observations.
         If a dict is used, then threshold-free cluster enhancement (TFCE)
         will be used.
-    n_permutations : int
-        The number of permutations to compute.
+    n_permutations : int | 'auto'
+        The number of permutations to compute. If 'auto', permutations are
+        computed in batches until the p-value of each cluster is known to be
+        below or above p_tol (or up to 10000 permutations).
     tail : -1 or 0 or 1 (default = 0)
         If tail is 1, the statistic is thresholded above threshold.
         If tail is -1, the statistic is thresholded below threshold.
@@ -1122,6 +1509,14 @@ def permutation_cluster_1samp_test(X, threshold=None, n_permutations=1024,
         processes is enabled (see set_cache_dir()), as X will be shared
         between processes and each process only needs to allocate space
         for a small block of variables.
+        It is not used when stat_fun is ttest_1samp_no_p, in which case the
+        statistics of batches of permutations are computed at once.
+    p_tol : float
+        The significance level used with n_permutations='auto'. Permutations
+        stop once the 99% confidence interval of each cluster p-value lies
+        entirely below or above p_tol.
+
+        .. versionadded:: 0.10
 
     Returns
     -------
@@ -1132,7 +1527,9 @@ def permutation_cluster_1samp_test(X, threshold=None, n_permutations=1024,
     cluster_pv : array
         P-value for each cluster
     H0 : array of shape [n_permutations]
-        Max cluster level stats observed under permutation.
+        Max cluster level stats observed under permutation. With
+        n_permutations='auto', its length is the number of permutations
+        that were used.
 
     Notes
     -----
@@ -1164,7 +1561,7 @@ def permutation_cluster_1samp_test(X, threshold=None, n_permutations=1024,
                                      exclude=exclude, step_down_p=step_down_p,
                                      t_power=t_power, out_type=out_type,
                                      check_disjoint=check_disjoint,
-                                     buffer_size=buffer_size)
+                                     buffer_size=buffer_size, p_tol=p_tol)
 
 
 permutation_cluster_1samp_test.__test__ = False
@@ -1178,7 +1575,8 @@ def spatio_temporal_cluster_1samp_test(X, threshold=None,
                                        n_jobs=1, seed=None, max_step=1,
                                        spatial_exclude=None, step_down_p=0,
                                        t_power=1, out_type='indices',
-                                       check_disjoint=False, buffer_size=1000):
+                                       check_disjoint=False, buffer_size=1000,
+                                       p_tol=0.05):
     """Non-parametric cluster-level 1 sample T-test for spatio-temporal data
 
     This function provides a convenient wrapper for data organized in the form
@@ -1193,8 +1591,10 @@ def spatio_temporal_cluster_1samp_test(X, threshold=None,
         p < 0.05 for the given number of (within-subject) observations.
         If a dict is used, then threshold-free cluster enhancement (TFCE)
         will be used.
-    n_permutations : int
-        The number of permutations to compute.
+    n_permutations : int | 'auto'
+        The number of permutations to compute. If 'auto', permutations are
+        computed in batches until the p-value of each cluster is known to be
+        below or above p_tol (or up to 10000 permutations).
     tail : -1 or 0 or 1 (default = 0)
         If tail is 1, the statistic is thresholded above threshold.
         If tail is -1, the statistic is thresholded below threshold.
@@ -1254,6 +1654,14 @@ def spatio_temporal_cluster_1samp_test(X, threshold=None,
         processes is enabled (see set_cache_dir()), as X will be shared
         between processes and each process only needs to allocate space
         for a small block of variables.
+        It is not used when stat_fun is ttest_1samp_no_p, in which case the
+        statistics of batches of permutations are computed at once.
+    p_tol : float
+        The significance level used with n_permutations='auto'. Permutations
+        stop once the 99% confidence interval of each cluster p-value lies
+        entirely below or above p_tol.
+
+        .. versionadded:: 0.10
 
     Returns
     -------
@@ -1264,7 +1672,9 @@ def spatio_temporal_cluster_1samp_test(X, threshold=None,
     cluster_pv: array
         P-value for each cluster
     H0 : array of shape [n_permutations]
-        Max cluster level stats observed under permutation.
+        Max cluster level stats observed under permutation. With
+        n_permutations='auto', its length is the number of permutations
+        that were used.
 
     Notes
     -----
@@ -1299,7 +1709,7 @@ def spatio_temporal_cluster_1samp_test(X, threshold=None,
                                          step_down_p=step_down_p,
                                          t_power=t_power, out_type=out_type,
                                          check_disjoint=check_disjoint,
-                                         buffer_size=buffer_size)
+                                         buffer_size=buffer_size, p_tol=p_tol)
     return out
 
 
@@ -1312,7 +1722,8 @@ def spatio_temporal_cluster_test(X, threshold=1.67, n_permutations=1024,
                                  connectivity=None, verbose=None, n_jobs=1,
                                  seed=None, max_step=1, spatial_exclude=None,
                                  step_down_p=0, t_power=1, out_type='indices',
-                                 check_disjoint=False, buffer_size=1000):
+                                 check_disjoint=False, buffer_size=1000,
+                                 p_tol=0.05):
     """Non-parametric cluster-level test for spatio-temporal data
 
     This function provides a convenient wrapper for data organized in the form
@@ -1324,7 +1735,7 @@ def spatio_temporal_cluster_test(X, threshold=1.67, n_permutations=1024,
         Array of shape (observations, time, vertices) in each group.
     threshold: float
         The threshold for the statistic.
-    n_permutations: int
+    n_permutations: int | 'auto'
         See permutation_cluster_test.
     tail : -1 or 0 or 1 (default = 0)
         See permutation_cluster_test.
@@ -1377,6 +1788,10 @@ def spatio_temporal_cluster_test(X, threshold=1.67, n_permutations=1024,
         processes is enabled (see set_cache_dir()), as X will be shared
         between processes and each process only needs to allocate space
         for a small block of variables.
+    p_tol : float
+        See permutation_cluster_test.
+
+        .. versionadded:: 0.10
 
     Returns
     -------
@@ -1387,7 +1802,9 @@ def spatio_temporal_cluster_test(X, threshold=1.67, n_permutations=1024,
     cluster_pv: array
         P-value for each cluster
     H0 : array of shape [n_permutations]
-        Max cluster level stats observed under permutation.
+        Max cluster level stats observed under permutation. With
+        n_permutations='auto', its length is the number of permutations
+        that were used.
 
     Notes
     -----
@@ -1416,7 +1833,7 @@ def spatio_temporal_cluster_test(X, threshold=1.67, n_permutations=1024,
                                    exclude=exclude, step_down_p=step_down_p,
                                    t_power=t_power, out_type=out_type,
                                    check_disjoint=check_disjoint,
-                                   buffer_size=buffer_size)
+                                   buffer_size=buffer_size, p_tol=p_tol)
     return out
 
 
@@ -1458,24 +1875,29 @@ def _st_mask_from_s_inds(n_times, n_vertices, vertices, set_as=True):
 def _get_partitions_from_connectivity(connectivity, n_times, verbose=None):
     """Use indices to specify disjoint subsets (e.g., hemispheres) based on
     connectivity"""
+    fname = None
     if isinstance(connectivity, list):
+        indptr, indices = _get_neighbors_csr(connectivity)
         test = np.ones(len(connectivity))
-        test_conn = np.zeros((len(connectivity), len(connectivity)),
-                             dtype='bool')
-        for vi in range(len(connectivity)):
-            test_conn[connectivity[vi], vi] = True
-        test_conn = sparse.coo_matrix(test_conn, dtype='float')
+        test_conn = sparse.csr_matrix((np.ones(len(indices)), indices, indptr),
+                                      shape=(len(test), len(test))).tocoo()
+        fname = _get_disk_cache_fname('partitions', [indptr, indices])
     else:
         test = np.ones(connectivity.shape[0])
         test_conn = connectivity
 
-    part_clusts = _find_clusters(test, 0, 1, test_conn)[0]
-    if len(part_clusts) > 1:
-        logger.info('%i disjoint connectivity sets found'
-                    % len(part_clusts))
+    cache = _read_disk_cache(fname)
+    if cache is not None:
+        partitions = cache['partitions']
+    else:
+        part_clusts = _find_clusters(test, 0, 1, test_conn)[0]
         partitions = np.zeros(len(test), dtype='int')
         for ii, pc in enumerate(part_clusts):
             partitions[pc] = ii
+        _write_disk_cache(fname, partitions=partitions)
+    n_parts = partitions.max() + 1 if len(partitions) > 0 else 0
+    if n_parts > 1:
+        logger.info('%i disjoint connectivity sets found' % n_parts)
         if isinstance(connectivity, list):
             partitions = np.tile(partitions, n_times)
     else:
@@ -1496,6 +1918,26 @@ def _reshape_clusters(clusters, sample_shape):
     return clusters
 
 
+def _get_cluster_labels(clusters, T_obs):
+    """Get the number of time points of each vertex in each cluster
+
+    The time points are counted with the sign of T_obs (time points where
+    it is 0 are ignored), as a sparse (n_vertices x n_clusters) matrix.
+    """
+    n_vertices = T_obs.shape[1]
+    clusters = [np.broadcast_arrays(c[0], c[1]) for c in clusters]
+    sizes = [c[0].size for c in clusters]
+    if sum(sizes) == 0:
+        return sparse.csr_matrix((n_vertices, len(clusters)))
+    t_inds = np.concatenate([c[0].ravel() for c in clusters]).astype(int)
+    v_inds = np.concatenate([c[1].ravel() for c in clusters]).astype(int)
+    labels = np.repeat(np.arange(len(clusters)), sizes)
+    # duplicate entries are summed by the conversion to CSR
+    return sparse.coo_matrix((np.sign(T_obs[t_inds, v_inds]),
+                              (v_inds, labels)),
+                             shape=(n_vertices, len(clusters))).tocsr()
+
+
 def summarize_clusters_stc(clu, p_thresh=0.05, tstep=1e-3, tmin=0,
                            subject='fsaverage', vertices=None):
     """ Assemble summary SourceEstimate from spatiotemporal cluster results
@@ -1533,18 +1975,15 @@ def summarize_clusters_stc(clu, p_thresh=0.05, tstep=1e-3, tmin=0,
     #  Build a convenient representation of each cluster, where each
     #  cluster becomes a "time point" in the SourceEstimate
     if len(good_cluster_inds) > 0:
-        data = np.zeros((n_vertices, n_times))
         data_summary = np.zeros((n_vertices, len(good_cluster_inds) + 1))
-        for ii, cluster_ind in enumerate(good_cluster_inds):
-            data.fill(0)
-            v_inds = clusters[cluster_ind][1]
-            t_inds = clusters[cluster_ind][0]
-            data[v_inds, t_inds] = T_obs[t_inds, v_inds]
-            # Store a nice visualization of the cluster by summing across time
-            data = np.sign(data) * np.logical_not(data == 0) * tstep
-            data_summary[:, ii + 1] = 1e3 * np.sum(data, axis=1)
-            # Make the first "time point" a sum across all clusters for easy
-            # visualization
+        # Store a nice visualization of the clusters by summing the signs of
+        # their points across time, at once for all clusters with a sparse
+        # (vertex x cluster) label matrix
+        labels = _get_cluster_labels([clusters[ci] for ci in
+                                      good_cluster_inds], T_obs)
+        data_summary[:, 1:] = (1e3 * tstep) * labels.toarray()
+        # Make the first "time point" a sum across all clusters for easy
+        # visualization
         data_summary[:, 0] = np.sum(data_summary, axis=1)
 
         return SourceEstimate(data_summary, vertices, tmin=tmin, tstep=tstep,
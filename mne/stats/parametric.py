@@ -9,8 +9,21 @@ from functools import reduce
 from string import ascii_uppercase
 
 from ..externals.six import string_types
+from ..parallel import parallel_func, check_n_jobs
 from ..utils import deprecated
-from ..fixes import matrix_rank
+from ..fixes import matrix_rank, partial
+
+# Maximum size (in bytes) of the intermediate arrays of _f_oneway and
+# f_mway_rm, which process the features in chunks
+_chunk_nbytes = 2 ** 26
+
+
+def _get_chunks(n_features, nbytes_per_feature):
+    """Get slices of features whose intermediates fit in _chunk_nbytes"""
+    n_chunk = max(_chunk_nbytes // max(int(nbytes_per_feature), 1), 1)
+    return [slice(start, start + n_chunk)
+            for start in range(0, n_features, n_chunk)]
+
 
 # The following function is a rewriting of scipy.stats.f_oneway
 # Contrary to the scipy.stats.f_oneway implementation it does not
@@ -70,6 +83,14 @@ def _f_oneway(*args):
     n_classes = len(args)
     n_samples_per_class = np.array([len(a) for a in args])
     n_samples = np.sum(n_samples_per_class)
+    if args[0].ndim == 2:
+        # process the features in chunks to bound the size of intermediates
+        slices = _get_chunks(args[0].shape[1],
+                             8 * 2 * max(n_samples_per_class))
+        if len(slices) > 1:
+            f = np.concatenate([_f_oneway(*[a[:, sl] for a in args])[0]
+                                for sl in slices])
+            return f, sf(n_classes - 1, n_samples - n_classes, f)
     ss_alldata = reduce(lambda x, y: x + y,
                         [np.sum(a ** 2, axis=0) for a in args])
     sums_args = [np.sum(a, axis=0) for a in args]
@@ -254,8 +275,120 @@ def f_twoway_rm(data, factor_levels, effects='A*B', alpha=0.05,
                      return_pvals=return_pvals)
 
 
+def _get_mway_rm_design(factor_levels, effects):
+    """Get the contrasts of the effects of a repeated measures ANOVA
+
+    The contrasts of all effects are concatenated, so that they are applied
+    to the data at once. Returns the contrasts, the limits of the columns of
+    each effect and their degrees of freedom (df1).
+    """
+    effect_picks, _ = _map_effects(len(factor_levels), effects)
+    # the number of subjects only matters for df2
+    contrasts = list(_iter_contrasts(2, factor_levels, effect_picks))
+    lims = np.cumsum([0] + [c_.shape[1] for c_, _, _ in contrasts])
+    df1s = [df1 for _, df1, _ in contrasts]
+    return (np.concatenate([c_ for c_, _, _ in contrasts], axis=1), lims,
+            df1s)
+
+
+def _mway_rm_fvals(data, design, correction):
+    """Get the F values of effects for data (n_subjects, n_conds, n_obs)
+
+    If correction is True, the Greenhouse-Geisser epsilons are returned as
+    well.
+    """
+    contrasts, lims, df1s = design
+    n_subjects, n_obs = data.shape[0], data.shape[2]
+    # apply all contrasts at once, y has shape (n_contrasts, n_subjects, n_obs)
+    y = np.tensordot(contrasts, data, axes=([0], [1]))
+    fvals, epsilons = list(), list()
+    for start, stop, df1 in zip(lims[:-1], lims[1:], df1s):
+        this_y = y[start:stop]
+        b = np.mean(this_y, axis=1)
+        ss = n_subjects * np.sum(b * b, axis=0)
+        sum_sq = np.sum((this_y * this_y).reshape(-1, n_obs), axis=0)
+        mse = (sum_sq - ss) / (n_subjects - 1)
+        fvals.append(ss / mse)
+        if correction:
+            # sample covariances, leave off "/ (y.shape[1] - 1)" norm because
+            # it falls out.
+            v = np.einsum('iso,jso->ijo', this_y, this_y)
+            epsilons.append(np.einsum('iio->o', v) ** 2 /
+                            (df1 * np.sum((v * v).reshape(-1, n_obs),
+                                          axis=0)))
+    return fvals, epsilons
+
+
+def _mway_rm_fvals_chunks(data, design, correction, n_jobs=1):
+    """Get the F values of effects for chunks of observations"""
+    n_subjects, n_obs = data.shape[0], data.shape[2]
+    n_contrasts = design[0].shape[1]
+    nbytes = 8 * n_contrasts * n_subjects * 2
+    if correction:
+        nbytes += 8 * n_contrasts ** 2 * 2
+    n_jobs = check_n_jobs(n_jobs)
+    slices = _get_chunks(n_obs, nbytes)
+    if len(slices) < n_jobs:
+        # at least one chunk per job
+        n_chunk = int(np.ceil(n_obs / float(n_jobs)))
+        slices = [slice(start, start + n_chunk)
+                  for start in range(0, n_obs, n_chunk)]
+    if len(slices) == 1:
+        return _mway_rm_fvals(data, design, correction)
+    parallel, my_fvals, _ = parallel_func(_mway_rm_fvals, n_jobs)
+    out = parallel(my_fvals(data[:, :, sl], design, correction)
+                   for sl in slices)
+    return [[np.concatenate([o[kind][ii] for o in out])
+             for ii in range(len(out[0][kind]))] for kind in range(2)]
+
+
+def f_mway_rm_stat_fun(factor_levels, effects='all', n_jobs=1):
+    """Make a fast stat_fun computing repeated measures ANOVA F values
+
+    The contrasts of the design are computed once, and the returned
+    function can be used as the stat_fun of cluster-level tests, e.g.
+    ``spatio_temporal_cluster_test``. It takes one array of shape
+    (n_subjects, n_observations) per condition (with the first factor
+    repeating slowest), and returns the F values as ``f_mway_rm``
+    (without correction).
+
+    Parameters
+    ----------
+    factor_levels : list-like
+        The number of levels per factor.
+    effects : str | list
+        The effects to compute, as in ``f_mway_rm``.
+    n_jobs : int
+        Number of chunks of observations processed in parallel.
+
+    Returns
+    -------
+    stat_fun : callable
+        The function computing the F values.
+
+    See Also
+    --------
+    f_mway_rm
+
+    Notes
+    -----
+    .. versionadded:: 0.10
+    """
+    return partial(_mway_rm_stat_fun, design=_get_mway_rm_design(
+        factor_levels, effects), n_jobs=n_jobs)
+
+
+def _mway_rm_stat_fun(*args, **kwargs):
+    """Compute the F values of the conditions of a repeated measures design
+    """
+    data = np.swapaxes(np.array(args), 0, 1)
+    fvals = _mway_rm_fvals_chunks(data, kwargs['design'], False,
+                                  kwargs['n_jobs'])[0]
+    return fvals[0] if len(fvals) == 1 else np.array(fvals)
+
+
 def f_mway_rm(data, factor_levels, effects='all', alpha=0.05,
-              correction=False, return_pvals=True):
+              correction=False, return_pvals=True, n_jobs=1):
     """M-way repeated measures ANOVA for fully balanced designs
 
     Parameters
@@ -294,6 +427,12 @@ def f_mway_rm(data, factor_levels, effects='all', alpha=0.05,
         method will be applied.
     return_pvals : bool
         If True, return p values corresponding to f values.
+    n_jobs : int
+        Number of chunks of observations processed in parallel. The
+        observations are processed in chunks in any case, so that the memory
+        used for intermediate results stays bounded.
+
+        .. versionadded:: 0.10
 
     Returns
     -------
@@ -308,6 +447,7 @@ def f_mway_rm(data, factor_levels, effects='all', alpha=0.05,
     --------
     f_oneway
     f_threshold_mway_rm
+    f_mway_rm_stat_fun
 
     Notes
     -----
@@ -320,32 +460,18 @@ def f_mway_rm(data, factor_levels, effects='all', alpha=0.05,
         data = data.reshape(
             data.shape[0], data.shape[1], np.prod(data.shape[2:]))
 
-    effect_picks, _ = _map_effects(len(factor_levels), effects)
+    design = _get_mway_rm_design(factor_levels, effects)
     n_obs = data.shape[2]
     n_replications = data.shape[0]
 
-    # pute last axis in fornt to 'iterate' over mass univariate instances.
-    data = np.rollaxis(data, 2)
-    fvalues, pvalues = [], []
-    for c_, df1, df2 in _iter_contrasts(n_replications, factor_levels,
-                                        effect_picks):
-        y = np.dot(data, c_)
-        b = np.mean(y, axis=1)[:, np.newaxis, :]
-        ss = np.sum(np.sum(y * b, axis=2), axis=1)
-        mse = (np.sum(np.sum(y * y, axis=2), axis=1) - ss) / (df2 / df1)
-        fvals = ss / mse
-        fvalues.append(fvals)
-        if correction:
-            # sample covariances, leave off "/ (y.shape[1] - 1)" norm because
-            # it falls out.
-            v = np.array([np.dot(y_.T, y_) for y_ in y])
-            v = (np.array([np.trace(vv) for vv in v]) ** 2 /
-                 (df1 * np.sum(np.sum(v * v, axis=2), axis=1)))
-            eps = v
-
+    fvalues, epsilons = _mway_rm_fvals_chunks(data, design, correction,
+                                              n_jobs)
+    pvalues = []
+    for ii, (fvals, df1) in enumerate(zip(fvalues, design[2])):
+        df2 = df1 * (n_replications - 1)
         df1, df2 = np.zeros(n_obs) + df1, np.zeros(n_obs) + df2
         if correction:
-            df1, df2 = [d[None, :] * eps for d in (df1, df2)]
+            df1, df2 = [d[None, :] * epsilons[ii] for d in (df1, df2)]
 
         if return_pvals:
             pvals = f(df1, df2).sf(fvals)
@@ -10,7 +10,7 @@ from math import sqrt
 import numpy as np
 
 from ..parallel import parallel_func
-from .. import verbose
+from ..utils import verbose, check_random_state, split_list
 
 
 def bin_perm_rep(ndim, a=0, b=1):
@@ -48,17 +48,93 @@ def bin_perm_rep(ndim, a=0, b=1):
     return perms
 
 
+# Maximum size (in bytes) of the signs and means of a block of permutations
+_perm_block_nbytes = 2 ** 24
+
+
+def _get_n_low(n_samples, n_tests):
+    """Get the number of samples whose sign flips are tabulated at once
+
+    The table of the 2 ** n_low sign flips and their means must fit in
+    _perm_block_nbytes.
+    """
+    n_low = 0
+    while (n_low < n_samples and 2 ** (n_low + 1) *
+           (n_tests + n_low + 1) * 8 <= _perm_block_nbytes):
+        n_low += 1
+    return n_low
+
+
 def _max_stat(X, X2, perms, dof_scaling):
     """Aux function for permutation_t_test (for parallel comp)"""
     n_samples = len(X)
     mus = np.dot(perms, X) / float(n_samples)
-    stds = np.sqrt(X2[None, :] - mus ** 2) * dof_scaling  # std with splitting
-    max_abs = np.max(np.abs(mus) / (stds / sqrt(n_samples)), axis=1)  # t-max
-    return max_abs
+    return _t_max(mus, X2, n_samples, dof_scaling)
+
+
+def _t_max(mus, X2, n_samples, dof_scaling):
+    """Get the max abs t-values of permutations from their means (in place)
+    """
+    stds = mus ** 2
+    np.subtract(X2[np.newaxis, :], stds, out=stds)
+    np.sqrt(stds, out=stds)
+    stds *= dof_scaling / sqrt(n_samples)  # std with splitting
+    np.abs(mus, out=mus)
+    mus /= stds
+    return np.max(mus, axis=1)  # t-max
+
+
+def _max_stat_random(X, X2, dof_scaling, blocks):
+    """Get the t-max of blocks of random sign flips
+
+    Each block is a tuple (seed, n_perms), and the signs are only generated
+    for one block at a time.
+    """
+    n_samples = len(X)
+    max_abs = list()
+    for seed, n_perms in blocks:
+        rng = np.random.RandomState(seed)
+        perms = np.sign(0.5 - rng.rand(n_perms, n_samples))
+        max_abs.append(_max_stat(X, X2, perms, dof_scaling))
+    return np.concatenate(max_abs)
+
+
+def _max_stat_exact(X, X2, dof_scaling, n_low, highs):
+    """Get the t-max of all sign flips for a range of Gray codes
+
+    The signs of the last n_low samples take all their possible values in
+    each block, and the Gray codes give the signs of the other samples. The
+    means of the first samples then only change by one sample from a block
+    to the next. The identity (no sign flip) is excluded.
+    """
+    n_samples = len(X)
+    X = X / float(n_samples)
+    X_high, X_low = X[:n_samples - n_low], X[n_samples - n_low:]
+    if n_low > 0:
+        mus_low = np.dot(bin_perm_rep(n_low, a=1, b=-1), X_low)
+    else:
+        mus_low = np.zeros((1, X.shape[1]))
+    max_abs = list()
+    last_code = None
+    for h in highs:
+        code = h ^ (h >> 1)
+        if last_code is None:
+            signs = [1 - 2 * ((code >> j) & 1) for j in range(len(X_high))]
+            mu_high = np.dot(signs, X_high)
+        else:
+            # consecutive Gray codes differ by one bit
+            j = (code ^ last_code).bit_length() - 1
+            mu_high -= 2 * (1 - 2 * ((last_code >> j) & 1)) * X_high[j]
+        last_code = code
+        mus = mus_low + mu_high
+        if code == 0:
+            mus = mus[1:]  # the identity
+        max_abs.append(_t_max(mus, X2, n_samples, dof_scaling))
+    return np.concatenate(max_abs)
 
 
 @verbose
-def permutation_t_test(X, n_permutations=10000, tail=0, n_jobs=1,
+def permutation_t_test(X, n_permutations=10000, tail=0, n_jobs=1, seed=None,
                        verbose=None):
     """One sample/paired sample permutation test based on a t-statistic.
 
@@ -89,6 +165,12 @@ def permutation_t_test(X, n_permutations=10000, tail=0, n_jobs=1,
         is that the mean of the data is less than 0 (lower tailed test).
     n_jobs : int
         Number of CPUs to use for computation.
+    seed : None | int | instance of RandomState
+        The random generator state used to seed the sign flips of each block
+        of permutations, for results reproducibility. If None, the global
+        numpy random state is used.
+
+        .. versionadded:: 0.10
     verbose : bool, str, int, or None
         If not None, override default verbose level (see mne.verbose).
 
@@ -113,6 +195,10 @@ def permutation_t_test(X, n_permutations=10000, tail=0, n_jobs=1,
     Overview of standard nonparametric randomization and permutation
     testing applied to neuroimaging data (e.g. fMRI)
     DOI: http://dx.doi.org/10.1002/hbm.1058
+
+    The permutations are evaluated in blocks, so that the memory used does
+    not grow with the number of permutations. The exact test enumerates the
+    sign flips in Gray code order.
     """
     n_samples, n_tests = X.shape
 
@@ -128,14 +214,29 @@ def permutation_t_test(X, n_permutations=10000, tail=0, n_jobs=1,
     T_obs = np.mean(X, axis=0) / (std0 / sqrt(n_samples))
 
     if do_exact:
-        perms = bin_perm_rep(n_samples, a=1, b=-1)[1:, :]
+        n_low = _get_n_low(n_samples, n_tests)
+        parallel, my_max_stat, n_jobs = parallel_func(_max_stat_exact, n_jobs)
+        n_high = 2 ** (n_samples - n_low)
+        lims = np.linspace(0, n_high, n_jobs + 1).astype(int)
+        max_abs = parallel(my_max_stat(X, X2, dof_scaling, n_low,
+                                       range(start, stop))
+                           for start, stop in zip(lims[:-1], lims[1:])
+                           if stop > start)
     else:
-        perms = np.sign(0.5 - np.random.rand(n_permutations, n_samples))
-
-    parallel, my_max_stat, n_jobs = parallel_func(_max_stat, n_jobs)
-
-    max_abs = np.concatenate(parallel(my_max_stat(X, X2, p, dof_scaling)
-                                      for p in np.array_split(perms, n_jobs)))
+        # number of permutations per block with bounded memory (signs and
+        # means)
+        n_block = max(_perm_block_nbytes // (8 * (n_samples + n_tests)), 1)
+        rng = check_random_state(seed)
+        n_perms = [n_block] * (n_permutations // n_block)
+        if n_permutations % n_block:
+            n_perms.append(n_permutations % n_block)
+        seeds = rng.randint(0, np.iinfo(np.int32).max, len(n_perms))
+        blocks = list(zip(seeds, n_perms))
+        parallel, my_max_stat, n_jobs = parallel_func(_max_stat_random,
+                                                      n_jobs)
+        max_abs = parallel(my_max_stat(X, X2, dof_scaling, b)
+                           for b in split_list(blocks, n_jobs) if len(b) > 0)
+    max_abs = np.concatenate(max_abs)
     H0 = np.sort(max_abs)
 
     scaling = float(n_permutations + 1)
@@ -149,4 +250,5 @@ def permutation_t_test(X, n_permutations=10000, tail=0, n_jobs=1,
 
     return T_obs, p_values, H0
 
+
 permutation_t_test.__test__ = False  # for nosetests
@@ -12,13 +12,13 @@ import warnings
 from ..externals.six import string_types
 
 import numpy as np
-from scipy import linalg
+from scipy import linalg, sparse
 
 from ..source_estimate import SourceEstimate
 from ..epochs import _BaseEpochs
 from ..evoked import Evoked, EvokedArray
-from ..utils import logger, _reject_data_segments, _get_fast_dot
-from ..io.pick import pick_types, pick_info
+from ..utils import logger, _get_fast_dot
+from ..io.pick import pick_types, pick_info, channel_indices_by_type
 
 
 def linear_regression(inst, design_matrix, names=None):
@@ -215,8 +215,22 @@ def linear_regression_raw(raw, events, event_id=None, tmin=-.1, tmax=1,
     solver : str | function
         Either a function which takes as its inputs the predictor matrix X
         and the observation matrix Y, and returns the coefficient matrix b;
-        or a string (for now, only 'pinv'), in which case the solver used
-        is dot(scipy.linalg.pinv(dot(X.T, X)), dot(X.T, Y.T)).T.
+        or a string. The predictor matrix is built as a sparse matrix, which
+        is only converted to a dense array to be passed to a function. The
+        available solvers are:
+
+            * 'pinv': dot(scipy.linalg.pinv(dot(X.T, X)), dot(X.T, Y.T)).T
+            * 'cholesky': solve the normal equations with a Cholesky
+              factorization of dot(X.T, X), which must be positive definite
+            * 'lsqr': solve the least squares problem of each channel with
+              scipy.sparse.linalg.lsqr, without forming dot(X.T, X)
+
+        With 'pinv' and 'cholesky', dot(X.T, Y.T) is accumulated over
+        chunks of data if raw is not preloaded, so that the data are never
+        loaded in memory at once.
+
+        .. versionchanged:: 0.10
+           The 'cholesky' and 'lsqr' solvers were added.
 
     Returns
     -------
@@ -227,14 +241,7 @@ def linear_regression_raw(raw, events, event_id=None, tmin=-.1, tmax=1,
     """
 
     if isinstance(solver, string_types):
-        if solver == 'pinv':
-            fast_dot = _get_fast_dot()
-
-            # inv is slightly (~10%) faster, but pinv seemingly more stable
-            def solver(X, Y):
-                return fast_dot(linalg.pinv(fast_dot(X.T, X)),
-                                fast_dot(X.T, Y.T)).T
-        else:
+        if solver not in _normal_solvers and solver != 'lsqr':
             raise ValueError("No such solver: {0}".format(solver))
 
     # prepare raw and events
@@ -242,12 +249,10 @@ def linear_regression_raw(raw, events, event_id=None, tmin=-.1, tmax=1,
         picks = pick_types(raw.info, meg=True, eeg=True, ref_meg=True)
     info = pick_info(raw.info, picks, copy=True)
     info["sfreq"] /= decim
-    data, times = raw[:]
-    data = data[picks, ::decim]
-    times = times[::decim]
+    n_times = (raw.n_times + decim - 1) // decim
     events = events.copy()
     events[:, 0] -= raw.first_samp
-    events[:, 0] /= decim
+    events[:, 0] //= decim
 
     conds = list(event_id)
     if covariates is not None:
@@ -266,28 +271,68 @@ def linear_regression_raw(raw, events, event_id=None, tmin=-.1, tmax=1,
         tmax_s = dict((cond, int((tmax.get(cond, 1.) * info["sfreq"]) + 1))
                       for cond in conds)
 
-    # Construct predictor matrix
-    # We do this by creating one array per event type, shape (lags, samples)
-    # (where lags depends on tmin/tmax and can be different for different
-    # event types). Columns correspond to predictors, predictors correspond to
-    # time lags. Thus, each array is mostly sparse, with one diagonal of 1s
-    # per event (for binary predictors).
+    X, cond_length = _make_predictors(events, event_id, covariates, conds,
+                                      tmin_s, tmax_s, n_times)
+    # find only those positions where at least one predictor isn't 0
+    has_val = np.diff(X.indptr) > 0
+
+    # solve linear system
+    if solver in _normal_solvers:
+        # accumulate the normal equations over chunks of data
+        XtY = np.zeros((X.shape[1], len(picks)))
+        for start, data in _iter_raw_data(raw, picks, decim, info, reject,
+                                          tstep):
+            stop = start + data.shape[1]
+            # additionally, reject positions based on extreme steps in the
+            # data
+            _reject_positions(has_val[start:stop], data, reject, flat, info,
+                              tstep)
+            X_chunk = X[start:stop][has_val[start:stop]]
+            XtY += X_chunk.T * data[:, has_val[start:stop]].T
+        _check_has_val(has_val, reject, flat)
+        X = X[has_val]
+        XtX = (X.T * X).toarray()
+        coefs = _normal_solvers[solver](XtX, XtY).T
+    else:
+        data = raw[picks, :][0][:, ::decim]
+        # additionally, reject positions based on extreme steps in the data
+        _reject_positions(has_val, data, reject, flat, info, tstep)
+        _check_has_val(has_val, reject, flat)
+        if solver == 'lsqr':
+            coefs = _solve_lsqr(X[has_val], data[:, has_val])
+        else:
+            coefs = solver(X[has_val].toarray(), data[:, has_val])
+
+    # construct Evoked objects to be returned from output
+    evokeds = dict()
+    cum = 0
+    for cond in conds:
+        tmin_, tmax_ = tmin_s[cond], tmax_s[cond]
+        evokeds[cond] = EvokedArray(coefs[:, cum:cum + tmax_ - tmin_],
+                                    info=info, tmin=tmin_ / info["sfreq"],
+                                    comment=cond, nave=cond_length[cond],
+                                    kind='mean')  # note that nave and kind are
+        cum += tmax_ - tmin_                      # technically not correct
+
+    return evokeds
+
 
-    # This should probably be improved (including making it more robust to
-    # high frequency data) by operating on sparse matrices. As-is, high
-    # sampling rates plus long windows blow up the system due to the inversion
-    # of massive matrices.
-    # Furthermore, assigning to a preallocated array would be faster.
+def _make_predictors(events, event_id, covariates, conds, tmin_s, tmax_s,
+                     n_times):
+    """Construct the sparse predictor matrix of linear_regression_raw
 
+    Columns correspond to predictors, predictors correspond to time lags (the
+    number of lags depends on tmin/tmax and can be different for different
+    event types). Each event adds one diagonal of its value (1 for binary
+    predictors) to the columns of its event type.
+    """
     cond_length = dict()
-    pred_arrays = list()
+    rows, cols, values = list(), list(), list()
+    n_cols = 0
     for cond in conds:
-        # create the first row and column to be later used by toeplitz to build
-        # the full predictor matrix
         tmin_, tmax_ = tmin_s[cond], tmax_s[cond]
         n_lags = int(tmax_ - tmin_)
-        samples = np.zeros(len(times), dtype=float)
-        lags = np.zeros(n_lags, dtype=float)
+        samples = np.zeros(n_times, dtype=float)
 
         if cond in event_id:  # for binary predictors
             ids = ([event_id[cond]] if isinstance(event_id[cond], int)
@@ -304,36 +349,82 @@ def linear_regression_raw(raw, events, event_id=None, tmin=-.1, tmax=1,
                 samples[time + int(tmin_)] = float(value)
             cond_length[cond] = len(np.nonzero(covariates[cond])[0])
 
-        # this is the magical part (thanks to Marijn van Vliet):
-        # use toeplitz to construct series of diagonals
-        pred_arrays.append(linalg.toeplitz(samples, lags))
+        # the predictor of lag k is the series of event values shifted by k
+        onsets = np.nonzero(samples)[0]
+        this_rows = (onsets[:, np.newaxis] + np.arange(n_lags)).ravel()
+        keep = this_rows < n_times
+        rows.append(this_rows[keep])
+        cols.append(np.tile(np.arange(n_cols, n_cols + n_lags),
+                            len(onsets))[keep])
+        values.append(np.repeat(samples[onsets], n_lags)[keep])
+        n_cols += n_lags
+    X = sparse.csr_matrix((np.concatenate(values),
+                           (np.concatenate(rows), np.concatenate(cols))),
+                          shape=(n_times, n_cols))
+    return X, cond_length
+
+
+def _reject_positions(has_val, data, reject, flat, info, tstep):
+    """Mark the positions of windows with artifacts as unused in place
+
+    Contrary to _reject_data_segments, this does not fail if all windows are
+    rejected, so that it can be used on chunks of data. As there, a trailing
+    window shorter than tstep is kept.
+    """
+    if reject is None and flat is None:
+        return
+    from ..epochs import _is_good
+    idx_by_type = channel_indices_by_type(info)
+    step = int(np.ceil(tstep * info['sfreq']))
+    for first in range(0, data.shape[1] - step + 1, step):
+        last = first + step
+        if not _is_good(data[:, first:last], info['ch_names'], idx_by_type,
+                        reject, flat, ignore_chs=info['bads']):
+            logger.info("Artifact detected in [%d, %d]" % (first, last))
+            has_val[first:last] = False
+
+
+def _check_has_val(has_val, reject, flat):
+    """Check that positions are left after rejection"""
+    if (reject is not None or flat is not None) and not has_val.any():
+        raise RuntimeError('No clean segment found. Please consider updating '
+                           'your rejection thresholds.')
+
+
+def _iter_raw_data(raw, picks, decim, info, reject, tstep):
+    """Iterate over chunks of decimated raw data
+
+    The chunks are read from disk if raw is not preloaded. Their length is a
+    multiple of the rejection windows, so that these do not change.
+    """
+    if raw.preload:
+        yield 0, raw[picks, :][0][:, ::decim]
+        return
+    step = int(np.ceil(tstep * info['sfreq']))
+    n_chunk = step * max(int(_raw_chunk_duration * info['sfreq']) // step, 1)
+    for start in range(0, raw.n_times, n_chunk * decim):
+        data = raw[picks, start:start + n_chunk * decim][0]
+        yield start // decim, data[:, ::decim]
 
-    big_arr = np.hstack(pred_arrays).T
-    # find only those positions where at least one predictor isn't 0
-    has_val = np.where(np.any(big_arr, axis=0))[0]
 
-    # additionally, reject positions based on extreme steps in the data
-    if reject is not None:
-        _, inds = _reject_data_segments(data, reject, flat, None,
-                                        info, tstep)
-        for t0, t1 in inds:
-            has_val[t0:t1] = False
+def _normal_pinv(XtX, XtY):
+    """Solve the normal equations with the pseudo-inverse"""
+    # inv is slightly (~10%) faster, but pinv seemingly more stable
+    fast_dot = _get_fast_dot()
+    return fast_dot(linalg.pinv(XtX), XtY)
 
-    X = big_arr[:, has_val].T
-    Y = data[:, has_val]
 
-    # solve linear system
-    coefs = solver(X, Y)
+def _normal_cholesky(XtX, XtY):
+    """Solve the normal equations with a Cholesky factorization"""
+    return linalg.cho_solve(linalg.cho_factor(XtX), XtY)
 
-    # construct Evoked objects to be returned from output
-    evokeds = dict()
-    cum = 0
-    for cond in conds:
-        tmin_, tmax_ = tmin_s[cond], tmax_s[cond]
-        evokeds[cond] = EvokedArray(coefs[:, cum:cum + tmax_ - tmin_],
-                                    info=info, tmin=tmin_ / info["sfreq"],
-                                    comment=cond, nave=cond_length[cond],
-                                    kind='mean')  # note that nave and kind are
-        cum += tmax_ - tmin_                      # technically not correct
 
-    return evokeds
+def _solve_lsqr(X, Y):
+    """Solve the least squares problem of each channel with LSQR"""
+    from scipy.sparse.linalg import lsqr
+    return np.array([lsqr(X, y, atol=1e-12, btol=1e-12)[0] for y in Y])
+
+
+_normal_solvers = dict(pinv=_normal_pinv, cholesky=_normal_cholesky)
+# Duration (in seconds) of the chunks of data read from non-preloaded raw
+_raw_chunk_duration = 10.
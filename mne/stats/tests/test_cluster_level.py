@@ -4,8 +4,9 @@ import numpy as np
 from numpy.testing import (assert_equal, assert_array_equal,
                            assert_array_almost_equal)
 from nose.tools import assert_true, assert_raises
+from nose.plugins.skip import SkipTest
 from scipy import sparse, linalg, stats
-from mne.fixes import partial
+from mne.fixes import partial, sparse_block_diag
 import warnings
 from mne.parallel import _force_serial
 from mne.stats.cluster_level import (permutation_cluster_test,
@@ -187,6 +188,217 @@ def test_cluster_permutation_t_test():
             assert_array_equal(cluster_p_values_neg, cluster_p_values_neg_buff)
 
 
+def test_cluster_permutation_t_test_batched():
+    """Test batched sign flips of one-sample cluster permutations
+    """
+    import mne.stats.cluster_level as cluster_level
+    condition1 = _get_conditions()[0]
+    rng = np.random.RandomState(0)
+    X = rng.randn(*condition1.shape)
+    X2 = np.sum(X ** 2, axis=0)
+    signs = np.sign(rng.randn(5, X.shape[0]))
+    for kwargs in (dict(), dict(sigma=1e-1),
+                   dict(sigma=1e-1, method='absolute')):
+        T = cluster_level._ttest_1samp_sign_flips(X, X2, signs, **kwargs)
+        for sign, t in zip(signs, T):
+            assert_array_almost_equal(
+                t, ttest_1samp_no_p(X * sign[:, np.newaxis], **kwargs))
+    assert_raises(ValueError, cluster_level._ttest_1samp_sign_flips,
+                  X, X2, signs, method='foo')
+
+    # batches give the same results as flipping the data of each permutation
+    orig_nbytes = cluster_level._perm_batch_nbytes
+    for stat_fun in (ttest_1samp_no_p, partial(ttest_1samp_no_p, sigma=1e-1)):
+        out = permutation_cluster_1samp_test(
+            condition1, n_permutations=100, threshold=1.67, seed=1,
+            stat_fun=stat_fun)
+        # a lambda is not recognized as the t-test, so it is not batched
+        out_loop = permutation_cluster_1samp_test(
+            condition1, n_permutations=100, threshold=1.67, seed=1,
+            stat_fun=lambda x: stat_fun(x))
+        try:
+            # a few permutations per batch
+            cluster_level._perm_batch_nbytes = 3 * 16 * condition1[0].size
+            out_small = permutation_cluster_1samp_test(
+                condition1, n_permutations=100, threshold=1.67, seed=1,
+                stat_fun=stat_fun)
+        finally:
+            cluster_level._perm_batch_nbytes = orig_nbytes
+        for o in (out_loop, out_small):
+            assert_array_almost_equal(out[0], o[0])
+            assert_array_almost_equal(out[2], o[2])
+            assert_array_almost_equal(out[3], o[3])
+    # exact test
+    out = permutation_cluster_1samp_test(condition1[:8], n_permutations=256,
+                                         threshold=1.67)
+    out_loop = permutation_cluster_1samp_test(
+        condition1[:8], n_permutations=256, threshold=1.67,
+        stat_fun=lambda x: ttest_1samp_no_p(x))
+    assert_array_almost_equal(out[3], out_loop[3])
+
+
+def _tfce_stepped(x, threshold, tail, **kwargs):
+    """Compute TFCE scores by clustering at each threshold"""
+    from mne.stats.cluster_level import _find_clusters
+    stop = np.max(np.abs(x)) if tail == 0 else np.max(x)
+    thresholds = np.arange(threshold['start'], stop, threshold['step'])
+    scores = np.zeros(x.size)
+    for ti, thresh in enumerate(thresholds):
+        h = thresh - thresholds[ti - 1] if ti > 0 else thresh
+        for c in _find_clusters(x, thresh, tail, **kwargs)[0]:
+            if isinstance(c, tuple):  # slices
+                c = np.arange(c[0].start, c[0].stop)
+            elif c.dtype == bool:
+                c = np.where(c.ravel())[0]
+            scores[c] += h ** 2 * len(c) ** 0.5
+    return scores
+
+
+def test_tfce_sweep():
+    """Test TFCE computed in one sweep against the stepped integral
+    """
+    from mne.stats.cluster_level import _find_clusters, _setup_connectivity
+    rng = np.random.RandomState(0)
+    threshold = dict(start=0.2, step=0.1)
+    n_src, n_times = 20, 10
+    connectivity = sparse.coo_matrix(rng.rand(n_src, n_src) < 0.1)
+    neighbors = _setup_connectivity(connectivity, n_src * n_times, n_times)
+    full = (sparse.kron(sparse.eye(n_times), connectivity + connectivity.T) +
+            sparse.eye(n_src * n_times, k=n_src)).tocoo()
+    for tail in (0, 1):
+        for shape, conn in (((200,), None), ((20, 10), None),
+                            ((n_src * n_times,), neighbors),
+                            ((n_src * n_times,), full)):
+            x = rng.randn(*shape) * 2
+            clusters, scores = _find_clusters(x, threshold, tail, conn)
+            assert_equal(len(clusters), x.size)
+            assert_array_almost_equal(
+                scores, _tfce_stepped(x, threshold, tail, connectivity=conn))
+    # with excluded points and partitions
+    x = rng.randn(n_src * n_times) * 2
+    include = rng.rand(x.size) > 0.2
+    partitions = np.arange(x.size) % 3
+    kwargs = dict(connectivity=full, include=include, partitions=partitions)
+    assert_array_almost_equal(_find_clusters(x, threshold, 0, **kwargs)[1],
+                              _tfce_stepped(x, threshold, 0, **kwargs))
+
+
+def test_cluster_permutation_auto():
+    """Test early stopping of cluster permutations with n_permutations='auto'
+    """
+    from mne.stats.cluster_level import _pval_ci_clear
+    assert_true(_pval_ci_clear(np.array([1. / 1001, 0.5]), 1000, 0.05))
+    assert_true(not _pval_ci_clear(np.array([1. / 11, 0.5]), 10, 0.05))
+    assert_true(not _pval_ci_clear(np.array([51. / 1001]), 1000, 0.05))
+
+    condition1_1d, condition2_1d = _get_conditions()[:2]
+    for func, X in ((permutation_cluster_1samp_test, condition1_1d),
+                    (permutation_cluster_test, [condition1_1d,
+                                                condition2_1d])):
+        T_obs, clusters, p_values, H0 = func(X, n_permutations='auto',
+                                             seed=0)
+        assert_true(0 < len(H0) < 10000)
+        assert_equal(len(H0) % 100, 0)
+        # the same as running this number of permutations directly
+        out = func(X, n_permutations=len(H0), seed=0)
+        assert_array_equal(p_values, out[2])
+        assert_array_equal(H0, out[3])
+        assert_raises(ValueError, func, X, n_permutations='foo')
+        assert_raises(ValueError, func, X, n_permutations='auto', p_tol=0)
+    # exact test
+    H0 = permutation_cluster_1samp_test(condition1_1d[:8],
+                                        n_permutations='auto')[3]
+    assert_equal(len(H0), 2 ** 7 - 1)
+
+
+def test_clusters_st_graph():
+    """Test spatio-temporal clustering as graph connected components
+    """
+    from mne.stats.cluster_level import (_get_clusters_st_1step,
+                                         _get_clusters_st_multistep,
+                                         _get_clusters_st_graph,
+                                         _get_cs_graph_components,
+                                         _get_components, _setup_connectivity)
+    cs_graph_components = _get_cs_graph_components()
+    if cs_graph_components is None:
+        raise SkipTest('scipy.sparse.csgraph is required')
+    rng = np.random.RandomState(0)
+    n_src, n_times = 30, 12
+    connectivity = sparse.coo_matrix(rng.rand(n_src, n_src) < 0.08)
+    neighbors = _setup_connectivity(connectivity, n_src * n_times, n_times)
+    # the same graph for the global algorithm
+    full = (sparse.kron(sparse.eye(n_times), connectivity + connectivity.T) +
+            sparse.eye(n_src * n_times, k=n_src)).tocoo()
+    for p in (0.2, 0.5, 0.8):
+        x_in = rng.rand(n_src * n_times) < p
+        keepers = [np.where(x)[0] for x in x_in.reshape(n_times, n_src)]
+        for max_step in (1, 2, 3, 20):
+            clusters = _get_clusters_st_graph(x_in, neighbors, max_step,
+                                              cs_graph_components)
+            if max_step == 1:
+                want = _get_clusters_st_1step(list(keepers), neighbors)
+            else:
+                want = _get_clusters_st_multistep(list(keepers), neighbors,
+                                                  max_step)
+            assert_equal(len(clusters), len(want))
+            assert_array_equal(np.sort(np.concatenate(clusters)),
+                               np.where(x_in)[0])
+            assert_equal(sorted(tuple(c) for c in clusters),
+                         sorted(tuple(np.sort(c)) for c in want))
+        clusters = _get_clusters_st_graph(x_in, neighbors, 1,
+                                          cs_graph_components)
+        want = _get_components(x_in, full)
+        assert_equal([tuple(c) for c in clusters], [tuple(c) for c in want])
+    assert_equal(_get_clusters_st_graph(np.zeros(n_src * n_times, bool),
+                                        neighbors, 1, cs_graph_components),
+                 [])
+
+
+def test_neighbors_disk_cache():
+    """Test neighbor lists and partitions from a cached spatial connectivity
+    """
+    from mne.stats.cluster_level import (_setup_connectivity,
+                                         _get_partitions_from_connectivity)
+    tempdir = _TempDir()
+    orig_dir = os.getenv('MNE_DISK_CACHE_DIR', None)
+    rng = np.random.RandomState(0)
+    n_src, n_times = 40, 5
+    # two disjoint sets of vertices
+    connectivity = sparse_block_diag([sparse.eye(20, k=1)] * 2).tocoo()
+    X = rng.randn(10, n_times, n_src)
+    want_parts = np.tile(np.repeat([0, 1], 20), n_times)
+    want = None
+    try:
+        for cache_dir in (None, tempdir, tempdir):
+            if cache_dir is None:
+                os.environ.pop('MNE_DISK_CACHE_DIR', None)
+            else:
+                os.environ['MNE_DISK_CACHE_DIR'] = cache_dir
+            neighbors = _setup_connectivity(connectivity, n_src * n_times,
+                                            n_times)
+            assert_equal(len(neighbors), n_src)
+            assert_array_equal(neighbors[0], [1])
+            assert_array_equal(np.sort(neighbors[5]), [4, 6])
+            assert_array_equal(neighbors[19], [18])
+            assert_array_equal(
+                _get_partitions_from_connectivity(neighbors, n_times),
+                want_parts)
+            assert_equal(len(os.listdir(tempdir)),
+                         0 if cache_dir is None else 2)
+            out = spatio_temporal_cluster_1samp_test(
+                X, connectivity=connectivity, n_permutations=20, seed=0,
+                threshold=1.)
+            if want is None:
+                want = out
+            assert_array_equal(out[0], want[0])
+            assert_array_equal(out[2], want[2])
+    finally:
+        if orig_dir is not None:
+            os.environ['MNE_DISK_CACHE_DIR'] = orig_dir
+        else:
+            os.environ.pop('MNE_DISK_CACHE_DIR', None)
+
+
 def test_cluster_permutation_with_connectivity():
     """Test cluster level permutations with connectivity matrix
     """
@@ -474,6 +686,28 @@ def test_summarize_clusters():
     assert_true(stc_sum.data.shape[1] == 2)
     clu[2][0] = 0.3
     assert_raises(RuntimeError, summarize_clusters_stc, clu)
+    # compare to summing each cluster separately
+    rng = np.random.RandomState(0)
+    n_times, n_vertices = 10, 30
+    T_obs = rng.randn(n_times, n_vertices)
+    T_obs[0, :5] = 0.
+    clusters = [np.nonzero(rng.rand(n_times, n_vertices) < 0.3)
+                for _ in range(20)]
+    clusters[3] = (np.array([], int), np.array([], int))
+    p_values = rng.rand(len(clusters))
+    vertices = [np.arange(20), np.arange(10)]
+    stc_sum = summarize_clusters_stc((T_obs, clusters, p_values, None),
+                                     p_thresh=0.5, tstep=2e-3,
+                                     vertices=vertices)
+    good = np.where(p_values < 0.5)[0]
+    assert_equal(stc_sum.data.shape, (n_vertices, len(good) + 1))
+    for ii, ci in enumerate(good):
+        mask = np.zeros((n_times, n_vertices))
+        mask[clusters[ci]] = np.sign(T_obs[clusters[ci]]) * 2e-3
+        assert_array_almost_equal(stc_sum.data[:, ii + 1],
+                                  1e3 * mask.sum(axis=0))
+    assert_array_almost_equal(stc_sum.data[:, 0],
+                              stc_sum.data[:, 1:].sum(axis=1))
 
 
 run_tests_if_main()
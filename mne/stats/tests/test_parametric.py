@@ -1,6 +1,8 @@
 from itertools import product
+from mne.stats import parametric, spatio_temporal_cluster_test
 from mne.stats.parametric import (f_mway_rm, f_threshold_mway_rm,
-                                  _map_effects)
+                                  f_mway_rm_stat_fun, _map_effects,
+                                  _f_oneway)
 from nose.tools import assert_raises, assert_true
 from numpy.testing import assert_array_almost_equal
 
@@ -109,3 +111,44 @@ def test_f_twoway_rm():
 
     fvals, _ = f_mway_rm(test_data, [8], 'A')
     assert_array_almost_equal(fvals, test_external['r_fvals_1way'], 5)
+
+
+def test_f_mway_rm_chunks():
+    """Test chunked repeated measures ANOVA and its stat_fun"""
+    rng = np.random.RandomState(0)
+    data = rng.randn(10, 6, 300)
+    orig_nbytes = parametric._chunk_nbytes
+    for correction in (False, True):
+        want = f_mway_rm(data, [2, 3], correction=correction)
+        try:
+            parametric._chunk_nbytes = 8 * 10 * 100
+            for n_jobs in (1, 2):
+                got = f_mway_rm(data, [2, 3], correction=correction,
+                                n_jobs=n_jobs)
+                for w, g in zip(want, got):
+                    assert_array_almost_equal(w, g)
+        finally:
+            parametric._chunk_nbytes = orig_nbytes
+    # same F values with the stat_fun, which takes one array per condition
+    for effects in ('A', 'A*B'):
+        stat_fun = f_mway_rm_stat_fun([2, 3], effects)
+        assert_array_almost_equal(
+            stat_fun(*np.swapaxes(data, 0, 1)),
+            f_mway_rm(data, [2, 3], effects, return_pvals=False)[0])
+    # ... and in cluster tests
+    X = [rng.randn(10, 5, 4) for _ in range(4)]
+    stat_fun = f_mway_rm_stat_fun([2, 2], 'A:B')
+    T_obs = spatio_temporal_cluster_test(X, n_permutations=10,
+                                         stat_fun=stat_fun)[0]
+    assert_array_almost_equal(
+        T_obs.ravel(), f_mway_rm(np.swapaxes(X, 0, 1), [2, 2], 'A:B')[0])
+
+    # one-way ANOVA in chunks
+    args = [rng.randn(n, 500) for n in (5, 8, 6)]
+    want = _f_oneway(*args)
+    try:
+        parametric._chunk_nbytes = 8 * 16 * 100
+        for w, g in zip(want, _f_oneway(*args)):
+            assert_array_almost_equal(w, g)
+    finally:
+        parametric._chunk_nbytes = orig_nbytes
@@ -1,8 +1,12 @@
 import numpy as np
 from numpy.testing import assert_array_equal, assert_almost_equal
+from nose.tools import assert_equal, assert_true
 from scipy import stats
 
-from mne.stats.permutations import permutation_t_test
+from mne.stats import permutations
+from mne.stats.permutations import (permutation_t_test, bin_perm_rep,
+                                    _max_stat, _get_n_low)
+from mne.utils import run_tests_if_main
 
 
 def test_permutation_t_test():
@@ -31,3 +35,50 @@ def test_permutation_t_test():
     T_obs_scipy, p_values_scipy = stats.ttest_1samp(X[:, 0], 0)
     assert_almost_equal(T_obs[0], T_obs_scipy, 8)
     assert_almost_equal(p_values[0], p_values_scipy, 2)
+
+
+def test_permutation_t_test_blocks():
+    """Test permutations in blocks of bounded memory
+    """
+    rng = np.random.RandomState(0)
+    X = rng.randn(10, 20)
+    X2 = np.mean(X ** 2, axis=0)
+    dof_scaling = np.sqrt(10 / 9.)
+    # all sign flips, compared to the full table
+    H0_full = np.sort(_max_stat(X, X2, bin_perm_rep(10, a=1, b=-1)[1:],
+                                dof_scaling))
+    orig_nbytes = permutations._perm_block_nbytes
+    try:
+        for nbytes, n_jobs in ((orig_nbytes, 1), (8 * 20 * 16, 1),
+                               (8 * 20 * 16, 2), (1, 1)):
+            permutations._perm_block_nbytes = nbytes
+            H0 = permutation_t_test(X, 'all', n_jobs=n_jobs)[2]
+            assert_almost_equal(H0, H0_full)
+        # random sign flips only depend on the seed and the block size
+        permutations._perm_block_nbytes = 8 * 20 * 100
+        out = permutation_t_test(X, 1000, seed=0)
+        for n_jobs in (1, 2):
+            for o, o2 in zip(out, permutation_t_test(X, 1000, seed=0,
+                                                     n_jobs=n_jobs)):
+                assert_array_equal(o, o2)
+        assert_equal(len(permutation_t_test(X, 999, seed=0)[2]), 999)
+        # with few tests, the table of signs dominates the memory
+        permutations._perm_block_nbytes = orig_nbytes
+        for n_samples, n_tests in ((21, 1), (30, 2), (10, 20), (5, 10 ** 7)):
+            n_low = _get_n_low(n_samples, n_tests)
+            assert_true(0 <= n_low <= n_samples)
+            assert_true(n_low == 0 or
+                        2 ** n_low * (n_tests + n_low) * 8 <= orig_nbytes)
+        assert_equal(_get_n_low(10, 1), 10)
+        X = X[:, :1]
+        H0_full = np.sort(_max_stat(X, X2[:1],
+                                    bin_perm_rep(10, a=1, b=-1)[1:],
+                                    dof_scaling))
+        permutations._perm_block_nbytes = 8 * 2 ** 6
+        assert_equal(_get_n_low(10, 1), 3)
+        assert_almost_equal(permutation_t_test(X, 'all')[2], H0_full)
+    finally:
+        permutations._perm_block_nbytes = orig_nbytes
+
+
+run_tests_if_main()
@@ -17,8 +17,11 @@ from nose.tools import assert_raises, assert_true, assert_equal
 import mne
 from mne import read_source_estimate
 from mne.datasets import testing
-from mne.stats.regression import linear_regression, linear_regression_raw
+from mne.stats import regression
+from mne.stats.regression import (linear_regression, linear_regression_raw,
+                                  _solve_lsqr)
 from mne.io import RawArray
+from mne.utils import _TempDir
 
 data_path = testing.data_path(download=False)
 stc_fname = op.join(data_path, 'MEG', 'sample',
@@ -108,3 +111,54 @@ def test_continuous_regression_with_overlap():
     assert_allclose(effect,
                     linear_regression_raw(raw, events, {1: 1}, tmin=0)[1]
                     .data.flatten())
+
+    # other solvers
+    for solver in ('cholesky', 'lsqr', _solve_lsqr):
+        assert_allclose(effect, linear_regression_raw(
+            raw, events, {1: 1}, tmin=0, solver=solver)[1].data.flatten(),
+            atol=1e-7)
+    assert_raises(ValueError, linear_regression_raw, raw, events, {1: 1},
+                  solver='foo')
+
+    # data read in chunks from disk
+    tempdir = _TempDir()
+    fname = op.join(tempdir, 'test_raw.fif')
+    raw.save(fname)
+    raw = mne.io.Raw(fname, preload=False)
+    orig_duration = regression._raw_chunk_duration
+    regression._raw_chunk_duration = 30.
+    try:
+        for solver in ('pinv', 'cholesky', 'lsqr'):
+            assert_allclose(effect, linear_regression_raw(
+                raw, events, {1: 1}, tmin=0, solver=solver)[1].data.flatten(),
+                atol=1e-7)
+    finally:
+        regression._raw_chunk_duration = orig_duration
+
+    # rejection in chunks that are fully artifactual or shorter than tstep
+    events = events[:4].copy()
+    events[:, 0] //= 10
+    signal = np.zeros(2050)
+    signal[events[:, 0]] = .5
+    signal = np.convolve(signal, effect)[:len(signal)]
+    signal[1000:2000:2] += 5.
+    raw = RawArray(signal[np.newaxis, :], mne.create_info(1, 100, 'eeg'))
+    kwargs = dict(tmin=0, reject=dict(eeg=1.), tstep=1.)
+    evokeds = [linear_regression_raw(raw, events, {1: 1}, solver=solver,
+                                     **kwargs)[1]
+               for solver in ('pinv', 'lsqr')]
+    raw.save(fname, overwrite=True)
+    raw = mne.io.Raw(fname, preload=False)
+    for solver, evoked in zip(('pinv', 'lsqr'), evokeds):
+        assert_allclose(evoked.data, linear_regression_raw(
+            raw, events, {1: 1}, solver=solver, **kwargs)[1].data, atol=1e-7)
+    assert_allclose(evokeds[0].data.flatten(), effect / 2., atol=1e-7)
+    assert_raises(RuntimeError, linear_regression_raw, raw, events, {1: 1},
+                  tmin=0, flat=dict(eeg=10.), tstep=1.)
+
+    # functions are passed a dense predictor matrix
+    def solver(X, Y):
+        assert_true(isinstance(X, np.ndarray))
+        return _solve_lsqr(X, Y)
+    assert_allclose(evokeds[1].data, linear_regression_raw(
+        raw, events, {1: 1}, solver=solver, **kwargs)[1].data, atol=1e-7)
@@ -18,6 +18,7 @@ public_modules = [
     'mne.datasets.sample',
     'mne.datasets.spm_face',
     'mne.decoding',
+    'mne.fft',
     'mne.filter',
     'mne.gui',
     'mne.inverse_sparse',
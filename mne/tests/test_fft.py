@@ -0,0 +1,99 @@
+import pickle
+
+import numpy as np
+from numpy.testing import assert_allclose
+from nose.tools import assert_equal, assert_raises, assert_true
+
+from mne.fft import get_fft_backend, next_fast_len, FFTBackend
+from mne.utils import (requires_scipy_version, requires_pyfftw,
+                       run_tests_if_main)
+
+
+def _check_backend(backend):
+    """Helper to compare a backend against numpy.fft"""
+    rng = np.random.RandomState(0)
+    x = rng.randn(3, 100)
+    assert_allclose(backend.fft(x), np.fft.fft(x), atol=1e-12)
+    assert_allclose(backend.ifft(x), np.fft.ifft(x), atol=1e-12)
+    x_fft = backend.rfft(x, 128)
+    assert_allclose(x_fft, np.fft.rfft(x, 128), atol=1e-12)
+    assert_allclose(backend.irfft(x_fft, 128)[:, :100], x, atol=1e-12)
+    assert_allclose(backend.rfft(x, axis=0), np.fft.rfft(x, axis=0),
+                    atol=1e-12)
+    # make sure the backend can go to parallel workers
+    backend_pickled = pickle.loads(pickle.dumps(backend))
+    assert_equal(backend_pickled.name, backend.name)
+    assert_equal(backend_pickled.n_jobs, backend.n_jobs)
+    assert_allclose(backend_pickled.rfft(x), np.fft.rfft(x), atol=1e-12)
+
+
+def test_next_fast_len():
+    """Test finding fast FFT lengths"""
+    for n in range(1, 1000):
+        n_fast = next_fast_len(n)
+        assert_true(n_fast >= n)
+        rem = n_fast
+        for p in (2, 3, 5):
+            while rem % p == 0:
+                rem //= p
+        assert_equal(rem, 1)
+        # it must be the smallest such number
+        for m in range(n, n_fast):
+            assert_true(next_fast_len(m) == n_fast)
+    assert_equal(next_fast_len(1025), 1080)
+    assert_equal(next_fast_len(2 ** 20), 2 ** 20)
+    assert_raises(ValueError, next_fast_len, 0)
+
+
+def test_fft_backend_numpy():
+    """Test the NumPy FFT backend"""
+    backend = get_fft_backend('numpy', n_jobs=4)
+    assert_true(isinstance(backend, FFTBackend))
+    assert_equal(backend.name, 'numpy')
+    assert_equal(backend.n_jobs, 1)  # always single-threaded
+    assert_true('numpy' in repr(backend))
+    _check_backend(backend)
+    assert_raises(ValueError, get_fft_backend, 'foo')
+    assert_raises(ValueError, get_fft_backend, 'numpy', 'foo')
+
+
+def test_fft_backend_unavailable():
+    """Test falling back to NumPy when a backend cannot be imported"""
+    from mne import fft
+    n_setups = list()
+
+    def _setup_broken(n_jobs):
+        n_setups.append(n_jobs)
+        raise ImportError('No module named broken')
+
+    fft._fft_backends['broken'] = _setup_broken
+    try:
+        for n_jobs in (2, 2, 4):
+            backend = get_fft_backend('broken', n_jobs=n_jobs)
+            assert_equal(backend.name, 'numpy')
+            assert_equal(backend.n_jobs, 1)
+        assert_equal(n_setups, [2])  # the import is only attempted once
+    finally:
+        del fft._fft_backends['broken']
+        fft._fft_unavailable.discard('broken')
+
+
+@requires_scipy_version('1.4')
+def test_fft_backend_scipy():
+    """Test the multi-threaded SciPy FFT backend"""
+    backend = get_fft_backend('scipy', n_jobs=2)
+    assert_equal(backend.name, 'scipy')
+    assert_equal(backend.n_jobs, 2)
+    _check_backend(backend)
+    assert_true(get_fft_backend('scipy', n_jobs=-1).n_jobs >= 1)
+
+
+@requires_pyfftw
+def test_fft_backend_pyfftw():
+    """Test the pyFFTW backend"""
+    backend = get_fft_backend('pyfftw', n_jobs=2)
+    assert_equal(backend.name, 'pyfftw')
+    _check_backend(backend)
+
+
+run_tests_if_main()
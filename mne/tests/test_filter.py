@@ -9,7 +9,7 @@ from scipy.signal import resample as sp_resample
 from mne.filter import (band_pass_filter, high_pass_filter, low_pass_filter,
                         band_stop_filter, resample, _resample_stim_channels,
                         construct_iir_filter, notch_filter, detrend,
-                        _overlap_add_filter, _smart_pad)
+                        _overlap_add_filter, _smart_pad, StreamingFilter)
 
 from mne import set_log_file
 from mne.utils import _TempDir, sum_squared, run_tests_if_main, slow_test
@@ -70,6 +70,131 @@ def test_1d_filter():
                             assert_allclose(x_expected, x_filtered)
 
 
+def _filter_rows_reference(x, h, zero_phase):
+    """Filter each row with direct convolutions and mirrored edges"""
+    from scipy.signal import fftconvolve
+    n_pad = len(h) - 1
+    x_expected = np.empty(x.shape)
+    for ii, xx in enumerate(x.astype(np.float64)):
+        # pad each row like the previous per-channel implementation did
+        x_pad = np.concatenate([2 * xx[0] - xx[n_pad:0:-1], xx,
+                                2 * xx[-1] - xx[-2:-n_pad - 2:-1]])
+        if zero_phase:
+            x_pad = fftconvolve(x_pad, h)[::-1]
+            x_pad = fftconvolve(x_pad, h)[::-1][n_pad:-n_pad]
+        else:
+            x_pad = np.convolve(x_pad, h)[:-n_pad]
+        x_expected[ii] = x_pad[n_pad:-n_pad]
+    return x_expected
+
+
+def test_overlap_add_batched():
+    """Test batched and single precision overlap-add filtering"""
+    rng = np.random.RandomState(0)
+    x = rng.randn(5, 3000)
+    h = rng.randn(101)
+    picks = [0, 2, 3]
+    for zero_phase in (True, False):
+        x_expected = _filter_rows_reference(x, h, zero_phase)
+        # all rows at once, and a subset of them split across jobs
+        x_filtered = _overlap_add_filter(x.copy(), h, zero_phase=zero_phase)
+        assert_allclose(x_filtered, x_expected, rtol=1e-7, atol=1e-10)
+        x_filtered = _overlap_add_filter(x.copy(), h, zero_phase=zero_phase,
+                                         picks=picks, n_jobs=2)
+        assert_allclose(x_filtered[picks], x_expected[picks], rtol=1e-7,
+                        atol=1e-10)
+        assert_array_equal(np.delete(x_filtered, picks, 0),
+                           np.delete(x, picks, 0))
+        # float32 data is not upcast
+        x_32 = _overlap_add_filter(x.astype(np.float32), h,
+                                   zero_phase=zero_phase)
+        assert_equal(x_32.dtype, np.float32)
+        assert_allclose(x_32, x_expected, rtol=1e-3,
+                        atol=1e-4 * np.abs(x_expected).max())
+    x_32 = band_pass_filter(x.astype(np.float32), 1000., 8., 12.,
+                            filter_length=1000)
+    assert_equal(x_32.dtype, np.float32)
+    assert_raises(TypeError, band_pass_filter, x.astype(np.int64), 1000., 8.,
+                  12.)
+
+
+def test_streaming_filter():
+    """Test block-wise causal FIR filtering"""
+    from scipy.signal import lfilter
+    rng = np.random.RandomState(0)
+    x = rng.randn(3, 3000)
+    blocks = np.split(x, [1, 100, 101, 1700], axis=1)
+    for l_freq, h_freq in ((None, 40.), (1., None), (8., 12.), (60., 40.)):
+        filt = StreamingFilter(1000., l_freq, h_freq, filter_length='500ms')
+        assert_equal(filt.delay, (len(filt.b) - 1) / 2.)
+        x_filt = np.concatenate([filt.process(b) for b in blocks], axis=1)
+        assert_equal(x_filt.shape, x.shape)
+        # same as filtering everything with a constant signal before
+        n_pre = len(filt.b)
+        x_pre = np.concatenate([np.repeat(x[:, :1], n_pre, axis=1), x], 1)
+        x_expected = lfilter(filt.b, [1.], x_pre)[:, n_pre:]
+        assert_allclose(x_filt, x_expected, atol=1e-12)
+        # and the state can be reset
+        filt.reset()
+        assert_allclose(filt.process(x), x_expected, atol=1e-12)
+    # the delay is the group delay of the pass-band
+    t = np.arange(3000) / 1000.
+    filt = StreamingFilter(1000., 8., 12., filter_length=1000,
+                           l_trans_bandwidth=2., h_trans_bandwidth=2.,
+                           picks=[1])
+    assert_equal(filt.delay, 499.5)
+    sig = np.sin(2 * np.pi * 10 * t)
+    sig_filt = filt.process(np.array([sig, sig]))
+    assert_array_equal(sig_filt[0], sig)
+    sig_delayed = np.sin(2 * np.pi * 10 * (t - filt.delay / 1000.))
+    assert_allclose(sig_filt[1, 1500:], sig_delayed[1500:], atol=5e-3)
+    assert_equal(filt.process(x[1:].astype(np.float32)).dtype, np.float32)
+    filt = StreamingFilter(1000., 1., 40., filter_length='500ms')
+    filt.process(x)
+    assert_raises(ValueError, filt.process, x[:2])  # channel number changed
+    assert_raises(ValueError, filt.process, x[0])
+    assert_raises(ValueError, StreamingFilter, 1000., None, None)
+    assert_raises(ValueError, StreamingFilter, 1000., None, 600.)
+    assert_raises(ValueError, StreamingFilter, 1000., 1., 40.,
+                  filter_length=None)
+
+
+def test_streaming_filter_iir():
+    """Test block-wise causal IIR filtering"""
+    from scipy.signal import butter, lfilter, lfilter_zi
+    rng = np.random.RandomState(0)
+    x = rng.randn(3, 3000)
+    b, a = butter(4, 40. / 500.)
+    iir_params = dict(b=b, a=a, padlen=0)
+    filt = StreamingFilter(1000., None, 40., method='iir',
+                           iir_params=iir_params)
+    x_filt = np.concatenate([filt.process(bb) for bb in
+                             np.split(x, [1, 100, 1700], axis=1)], axis=1)
+    x_expected = np.array([lfilter(b, a, xx, zi=lfilter_zi(b, a) * xx[0])[0]
+                           for xx in x])
+    assert_allclose(x_filt, x_expected, atol=1e-12)
+    # low-pass group delay at DC
+    assert_allclose(filt.delay, np.sum(np.arange(5) * b) / np.sum(b) -
+                    np.sum(np.arange(5) * a) / np.sum(a), rtol=1e-5)
+    # filter designed from the pass- and stop-band attenuations
+    iir_params = dict(ftype='cheby1', gpass=1, gstop=20)
+    filt = StreamingFilter(1000., None, 40., h_trans_bandwidth=10.,
+                           method='iir', iir_params=iir_params)
+    iir_params = construct_iir_filter(iir_params, 40., 50., 1000., 'low')
+    assert_allclose(filt.b, iir_params['b'])
+    assert_allclose(filt.a, iir_params['a'])
+    iir_params = dict(ftype='cheby1', gpass=1, gstop=20)
+    filt = StreamingFilter(1000., 10., 40., l_trans_bandwidth=5.,
+                           h_trans_bandwidth=5., method='iir',
+                           iir_params=iir_params)
+    iir_params = construct_iir_filter(iir_params, [10., 40.], [5., 45.],
+                                      1000., 'bandpass')
+    assert_allclose(filt.b, iir_params['b'])
+    assert_allclose(filt.a, iir_params['a'])
+    assert_raises(RuntimeError, StreamingFilter, 1000., None, 40.,
+                  method='iir', iir_params=dict(b=[1., 0.], a=[1., -2.]))
+
+
 def test_iir_stability():
     """Test IIR filter stability check
     """
@@ -140,6 +265,39 @@ def test_notch_filters():
         assert_almost_equal(new_power, orig_power, tol)
 
 
+def test_notch_filter_spectrum_fit_multichannel():
+    """Test vectorized and windowed multitaper line-noise removal"""
+    sfreq = 487.0
+    t = np.arange(0, int(20 * sfreq)) / sfreq
+    freqs = np.arange(60, 241, 60)
+    rng = np.random.RandomState(0)
+    a = rng.randn(5, len(t))
+    orig_power = np.sqrt(np.mean(a ** 2))
+    a += np.sum([np.sin(2 * np.pi * f * t + ii)
+                 for ii, f in enumerate(freqs)], axis=0)
+    for lf in (None, freqs):
+        # all channels at once must match one channel at a time
+        b = notch_filter(a, sfreq, lf, method='spectrum_fit')
+        for ii in range(len(a)):
+            b_1 = notch_filter(a[ii], sfreq, lf, method='spectrum_fit')
+            assert_allclose(b[ii], b_1, atol=1e-10)
+        # picks and parallel processing
+        b_2 = notch_filter(a, sfreq, lf, method='spectrum_fit',
+                           picks=[1, 3], n_jobs=2)
+        assert_allclose(b_2[[1, 3]], b[[1, 3]], atol=1e-10)
+        assert_array_equal(b_2[[0, 2, 4]], a[[0, 2, 4]])
+        # sliding windows
+        b_3 = notch_filter(a, sfreq, lf, method='spectrum_fit',
+                           mt_window=4.)
+        assert_almost_equal(np.sqrt(np.mean(b_3 ** 2)), orig_power, 1)
+        b_4 = notch_filter(a, sfreq, lf, method='spectrum_fit',
+                           mt_window=4., picks=[1, 3], n_jobs=2)
+        assert_allclose(b_4[[1, 3]], b_3[[1, 3]], atol=1e-10)
+        assert_array_equal(b_4[[0, 2, 4]], a[[0, 2, 4]])
+    assert_raises(ValueError, notch_filter, a, sfreq, None,
+                  method='spectrum_fit', mt_window=0.)
+
+
 def test_resample():
     """Test resampling"""
     x = np.random.normal(0, 1, (10, 10, 10))
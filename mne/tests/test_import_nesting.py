@@ -1,6 +1,8 @@
 import sys
 from subprocess import Popen, PIPE
 
+from nose.tools import assert_true
+
 from mne.utils import run_tests_if_main, requires_scipy_version
 
 
@@ -45,4 +47,45 @@ def test_module_nesting():
     if proc.returncode:
         raise AssertionError(stdout)
 
+
+budget_script = """
+from __future__ import print_function
+
+import sys
+import time
+import numpy
+import scipy.linalg
+import scipy.sparse
+
+t0 = time.time()
+import mne
+print(time.time() - t0)
+print(' '.join(sorted(sys.modules.keys())))
+"""
+
+
+def test_import_budget():
+    """Test that importing mne is fast and loads the submodules lazily
+    """
+    if sys.version_info < (3, 7):
+        from nose.plugins.skip import SkipTest
+        raise SkipTest('Lazy imports require Python >= 3.7')
+    proc = Popen([sys.executable, '-c', budget_script], stdout=PIPE,
+                 stderr=PIPE)
+    stdout, stderr = proc.communicate()
+    if proc.returncode:
+        raise AssertionError(stderr)
+    duration, modules = stdout.decode().strip().split('\n')
+    modules = modules.split()
+    duration = float(duration)
+    assert_true(duration < 0.5, 'Importing mne took %0.2f s' % duration)
+    mne_modules = [mod for mod in modules if mod.startswith('mne')]
+    assert_true(len(mne_modules) <= 30, 'Importing mne loaded %d modules: '
+                '%s' % (len(mne_modules), mne_modules))
+    for mod in ('mne.io', 'mne.viz', 'mne.stats', 'mne.time_frequency',
+                'mne.preprocessing', 'mne.decoding', 'mne.realtime',
+                'mne.commands', 'matplotlib'):
+        assert_true(mod not in modules, '%s was imported' % mod)
+
+
 run_tests_if_main()
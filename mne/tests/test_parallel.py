@@ -0,0 +1,201 @@
+import os
+
+from nose.tools import assert_equal, assert_true, assert_raises
+from nose.plugins.skip import SkipTest
+from numpy.testing import assert_array_equal
+import numpy as np
+
+from mne.parallel import (parallel_func, pool, get_thread_budget,
+                          set_executor, get_executor, LocalExecutor,
+                          map_subjects)
+from mne.utils import (run_tests_if_main, requires_joblib,
+                       requires_threadpoolctl)
+
+
+def _get_pid(x):
+    """Return the PID of the worker along with the input"""
+    return os.getpid(), x.sum()
+
+
+@requires_joblib
+def test_pool():
+    """Test reusing a pool of workers in parallel_func"""
+    x = np.arange(1e6).reshape(10, -1)
+    with pool(2) as this_pool:
+        assert_true('active' in repr(this_pool))
+        parallel, p_fun, n_jobs = parallel_func(_get_pid, 3)
+        assert_equal(n_jobs, 2)
+        assert_true(parallel is this_pool._parallel)
+        out = parallel(p_fun(xx) for xx in x)
+        assert_array_equal([o[1] for o in out], x.sum(axis=1))
+        pids = set(o[0] for o in out)
+        out = parallel_func(_get_pid, 2)[0](p_fun(xx) for xx in x)
+        assert_equal(set(o[0] for o in out), pids)
+        assert_true(os.getpid() not in pids)
+        # n_jobs=1 still runs serially
+        assert_true(parallel_func(_get_pid, 1)[0] is list)
+        # nested pools
+        with pool(1):
+            assert_true(parallel_func(_get_pid, 2)[0] is not parallel)
+        assert_true(parallel_func(_get_pid, 2)[0] is parallel)
+        assert_raises(RuntimeError, this_pool.__enter__)
+    assert_true('inactive' in repr(this_pool))
+    assert_true(parallel_func(_get_pid, 2)[0] is not parallel)
+
+
+@requires_joblib
+def test_parallel_backends():
+    """Test running parallel_func jobs in threads or processes"""
+    small = np.ones((4, 10))
+    large = np.ones((4, 200000))
+    for backend, x, in_main in (('threads', small, True),
+                                ('processes', large, False),
+                                ('auto', small, False),
+                                ('auto', large, True)):
+        parallel, p_fun, n_jobs = parallel_func(_get_pid, 2, backend=backend)
+        assert_equal(n_jobs, 2)
+        out = parallel(p_fun(xx) for xx in x)
+        assert_array_equal([o[1] for o in out], x.sum(axis=1))
+        assert_equal(all(o[0] == os.getpid() for o in out), in_main)
+    assert_equal(parallel_func(_get_pid, 2, backend='auto')[0](
+        p_fun(xx) for xx in []), [])
+    # threads are used within a pool too
+    with pool(2) as this_pool:
+        parallel = parallel_func(_get_pid, 2, backend='threads')[0]
+        assert_true(parallel is not this_pool._parallel)
+        out = parallel(p_fun(xx) for xx in small)
+        assert_true(all(o[0] == os.getpid() for o in out))
+        out = parallel_func(_get_pid, 2, backend='auto')[0](
+            p_fun(xx) for xx in small)
+        assert_true(all(o[0] != os.getpid() for o in out))
+    assert_raises(ValueError, parallel_func, _get_pid, 2, backend='foo')
+
+
+def _get_n_threads(x):
+    """Return the number of BLAS/OpenMP threads in a job"""
+    from threadpoolctl import threadpool_info
+    return (os.environ['OMP_NUM_THREADS'],
+            [info['num_threads'] for info in threadpool_info()])
+
+
+def _load_openmp():
+    """Load an OpenMP library, whose thread limit is set per thread"""
+    import ctypes
+    import ctypes.util
+    for name in ('gomp', 'iomp5', 'omp'):
+        path = ctypes.util.find_library(name)
+        if path is not None:
+            return ctypes.CDLL(path)
+    raise SkipTest('An OpenMP library is required')
+
+
+@requires_joblib
+@requires_threadpoolctl
+def test_thread_budget():
+    """Test limiting the BLAS/OpenMP threads of parallel jobs"""
+    from threadpoolctl import threadpool_info
+    _load_openmp()
+    assert_true(any(info['user_api'] == 'openmp'
+                    for info in threadpool_info()))
+    orig_budget = os.environ.get('MNE_THREAD_BUDGET')
+    orig_omp = os.environ.get('OMP_NUM_THREADS')
+    orig_info = threadpool_info()
+    os.environ['MNE_THREAD_BUDGET'] = '4'
+    try:
+        assert_equal(get_thread_budget(), 4)
+        for backend in ('threads', 'processes'):
+            parallel, p_fun, _ = parallel_func(_get_n_threads, 2,
+                                               backend=backend)
+            for omp, n_threads in parallel(p_fun(x) for x in range(4)):
+                assert_equal(omp, '2')
+                assert_true(all(n == 2 for n in n_threads))
+        assert_equal(os.environ.get('OMP_NUM_THREADS'), orig_omp)
+        assert_equal(threadpool_info(), orig_info)
+        # more jobs than the budget
+        parallel, p_fun, _ = parallel_func(_get_n_threads, 8,
+                                           backend='threads')
+        assert_true(all(omp == '1' for omp, _ in
+                        parallel(p_fun(x) for x in range(8))))
+        os.environ['MNE_THREAD_BUDGET'] = '0'
+        assert_raises(ValueError, get_thread_budget)
+    finally:
+        if orig_budget is None:
+            del os.environ['MNE_THREAD_BUDGET']
+        else:
+            os.environ['MNE_THREAD_BUDGET'] = orig_budget
+
+
+def _process_subject(subject, scale=1.):
+    """Process a subject, failing for some of them"""
+    if subject.startswith('bad'):
+        raise RuntimeError('Cannot process %s' % subject)
+    return os.getpid(), len(subject) * scale
+
+
+def _process_nested(subject):
+    """Run parallel jobs within a subject's job"""
+    parallel, p_fun, n_jobs = parallel_func(_get_pid, 2)
+    x = np.arange(float(len(subject) * 10)).reshape(len(subject), -1)
+    return n_jobs, [o[1] for o in parallel(p_fun(xx) for xx in x)]
+
+
+def test_executor():
+    """Test submitting parallel jobs to an executor"""
+    x = np.arange(100.).reshape(10, -1)
+    assert_true(get_executor() is None)
+    assert_raises(TypeError, set_executor, 'foo')
+    with LocalExecutor(2) as executor:
+        assert_true('stopped' in repr(executor))
+        assert_true(set_executor(executor) is None)
+        try:
+            assert_true(get_executor() is executor)
+            for backend in ('processes', 'auto'):
+                parallel, p_fun, n_jobs = parallel_func(_get_pid, 2,
+                                                        backend=backend)
+                assert_equal(n_jobs, 2)
+                out = parallel(p_fun(xx) for xx in x)
+                assert_array_equal([o[1] for o in out], x.sum(axis=1))
+                assert_true(all(o[0] != os.getpid() for o in out))
+            assert_true('running' in repr(executor))
+            # threads and single jobs are still run locally
+            parallel, p_fun, _ = parallel_func(_get_pid, 2, backend='threads')
+            out = parallel(p_fun(xx) for xx in x)
+            assert_true(all(o[0] == os.getpid() for o in out))
+            assert_true(parallel_func(_get_pid, 1)[0] is list)
+            # failures are raised
+            future = executor.submit(_process_subject, 'bad')
+            assert_raises(RuntimeError, future.result)
+            assert_true(isinstance(future.exception(), RuntimeError))
+            assert_true(future.done())
+            assert_true(executor.submit(_process_subject, 'a').exception()
+                        is None)
+            # and collected per subject by map_subjects
+            results, failures = map_subjects(
+                _process_subject, ['a', 'bad_1', 'abc', 'bad_2'],
+                kwargs=dict(scale=2.))
+            assert_equal(sorted(results.keys()), ['a', 'abc'])
+            assert_equal([results[s][1] for s in ('a', 'abc')], [2., 6.])
+            assert_true(all(results[s][0] != os.getpid() for s in results))
+            assert_equal(sorted(failures.keys()), ['bad_1', 'bad_2'])
+            assert_true(all(isinstance(f, RuntimeError)
+                            for f in failures.values()))
+            # nested parallel jobs run serially in the workers
+            results, failures = map_subjects(_process_nested, ['a', 'abc'])
+            assert_equal(failures, dict())
+            assert_equal(results['a'], (1, [45.]))
+            assert_equal(results['abc'], (1, [45., 145., 245.]))
+        finally:
+            assert_true(set_executor(None) is executor)
+    assert_true('stopped' in repr(executor))
+    assert_true(get_executor() is None)
+    # without executor, subjects are processed serially or in processes
+    for n_jobs, in_main in ((1, True), (2, False)):
+        results, failures = map_subjects(_process_subject, ['a', 'bad'],
+                                         args=(3.,), n_jobs=n_jobs)
+        assert_equal(results['a'][1], 3.)
+        assert_equal(results['a'][0] == os.getpid(), in_main)
+        assert_equal(list(failures.keys()), ['bad'])
+    assert_raises(ValueError, map_subjects, _process_subject, ['a', 'a'])
+
+
+run_tests_if_main()
@@ -1,4 +1,5 @@
 from __future__ import print_function
+import os
 import os.path as op
 from nose.tools import assert_true, assert_raises
 import warnings
@@ -624,6 +625,44 @@ def test_spatio_temporal_src_connectivity():
     assert_equal(grade_to_tris(5).shape, [40960, 3])
 
 
+def test_connectivity_disk_cache():
+    """Test caching the mesh edges of the connectivity on disk"""
+    tempdir = _TempDir()
+    tris = grade_to_tris(2)
+    src = [dict(use_tris=t - np.min(t), vertno=np.arange(0, np.ptp(t) + 1, 2))
+           for t in np.split(tris, 2)]
+    orig_dir = os.environ.get('MNE_DISK_CACHE_DIR')
+    want = list()
+    try:
+        for cache_dir in (None, tempdir, tempdir):
+            if cache_dir is None:
+                os.environ.pop('MNE_DISK_CACHE_DIR', None)
+            else:
+                os.environ['MNE_DISK_CACHE_DIR'] = cache_dir
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter('always')
+                got = [spatio_temporal_tris_connectivity(tris, 3),
+                       spatio_temporal_src_connectivity(src, 3)]
+            # still warns about the omitted vertices
+            assert_equal(len([ww for ww in w
+                              if 'omitted' in str(ww.message)]), 1)
+            assert_equal(len(os.listdir(tempdir)) > 0, cache_dir is not None)
+            if len(want) == 0:
+                want = got
+            for g, c in zip(got, want):
+                assert_array_equal(g.toarray(), c.toarray())
+    finally:
+        if orig_dir is None:
+            os.environ.pop('MNE_DISK_CACHE_DIR', None)
+        else:
+            os.environ['MNE_DISK_CACHE_DIR'] = orig_dir
+    # masking the spatial edges is the same as masking spatio-temporal ones
+    mask = np.where(np.tile(np.arange(np.max(tris) + 1) % 2 == 0, 3))[0]
+    connectivity = spatio_temporal_tris_connectivity(tris, 3).tocsr()
+    assert_array_equal(want[1].toarray(),
+                       connectivity[mask][:, mask].toarray())
+
+
 @requires_pandas
 def test_to_data_frame():
     """Test stc Pandas exporter"""
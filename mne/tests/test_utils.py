@@ -1,6 +1,7 @@
 from numpy.testing import assert_equal, assert_array_equal
 from nose.tools import assert_true, assert_raises, assert_not_equal
 from copy import deepcopy
+import json
 import os.path as op
 import numpy as np
 from scipy import sparse
@@ -16,7 +17,9 @@ from mne.utils import (set_log_level, set_log_file, _TempDir,
                        ArgvSetter, _memory_usage, check_random_state,
                        _check_mayavi_version, requires_mayavi,
                        set_memmap_min_size, _get_stim_channel, _check_fname,
-                       create_slices, _time_mask, random_permutation)
+                       create_slices, _time_mask, random_permutation,
+                       verbose, set_profile, get_profile, reset_profile,
+                       save_profile)
 from mne.io import show_fiff
 from mne import Evoked
 from mne.externals.six.moves import StringIO
@@ -473,4 +476,92 @@ def test_random_permutation():
     assert_array_equal(python_randperm, matlab_randperm - 1)
 
 
+@verbose
+def _allocate(n, verbose=None):
+    """Allocate an array of n float64"""
+    return np.ones(n)
+
+
+@verbose
+def _allocate_temporary(n, verbose=None):
+    """Allocate and free an array of n float64"""
+    return np.ones(n).sum()
+
+
+class _Allocator(object):
+    """Class with a profiled method"""
+    @verbose
+    def allocate(self, n, verbose=None):
+        """Allocate two arrays of n float64, keeping only one"""
+        _allocate(n)
+        return _allocate(n)
+
+    @verbose
+    def allocate_temporary(self, n, verbose=None):
+        """Allocate and free an array of n float64 in a nested call"""
+        return _allocate_temporary(n)
+
+
+def test_profile():
+    """Test profiling of functions decorated with verbose"""
+    tempdir = _TempDir()
+    reset_profile()
+    _Allocator().allocate(10)
+    assert_equal(get_profile(), [])
+    old_profile = set_profile(True)
+    try:
+        assert_true(old_profile is False)
+        _Allocator().allocate(100000)
+        _allocate(10, verbose=False)
+        assert_true(set_profile(False))
+        _allocate(10)
+    finally:
+        set_profile(old_profile)
+    calls = get_profile()
+    assert_equal([call['name'] for call in calls],
+                 ['_Allocator.allocate', 'mne.tests.test_utils._allocate'])
+    assert_equal([call['name'] for call in calls[0]['children']],
+                 ['mne.tests.test_utils._allocate'] * 2)
+    for call in calls + calls[0]['children']:
+        for key in ('start', 'wall_time', 'cpu_time'):
+            assert_true(call[key] >= 0)
+        assert_true(call['peak_rss_delta'] is None or
+                    call['peak_rss_delta'] >= 0)
+    assert_true(calls[1]['start'] >= calls[0]['start'] +
+                calls[0]['wall_time'])
+    if calls[0]['array_bytes'] is not None:  # tracemalloc available
+        assert_true(7.9e5 < calls[0]['array_bytes'] < 8.5e5)
+        for call in calls[0]['children']:
+            assert_true(7.9e5 < call['array_bytes'] < 8.5e5)
+            assert_true(7.9e5 < call['array_bytes_net'] < 8.5e5)
+    fname = op.join(tempdir, 'profile.json')
+    save_profile(fname)
+    with open(fname, 'r') as fid:
+        assert_equal(json.load(fid)['calls'], calls)
+    save_profile(fname, fmt='chrome')
+    with open(fname, 'r') as fid:
+        events = json.load(fid)['traceEvents']
+    assert_equal(len(events), 4)
+    assert_true(all(event['ph'] == 'X' for event in events))
+    assert_equal(events[0]['dur'], calls[0]['wall_time'] * 1e6)
+    assert_raises(ValueError, save_profile, fname, fmt='foo')
+    reset_profile()
+    assert_equal(get_profile(), [])
+    # temporaries freed before returning count in the peak
+    set_profile(True)
+    try:
+        _Allocator().allocate_temporary(1000000)
+    finally:
+        set_profile(old_profile)
+    calls = get_profile()
+    assert_equal(len(calls), 1)
+    if calls[0]['array_bytes'] is not None:
+        for call in calls + calls[0]['children']:
+            assert_true(call['array_bytes_net'] < 1e5)
+            import tracemalloc
+            if hasattr(tracemalloc, 'reset_peak'):
+                assert_true(7.9e6 < call['array_bytes'] < 8.5e6)
+    reset_profile()
+
+
 run_tests_if_main()
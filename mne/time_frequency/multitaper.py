@@ -5,11 +5,13 @@
 from warnings import warn
 
 import numpy as np
-from scipy import fftpack, linalg
+from scipy import linalg
 import warnings
 
+from ..fft import get_fft_backend, next_fast_len
 from ..parallel import parallel_func
-from ..utils import verbose, sum_squared
+from ..utils import (verbose, sum_squared, logger, _get_disk_cache_fname,
+                     _read_disk_cache, _write_disk_cache)
 
 
 def tridisolve(d, e, b, overwrite_b=True):
@@ -103,6 +105,37 @@ def tridi_inverse_iteration(d, e, w, x0=None, rtol=1e-8):
     return x0
 
 
+# Least recently used DPSS windows, as a dict of the windows and eigenvalues
+# and a list of the keys sorted by last use, limited to a total size in bytes
+_dpss_cache = dict()
+_dpss_cache_keys = list()
+_dpss_cache_nbytes = 2 ** 27
+# Minimum length of the DPSS windows that are also cached on disk (if a cache
+# directory is set with mne.set_disk_cache_dir)
+_dpss_disk_min_len = 10000
+
+
+def _get_cached_dpss(key):
+    """Get DPSS windows and eigenvalues from the LRU cache, None if missing"""
+    if key not in _dpss_cache:
+        return None
+    _dpss_cache_keys.remove(key)
+    _dpss_cache_keys.append(key)
+    return _dpss_cache[key]
+
+
+def _set_cached_dpss(key, dpss, eigvals):
+    """Add DPSS windows and eigenvalues to the LRU cache"""
+    nbytes = dpss.nbytes + eigvals.nbytes
+    if nbytes > _dpss_cache_nbytes:
+        return
+    _dpss_cache[key] = (dpss, eigvals)
+    _dpss_cache_keys.append(key)
+    while sum(sum(a.nbytes for a in _dpss_cache[k])
+              for k in _dpss_cache_keys) > _dpss_cache_nbytes:
+        del _dpss_cache[_dpss_cache_keys.pop(0)]
+
+
 def dpss_windows(N, half_nbw, Kmax, low_bias=True, interp_from=None,
                  interp_kind='linear'):
     """
@@ -146,9 +179,46 @@ def dpss_windows(N, half_nbw, Kmax, low_bias=True, interp_from=None,
     Slepian, D. Prolate spheroidal wave functions, Fourier analysis, and
     uncertainty V: The discrete case. Bell System Technical Journal,
     Volume 57 (1978), 1371430
+
+    The windows of the most recently used parameters are kept in memory, and
+    the long windows are also cached on disk if a cache directory is set
+    (see :func:`mne.set_disk_cache_dir`).
     """
+    N, Kmax = int(N), int(Kmax)
+    if interp_from is not None:
+        interp_from = int(interp_from)
+    key = (N, float(half_nbw), Kmax, interp_from, interp_kind)
+    cache = _get_cached_dpss(key)
+    if cache is None:
+        fname = None
+        if N >= _dpss_disk_min_len:
+            fname = _get_disk_cache_fname('dpss', list(key))
+            cache = _read_disk_cache(fname)
+        if cache is not None:
+            dpss, eigvals = cache['dpss'], cache['eigvals']
+        else:
+            dpss, eigvals = _compute_dpss_windows(*key)
+            _write_disk_cache(fname, dpss=dpss, eigvals=eigvals)
+        _set_cached_dpss(key, dpss, eigvals)
+    else:
+        logger.debug('Using cached DPSS windows')
+        dpss, eigvals = cache
+
+    if low_bias:
+        idx = (eigvals > 0.9)
+        if not idx.any():
+            warnings.warn('Could not properly use low_bias, '
+                          'keeping lowest-bias taper')
+            idx = [np.argmax(eigvals)]
+        dpss, eigvals = dpss[idx], eigvals[idx]
+    assert len(dpss) > 0  # should never happen
+    # the cached arrays must not be modified
+    return dpss.copy(), eigvals.copy()
+
+
+def _compute_dpss_windows(N, half_nbw, Kmax, interp_from, interp_kind):
+    """Compute the DPSS windows and their eigenvalues (see dpss_windows)"""
     from scipy.interpolate import interp1d
-    Kmax = int(Kmax)
     W = float(half_nbw) / N
     nidx = np.arange(N, dtype='d')
 
@@ -230,23 +300,15 @@ def dpss_windows(N, half_nbw, Kmax, low_bias=True, interp_from=None,
 
     # compute autocorr using FFT (same as nitime.utils.autocorr(dpss) * N)
     rxx_size = 2 * N - 1
-    n_fft = 2 ** int(np.ceil(np.log2(rxx_size)))
-    dpss_fft = fftpack.fft(dpss, n_fft)
-    dpss_rxx = np.real(fftpack.ifft(dpss_fft * dpss_fft.conj()))
+    n_fft = next_fast_len(rxx_size)
+    backend = get_fft_backend()
+    dpss_fft = backend.rfft(dpss, n_fft)
+    dpss_rxx = backend.irfft((dpss_fft * dpss_fft.conj()).real, n_fft)
     dpss_rxx = dpss_rxx[:, :N]
 
     r = 4 * W * np.sinc(2 * W * nidx)
     r[0] = 2 * W
     eigvals = np.dot(dpss_rxx, r)
-
-    if low_bias:
-        idx = (eigvals > 0.9)
-        if not idx.any():
-            warnings.warn('Could not properly use low_bias, '
-                          'keeping lowest-bias taper')
-            idx = [np.argmax(eigvals)]
-        dpss, eigvals = dpss[idx], eigvals[idx]
-    assert len(dpss) > 0  # should never happen
     return dpss, eigvals
 
 
@@ -300,63 +362,66 @@ def _psd_from_mt_adaptive(x_mt, eigvals, freq_mask, max_iter=150,
     x_var = np.trapz(psd_est, dx=np.pi / n_freqs) / (2 * np.pi)
     del psd_est
 
-    # allocate space for output
-    psd = np.empty((n_signals, np.sum(freq_mask)))
-
     # only keep the frequencies of interest
     x_mt = x_mt[:, :, freq_mask]
 
-    if return_weights:
-        weights = np.empty((n_signals, n_tapers, psd.shape[1]))
-
-    for i, (xk, var) in enumerate(zip(x_mt, x_var)):
-        # combine the SDFs in the traditional way in order to estimate
-        # the variance of the timeseries
-
-        # The process is to iteratively switch solving for the following
-        # two expressions:
-        # (1) Adaptive Multitaper SDF:
-        # S^{mt}(f) = [ sum |d_k(f)|^2 S_k(f) ]/ sum |d_k(f)|^2
-        #
-        # (2) Weights
-        # d_k(f) = [sqrt(lam_k) S^{mt}(f)] / [lam_k S^{mt}(f) + E{B_k(f)}]
-        #
-        # Where lam_k are the eigenvalues corresponding to the DPSS tapers,
-        # and the expected value of the broadband bias function
-        # E{B_k(f)} is replaced by its full-band integration
-        # (1/2pi) int_{-pi}^{pi} E{B_k(f)} = sig^2(1-lam_k)
-
-        # start with an estimate from incomplete data--the first 2 tapers
-        psd_iter = _psd_from_mt(xk[:2, :], rt_eig[:2, np.newaxis])
-
-        err = np.zeros_like(xk)
-        for n in range(max_iter):
-            d_k = (psd_iter / (eigvals[:, np.newaxis] * psd_iter +
-                   (1 - eigvals[:, np.newaxis]) * var))
-            d_k *= rt_eig[:, np.newaxis]
-            # Test for convergence -- this is overly conservative, since
-            # iteration only stops when all frequencies have converged.
-            # A better approach is to iterate separately for each freq, but
-            # that is a nonvectorized algorithm.
-            # Take the RMS difference in weights from the previous iterate
-            # across frequencies. If the maximum RMS error across freqs is
-            # less than 1e-10, then we're converged
-            err -= d_k
-            if np.max(np.mean(err ** 2, axis=0)) < 1e-10:
+    # allocate space for output
+    psd = np.empty((n_signals, x_mt.shape[2]))
+    weights = np.empty((n_signals, n_tapers, x_mt.shape[2]))
+
+    # The process is to iteratively switch solving for the following
+    # two expressions:
+    # (1) Adaptive Multitaper SDF:
+    # S^{mt}(f) = [ sum |d_k(f)|^2 S_k(f) ]/ sum |d_k(f)|^2
+    #
+    # (2) Weights
+    # d_k(f) = [sqrt(lam_k) S^{mt}(f)] / [lam_k S^{mt}(f) + E{B_k(f)}]
+    #
+    # Where lam_k are the eigenvalues corresponding to the DPSS tapers,
+    # and the expected value of the broadband bias function
+    # E{B_k(f)} is replaced by its full-band integration
+    # (1/2pi) int_{-pi}^{pi} E{B_k(f)} = sig^2(1-lam_k)
+    #
+    # All the signals are iterated at once, the converged ones are removed
+    # from the arrays of the signals still being iterated.
+
+    # start with an estimate from incomplete data--the first 2 tapers
+    psd_iter = _psd_from_mt(x_mt[:, :2, :], rt_eig[:2, np.newaxis])
+    idx = np.arange(n_signals)  # signals still being iterated
+    x_var = x_var[:, np.newaxis, np.newaxis]
+    eigvals = eigvals[:, np.newaxis]
+    err = np.zeros_like(weights)
+    for n in range(max_iter):
+        d_k = (psd_iter[:, np.newaxis, :] /
+               (eigvals * psd_iter[:, np.newaxis, :] + (1 - eigvals) * x_var))
+        d_k *= rt_eig[:, np.newaxis]
+        # Test for convergence -- this is overly conservative, since
+        # iteration only stops when all frequencies have converged.
+        # A better approach is to iterate separately for each freq, but
+        # that is a nonvectorized algorithm.
+        # Take the RMS difference in weights from the previous iterate
+        # across frequencies. If the maximum RMS error across freqs is
+        # less than 1e-10, then we're converged
+        err -= d_k
+        converged = np.max(np.mean(err ** 2, axis=1), axis=1) < 1e-10
+        if converged.any():
+            psd[idx[converged]] = psd_iter[converged]
+            weights[idx[converged]] = d_k[converged]
+            keep = np.logical_not(converged)
+            idx, x_mt, x_var = idx[keep], x_mt[keep], x_var[keep]
+            d_k = d_k[keep]
+            if len(idx) == 0:
                 break
 
-            # update the iterative estimate with this d_k
-            psd_iter = _psd_from_mt(xk, d_k)
-            err = d_k
-
-        if n == max_iter - 1:
-            warn('Iterative multi-taper PSD computation did not converge.',
-                 RuntimeWarning)
+        # update the iterative estimate with this d_k
+        psd_iter = _psd_from_mt(x_mt, d_k)
+        err = d_k
 
-        psd[i, :] = psd_iter
-
-        if return_weights:
-            weights[i, :, :] = d_k
+    if len(idx) > 0:
+        warn('Iterative multi-taper PSD computation did not converge.',
+             RuntimeWarning)
+        psd[idx] = psd_iter
+        weights[idx] = d_k
 
     if return_weights:
         return psd, weights
@@ -439,14 +504,12 @@ def _mt_spectra(x, dpss, sfreq, n_fft=None):
 
     # remove mean (do not use in-place subtraction as it may modify input x)
     x = x - np.mean(x, axis=-1)[:, np.newaxis]
-    x_mt = fftpack.fft(x[:, np.newaxis, :] * dpss, n=n_fft)
-
-    # only keep positive frequencies
-    freqs = fftpack.fftfreq(n_fft, 1. / sfreq)
-    freq_mask = (freqs >= 0)
 
-    x_mt = x_mt[:, :, freq_mask]
-    freqs = freqs[freq_mask]
+    # only keep positive frequencies (excluding Nyquist for even n_fft)
+    n_freqs = (n_fft + 1) // 2
+    freqs = np.arange(n_freqs) * (float(sfreq) / n_fft)
+    x_mt = get_fft_backend().rfft(x[:, np.newaxis, :] * dpss, n_fft)
+    x_mt = x_mt[:, :, :n_freqs]
 
     return x_mt, freqs
 
@@ -538,7 +601,8 @@ def multitaper_psd(x, sfreq=2 * np.pi, fmin=0, fmax=np.inf, bandwidth=None,
         psd = _psd_from_mt(x_mt, weights)
     else:
         parallel, my_psd_from_mt_adaptive, n_jobs = \
-            parallel_func(_psd_from_mt_adaptive, n_jobs)
+            parallel_func(_psd_from_mt_adaptive, n_jobs,
+                          backend='auto')
         out = parallel(my_psd_from_mt_adaptive(x, eigvals, freq_mask)
                        for x in np.array_split(x_mt, n_jobs))
         psd = np.concatenate(out)
@@ -1,7 +1,8 @@
 from math import ceil
 import numpy as np
-from scipy.fftpack import fft, ifft, fftfreq
+from scipy.fftpack import fftfreq
 
+from ..fft import get_fft_backend
 from ..utils import logger, verbose
 
 
@@ -91,13 +92,13 @@ def stft(x, wsize, tstep=None, verbose=None):
     xp[:, (wsize - tstep) // 2: (wsize - tstep) // 2 + T] = x
     x = xp
 
+    backend = get_fft_backend()
     for t in range(n_step):
         # Framing
         wwin = win / swin[t * tstep: t * tstep + wsize]
         frame = x[:, t * tstep: t * tstep + wsize] * wwin[None, :]
-        # FFT
-        fframe = fft(frame)
-        X[:, :, t] = fframe[:, :n_freq]
+        # FFT (real input, so only positive frequencies are computed)
+        X[:, :, t] = backend.rfft(frame)
 
     return X
 
@@ -169,15 +170,13 @@ def istft(X, tstep=None, Tx=None):
         swin[t * tstep:t * tstep + wsize] += win ** 2
     swin = np.sqrt(swin / wsize)
 
-    fframe = np.empty((n_signals, n_win + wsize // 2 - 1), dtype=X.dtype)
+    backend = get_fft_backend()
     for t in range(n_step):
-        # IFFT
-        fframe[:, :n_win] = X[:, :, t]
-        fframe[:, n_win:] = np.conj(X[:, wsize // 2 - 1: 0: -1, t])
-        frame = ifft(fframe)
+        # IFFT (the spectrum is Hermitian, so the frame is real)
+        frame = backend.irfft(X[:, :, t], wsize)
         wwin = win / swin[t * tstep:t * tstep + wsize]
         # Overlap-add
-        x[:, t * tstep: t * tstep + wsize] += np.real(np.conj(frame) * wwin)
+        x[:, t * tstep: t * tstep + wsize] += frame * wwin
 
     # Truncation
     x = x[:, (wsize - tstep) // 2: (wsize - tstep) // 2 + T + 1][:, :Tx].copy()
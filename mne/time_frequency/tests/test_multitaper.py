@@ -1,10 +1,14 @@
+import os
+import warnings
+
 import numpy as np
-from nose.tools import assert_raises
-from numpy.testing import assert_array_almost_equal
+from nose.tools import assert_raises, assert_true, assert_equal
+from numpy.testing import (assert_array_almost_equal, assert_array_equal,
+                           assert_allclose)
 from distutils.version import LooseVersion
 
 from mne.time_frequency import dpss_windows, multitaper_psd
-from mne.utils import requires_nitime
+from mne.utils import requires_nitime, _TempDir
 
 
 @requires_nitime
@@ -31,6 +35,103 @@ def test_dpss_windows():
     assert_array_almost_equal(eigs, eigs_ni)
 
 
+def test_dpss_windows_cache():
+    """ Test caching of DPSS windows """
+    from mne.time_frequency import multitaper
+    tempdir = _TempDir()
+    orig = (multitaper._dpss_cache_nbytes, multitaper._dpss_disk_min_len,
+            os.environ.get('MNE_DISK_CACHE_DIR'))
+    multitaper._dpss_cache.clear()
+    del multitaper._dpss_cache_keys[:]
+    try:
+        # room for sets of 3 windows of 1000 and 2000 samples
+        multitaper._dpss_cache_nbytes = 3 * 3010 * 8
+        multitaper._dpss_disk_min_len = 1500
+        os.environ['MNE_DISK_CACHE_DIR'] = tempdir
+        for N, low_bias in ((1000, False), (1000, True), (999, True),
+                            (1000, False), (2000, False), (2000, True)):
+            for ii in range(2):
+                dpss, eigvals = dpss_windows(N, 2., 3, low_bias=low_bias)
+                want = multitaper._compute_dpss_windows(N, 2., 3, None,
+                                                        'linear')
+                if low_bias:
+                    want = [w[:len(eigvals)] for w in want]
+                assert_array_equal(dpss, want[0])
+                assert_array_equal(eigvals, want[1])
+                dpss *= 0  # the cache must not be modified
+            assert_true(multitaper._dpss_cache_keys[-1][0] == N)
+        assert_equal(len(multitaper._dpss_cache), 2)
+        assert_equal([k[0] for k in multitaper._dpss_cache_keys],
+                     [1000, 2000])
+        # only the long windows are on disk
+        assert_equal(len(os.listdir(tempdir)), 1)
+        multitaper._dpss_cache.clear()
+        del multitaper._dpss_cache_keys[:]
+        assert_array_equal(dpss_windows(2000, 2., 3, low_bias=False)[0],
+                           want[0])
+    finally:
+        multitaper._dpss_cache_nbytes, multitaper._dpss_disk_min_len = \
+            orig[:2]
+        if orig[2] is None:
+            del os.environ['MNE_DISK_CACHE_DIR']
+        else:
+            os.environ['MNE_DISK_CACHE_DIR'] = orig[2]
+        multitaper._dpss_cache.clear()
+        del multitaper._dpss_cache_keys[:]
+
+
+def _psd_from_mt_adaptive_loop(x_mt, eigvals, freq_mask, max_iter):
+    """Compute the adaptive multitaper PSD of each signal separately"""
+    from mne.time_frequency.multitaper import _psd_from_mt
+    rt_eig = np.sqrt(eigvals)
+    psd_est = _psd_from_mt(x_mt, rt_eig[np.newaxis, :, np.newaxis])
+    x_var = np.trapz(psd_est, dx=np.pi / x_mt.shape[2]) / (2 * np.pi)
+    x_mt = x_mt[:, :, freq_mask]
+    psd = np.empty((len(x_mt), x_mt.shape[2]))
+    weights = np.empty(x_mt.shape)
+    for ii, (xk, var) in enumerate(zip(x_mt, x_var)):
+        psd_iter = _psd_from_mt(xk[:2, :], rt_eig[:2, np.newaxis])
+        err = np.zeros_like(xk)
+        for n in range(max_iter):
+            d_k = (psd_iter / (eigvals[:, np.newaxis] * psd_iter +
+                   (1 - eigvals[:, np.newaxis]) * var))
+            d_k *= rt_eig[:, np.newaxis]
+            err -= d_k
+            if np.max(np.mean(err ** 2, axis=0)) < 1e-10:
+                break
+            psd_iter = _psd_from_mt(xk, d_k)
+            err = d_k
+        psd[ii] = psd_iter
+        weights[ii] = d_k
+    return psd, weights
+
+
+def test_psd_from_mt_adaptive():
+    """ Test adaptive weighting of the tapered spectra of many signals """
+    from mne.time_frequency.multitaper import (_psd_from_mt_adaptive,
+                                               _mt_spectra)
+    rng = np.random.RandomState(0)
+    x = rng.randn(20, 500)
+    x[:5] *= np.linspace(0, 10, 500)  # needs more iterations
+    dpss, eigvals = dpss_windows(500, 4, 7)
+    x_mt, freqs = _mt_spectra(x, dpss, 500.)
+    freq_mask = (freqs > 5) & (freqs < 100)
+    for max_iter in (150, 2):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            psd, weights = _psd_from_mt_adaptive(x_mt, eigvals, freq_mask,
+                                                 max_iter, True)
+        assert_equal(len(w), int(max_iter == 2))
+        # the same as iterating over each signal separately
+        psd_1, weights_1 = _psd_from_mt_adaptive_loop(x_mt, eigvals,
+                                                      freq_mask, max_iter)
+        assert_allclose(psd, psd_1, rtol=1e-10)
+        assert_allclose(weights, weights_1, rtol=1e-10)
+    assert_equal(psd.shape, (len(x), freq_mask.sum()))
+    assert_raises(ValueError, _psd_from_mt_adaptive, x_mt[:, :2], eigvals[:2],
+                  freq_mask)
+
+
 @requires_nitime
 def test_multitaper_psd():
     """ Test multi-taper PSD computation """
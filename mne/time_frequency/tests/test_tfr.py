@@ -115,6 +115,88 @@ def test_time_frequency():
     assert_equal(power_pick.data.shape, power_drop.data.shape)
 
 
+def test_cwt_batched():
+    """Test wavelet transforms of blocks of signals with decimation"""
+    from mne.time_frequency import tfr
+    rng = np.random.RandomState(0)
+    sfreq = 200.
+    X = rng.randn(7, 301)
+    Ws = morlet(sfreq, [8., 13., 30.], n_cycles=[2, 3, 4], zero_mean=True)
+    orig_nbytes = tfr._cwt_block_nbytes
+    try:
+        tfr._cwt_block_nbytes = 1  # one signal at a time
+        for this_Ws in (Ws, [W[:-1] for W in Ws]):  # odd and even lengths
+            for mode in ('same', 'valid'):
+                want = tfr.cwt(X, this_Ws, use_fft=False, mode=mode)
+                for decim in (1, 2, 3, 7):
+                    got = tfr.cwt(X, this_Ws, use_fft=True, mode=mode,
+                                  decim=decim)
+                    assert_equal(got.shape, want[..., ::decim].shape)
+                    assert_array_almost_equal(got, want[..., ::decim])
+        assert_array_almost_equal(cwt_morlet(X, sfreq, [8., 13.]),
+                                  cwt_morlet(X, sfreq, [8., 13.],
+                                             use_fft=False))
+    finally:
+        tfr._cwt_block_nbytes = orig_nbytes
+    assert_raises(ValueError, tfr.cwt, X, Ws, mode='full')
+    assert_raises(ValueError, tfr.cwt, X[:, :50], Ws)
+    # epochs and channels are transformed together
+    data = rng.randn(5, 4, 301)
+    power = single_trial_power(data, sfreq, [8., 13.], n_cycles=2, decim=3)
+    power_jobs = single_trial_power(data, sfreq, [8., 13.], n_cycles=2,
+                                    decim=3, n_jobs=2)
+    assert_array_almost_equal(power, power_jobs)
+    psd, plf = tfr._induced_power_cwt(data, sfreq, [8., 13.], n_cycles=2,
+                                      decim=3)
+    assert_array_almost_equal(psd, power.mean(axis=0))
+    for c in range(data.shape[1]):
+        coefs = tfr.cwt(data[:, c], morlet(sfreq, [8., 13.], 2), decim=3)
+        assert_array_almost_equal(
+            plf[c], np.abs(np.mean(coefs / np.abs(coefs), axis=0)))
+    psd_jobs, plf_jobs = tfr._induced_power_cwt(
+        data, sfreq, [8., 13.], n_cycles=2, decim=3, n_jobs=2)
+    assert_array_almost_equal(psd, psd_jobs)
+    assert_array_almost_equal(plf, plf_jobs)
+
+
+def test_tfr_stream():
+    """Test computing the TFR of non-preloaded epochs in batches"""
+    from mne.time_frequency import tfr
+    rng = np.random.RandomState(0)
+    sfreq = 200.
+    info = create_info(['EEG %03d' % ii for ii in range(4)] + ['STI 014'],
+                       sfreq, ['eeg'] * 4 + ['stim'])
+    data = rng.randn(5, 4000)
+    data[-1] = 0.
+    data[-1, np.arange(200, 3700, 300)] = 1
+    data[0, 1000:1010] = 1e3  # a bad epoch
+    raw = mne.io.RawArray(data, info)
+    events = mne.find_events(raw)
+    kwargs = dict(event_id=1, tmin=-0.5, tmax=1., baseline=None,
+                  reject=dict(eeg=100.))
+    epochs = Epochs(raw, events, preload=False, **kwargs)
+    epochs_preload = Epochs(raw, events, preload=True, **kwargs)
+    assert_true(len(epochs_preload) < len(events))
+    freqs = np.array([10., 20., 30.])
+    orig_nbytes = tfr._tfr_epochs_batch_nbytes
+    try:
+        # batches of 3 epochs
+        tfr._tfr_epochs_batch_nbytes = 3 * 8 * 4 * len(epochs.times)
+        for func, kw in ((tfr_morlet, dict(n_cycles=2., use_fft=True)),
+                         (tfr_morlet, dict(n_cycles=2., use_fft=False)),
+                         (tfr_multitaper, dict(n_cycles=3.))):
+            want = func(epochs_preload, freqs, decim=2, **kw)
+            for n_jobs in (1, 2):
+                got = func(epochs, freqs, decim=2, n_jobs=n_jobs, **kw)
+                assert_true(not epochs.preload)
+                for g, w in zip(got, want):
+                    assert_equal(g.nave, w.nave)
+                    assert_array_equal(g.times, w.times)
+                    assert_array_almost_equal(g.data, w.data)
+    finally:
+        tfr._tfr_epochs_batch_nbytes = orig_nbytes
+
+
 def test_dpsswavelet():
     """Test DPSS wavelet"""
     freqs = np.arange(5, 25, 3)
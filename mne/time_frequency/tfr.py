@@ -12,8 +12,8 @@ from math import sqrt
 from copy import deepcopy
 import numpy as np
 from scipy import linalg
-from scipy.fftpack import fftn, ifftn
 
+from ..fft import get_fft_backend, next_fast_len
 from ..fixes import partial
 from ..baseline import rescale
 from ..parallel import parallel_func
@@ -40,6 +40,15 @@ def _get_data(inst, return_itc):
     return data
 
 
+def _is_streamed(inst):
+    """Check if the TFR of an instance is computed a batch of epochs at a time
+
+    This is the case of the Epochs that are not preloaded.
+    """
+    from ..epochs import _BaseEpochs
+    return isinstance(inst, _BaseEpochs) and not inst.preload
+
+
 def morlet(sfreq, freqs, n_cycles=7, sigma=None, zero_mean=False):
     """Compute Wavelets for the given frequency range
 
@@ -127,7 +136,6 @@ def _dpss_wavelet(sfreq, freqs, n_cycles=7, time_bandwidth=4.0,
     Ws : list of array
         Wavelets time series
     """
-    Ws = list()
     if time_bandwidth < 2.0:
         raise ValueError("time_bandwidth should be >= 2.0 for good tapers")
     n_taps = int(np.floor(time_bandwidth - 1))
@@ -137,86 +145,148 @@ def _dpss_wavelet(sfreq, freqs, n_cycles=7, time_bandwidth=4.0,
         raise ValueError("n_cycles should be fixed or defined for "
                          "each frequency.")
 
-    for m in range(n_taps):
-        Wm = list()
-        for k, f in enumerate(freqs):
-            if len(n_cycles) != 1:
-                this_n_cycles = n_cycles[k]
-            else:
-                this_n_cycles = n_cycles[0]
+    # the tapers are computed once per frequency for all orders
+    Ws = [list() for m in range(n_taps)]
+    for k, f in enumerate(freqs):
+        if len(n_cycles) != 1:
+            this_n_cycles = n_cycles[k]
+        else:
+            this_n_cycles = n_cycles[0]
 
-            t_win = this_n_cycles / float(f)
-            t = np.arange(0., t_win, 1.0 / sfreq)
-            # Making sure wavelets are centered before tapering
-            oscillation = np.exp(2.0 * 1j * np.pi * f * (t - t_win / 2.))
+        t_win = this_n_cycles / float(f)
+        t = np.arange(0., t_win, 1.0 / sfreq)
+        # Making sure wavelets are centered before tapering
+        oscillation = np.exp(2.0 * 1j * np.pi * f * (t - t_win / 2.))
 
-            # Get dpss tapers
-            tapers, conc = dpss_windows(t.shape[0], time_bandwidth / 2.,
-                                        n_taps)
+        # Get dpss tapers
+        tapers, conc = dpss_windows(t.shape[0], time_bandwidth / 2.,
+                                    n_taps)
 
+        for m in range(n_taps):
             Wk = oscillation * tapers[m]
             if zero_mean:  # to make it zero mean
                 real_offset = Wk.mean()
                 Wk -= real_offset
             Wk /= sqrt(0.5) * linalg.norm(Wk.ravel())
 
-            Wm.append(Wk)
-
-        Ws.append(Wm)
+            Ws[m].append(Wk)
 
     return Ws
 
 
-def _centered(arr, newsize):
-    """Aux Function to center data"""
-    # Return the center newsize portion of the array.
-    newsize = np.asarray(newsize)
-    currsize = np.array(arr.shape)
-    startind = (currsize - newsize) // 2
-    endind = startind + newsize
-    myslice = [slice(startind[k], endind[k]) for k in range(len(endind))]
-    return arr[tuple(myslice)]
+# Maximum size in bytes of the spectra and coefficients of the signals that
+# are convolved with the wavelets at once
+_cwt_block_nbytes = 2 ** 26
+# Maximum size in bytes of the batches of epochs read from disk to compute
+# the power and ITC of non-preloaded Epochs
+_tfr_epochs_batch_nbytes = 2 ** 26
 
 
-def _cwt_fft(X, Ws, mode="same"):
-    """Compute cwt with fft based convolutions
-    Return a generator over signals.
-    """
-    X = np.asarray(X)
+def _get_wavelet_bank(Ws, n_times, mode='same', decim=1, use_fft=True):
+    """Prepare the convolution of signals with wavelets
 
-    # Precompute wavelets for given frequency range to save time
-    n_signals, n_times = X.shape
-    n_freqs = len(Ws)
+    The FFTs of the wavelets are computed once for all the signals. Their
+    length is a multiple of ``decim``, so that the decimated coefficients
+    are obtained by folding the spectra before the inverse FFT (aliasing in
+    frequency is decimation in time), which makes the inverse FFTs
+    ``decim`` times shorter. The time shift of each wavelet is applied to
+    its FFT as a phase ramp.
 
-    Ws_max_size = max(W.size for W in Ws)
-    size = n_times + Ws_max_size - 1
-    # Always use 2**n-sized FFT
-    fsize = 2 ** int(np.ceil(np.log2(size)))
-
-    # precompute FFTs of Ws
-    fft_Ws = np.empty((n_freqs, fsize), dtype=np.complex128)
-    for i, W in enumerate(Ws):
-        if len(W) > n_times:
-            raise ValueError('Wavelet is too long for such a short signal. '
-                             'Reduce the number of cycles.')
-        fft_Ws[i] = fftn(W, [fsize])
-
-    for k, x in enumerate(X):
-        if mode == "full":
-            tfr = np.zeros((n_freqs, fsize), dtype=np.complex128)
-        elif mode == "same" or mode == "valid":
-            tfr = np.zeros((n_freqs, n_times), dtype=np.complex128)
-
-        fft_x = fftn(x, [fsize])
+    Parameters
+    ----------
+    Ws : list of array
+        Wavelets time series.
+    n_times : int
+        The number of time points of the signals.
+    mode : 'same' | 'valid'
+        Convention for convolution.
+    decim : int
+        Temporal decimation factor.
+    use_fft : bool
+        Use FFT for convolutions. If False, the FFTs are not computed.
+
+    Returns
+    -------
+    bank : dict
+        The parameters of the convolution to pass to ``_cwt_iter``.
+    """
+    if mode not in ('same', 'valid'):
+        raise ValueError('mode must be "same" or "valid", got %s' % mode)
+    decim = int(decim)
+    if decim < 1:
+        raise ValueError('decim must be a positive integer, got %s' % decim)
+    sizes = np.array([len(W) for W in Ws], int)
+    if np.any(sizes > n_times):
+        raise ValueError('Wavelet is too long for such a short signal. '
+                         'Reduce the number of cycles.')
+    n_out = len(range(0, n_times, decim))
+    # first sample of the full convolution in the output, and zero mask of
+    # the output samples outside of the valid part of the convolution
+    if mode == 'same':
+        starts = (sizes - 1) // 2
+        masks = None
+    else:
+        offsets = (sizes - 1) // 2
+        starts = sizes - 1 - offsets
+        times = np.arange(0, n_times, decim)
+        masks = ((times >= offsets[:, np.newaxis]) &
+                 (times < (n_times - sizes + offsets + 1)[:, np.newaxis]))
+    bank = dict(Ws=Ws, n_times=n_times, mode=mode, decim=decim,
+                n_out=n_out, starts=starts, masks=masks, fft_Ws=None)
+    if use_fft:
+        n_fft = decim * next_fast_len(-(-(n_times + sizes.max() - 1) //
+                                        decim))
+        backend = get_fft_backend()
+        fft_Ws = np.empty((len(Ws), n_fft), dtype=np.complex128)
         for i, W in enumerate(Ws):
-            ret = ifftn(fft_x * fft_Ws[i])[:n_times + W.size - 1]
-            if mode == "valid":
-                sz = abs(W.size - n_times) + 1
-                offset = (n_times - sz) / 2
-                tfr[i, offset:(offset + sz)] = _centered(ret, sz)
-            else:
-                tfr[i, :] = _centered(ret, n_times)
-        yield tfr
+            fft_Ws[i] = backend.fft(W, n_fft)
+        if decim > 1:
+            # shift the outputs by less than decim samples so that they
+            # start at a multiple of decim in the folded inverse FFTs
+            shifts = starts % decim
+            fft_Ws *= np.exp(2j * np.pi / n_fft *
+                             np.outer(shifts, np.arange(n_fft)))
+            starts = starts // decim
+        bank.update(fft_Ws=fft_Ws, fft_starts=starts, n_fft=n_fft)
+    return bank
+
+
+def _cwt_iter(X, bank):
+    """Compute the wavelet coefficients of signals, in blocks of signals
+
+    Yields tuples (sl, tfr) with tfr, of shape
+    (n_block_signals, n_frequencies, n_times), the coefficients of X[sl].
+    """
+    X = np.asarray(X)
+    n_signals, n_times = X.shape
+    if n_times != bank['n_times']:
+        raise ValueError('The wavelets were prepared for %d time points, '
+                         'got %d' % (bank['n_times'], n_times))
+    n_freqs, n_out, decim = len(bank['Ws']), bank['n_out'], bank['decim']
+    masks = bank['masks']
+    if bank['fft_Ws'] is None:  # temporal convolutions, signal by signal
+        for k, tfr in enumerate(_cwt_convolve(X, bank['Ws'], bank['mode'])):
+            yield slice(k, k + 1), tfr[np.newaxis, :, ::decim]
+        return
+    fft_Ws, starts, n_fft = bank['fft_Ws'], bank['fft_starts'], bank['n_fft']
+    n_fold = n_fft // decim
+    n_block = max(_cwt_block_nbytes // (16 * (2 * n_fft + n_freqs * n_out)),
+                  1)
+    backend = get_fft_backend()
+    for start in range(0, n_signals, n_block):
+        sl = slice(start, min(start + n_block, n_signals))
+        fft_x = backend.fft(X[sl], n_fft)
+        tfr = np.empty((len(fft_x), n_freqs, n_out), dtype=np.complex128)
+        for i in range(n_freqs):
+            prod = fft_x * fft_Ws[i]
+            if decim > 1:
+                prod = prod.reshape(len(prod), decim, n_fold).sum(axis=1)
+            tfr[:, i] = backend.ifft(prod)[:, starts[i]:starts[i] + n_out]
+        if decim > 1:
+            tfr /= decim
+        if masks is not None:
+            tfr *= masks
+        yield sl, tfr
 
 
 def _cwt_convolve(X, Ws, mode='same'):
@@ -238,7 +308,7 @@ def _cwt_convolve(X, Ws, mode='same'):
                                  'signal. Reduce the number of cycles.')
             if mode == "valid":
                 sz = abs(W.size - n_times) + 1
-                offset = (n_times - sz) / 2
+                offset = (n_times - sz) // 2
                 tfr[i, offset:(offset + sz)] = ret
             else:
                 tfr[i] = ret
@@ -275,24 +345,9 @@ def cwt_morlet(X, sfreq, freqs, use_fft=True, n_cycles=7.0, zero_mean=False):
     --------
     tfr.cwt : Compute time-frequency decomposition with user-provided wavelets
     """
-    mode = 'same'
-    # mode = "valid"
-    n_signals, n_times = X.shape
-    n_frequencies = len(freqs)
-
     # Precompute wavelets for given frequency range to save time
     Ws = morlet(sfreq, freqs, n_cycles=n_cycles, zero_mean=zero_mean)
-
-    if use_fft:
-        coefs = _cwt_fft(X, Ws, mode)
-    else:
-        coefs = _cwt_convolve(X, Ws, mode)
-
-    tfrs = np.empty((n_signals, n_frequencies, n_times), dtype=np.complex)
-    for k, tfr in enumerate(coefs):
-        tfrs[k] = tfr
-
-    return tfrs
+    return cwt(X, Ws, use_fft=use_fft, mode='same')
 
 
 def cwt(X, Ws, use_fft=True, mode='same', decim=1):
@@ -306,7 +361,7 @@ def cwt(X, Ws, use_fft=True, mode='same', decim=1):
         Wavelets time series
     use_fft : bool
         Use FFT for convolutions
-    mode : 'same' | 'valid' | 'full'
+    mode : 'same' | 'valid'
         Convention for convolution
     decim : int
         Temporal decimation factor
@@ -321,46 +376,125 @@ def cwt(X, Ws, use_fft=True, mode='same', decim=1):
     mne.time_frequency.cwt_morlet : Compute time-frequency decomposition
                                     with Morlet wavelets
     """
-    n_signals, n_times = X[:, ::decim].shape
-    n_frequencies = len(Ws)
-
-    if use_fft:
-        coefs = _cwt_fft(X, Ws, mode)
-    else:
-        coefs = _cwt_convolve(X, Ws, mode)
-
-    tfrs = np.empty((n_signals, n_frequencies, n_times), dtype=np.complex)
-    for k, tfr in enumerate(coefs):
-        tfrs[k] = tfr[..., ::decim]
-
+    X = np.asarray(X)
+    bank = _get_wavelet_bank(Ws, X.shape[1], mode, decim, use_fft)
+    tfrs = np.empty((len(X), len(Ws), bank['n_out']), dtype=np.complex128)
+    for sl, tfr in _cwt_iter(X, bank):
+        tfrs[sl] = tfr
     return tfrs
 
 
 def _time_frequency(X, Ws, use_fft, decim):
     """Aux of time_frequency for parallel computing over channels
     """
-    n_epochs, n_times = X.shape
-    n_times = n_times // decim + bool(n_times % decim)
-    n_frequencies = len(Ws)
-    psd = np.zeros((n_frequencies, n_times))  # PSD
-    plf = np.zeros((n_frequencies, n_times), np.complex)  # phase lock
-
-    mode = 'same'
-    if use_fft:
-        tfrs = _cwt_fft(X, Ws, mode)
-    else:
-        tfrs = _cwt_convolve(X, Ws, mode)
-
-    for tfr in tfrs:
-        tfr = tfr[:, ::decim]
-        tfr_abs = np.abs(tfr)
-        psd += tfr_abs ** 2
-        plf += tfr / tfr_abs
+    n_epochs, n_channels, n_times = X.shape
+    bank = _get_wavelet_bank(Ws, n_times, 'same', decim, use_fft)
+    psd, plf = _tfr_sums(X, bank)
     psd /= n_epochs
     plf = np.abs(plf) / n_epochs
     return psd, plf
 
 
+def _tfr_sums(X, bank, psd=None, plf=None):
+    """Sum the power and unit phase vectors of the epochs of each channel
+
+    X is of shape (n_epochs, n_channels, n_times). The epochs of one or more
+    channels are transformed at once. The sums are added in place to psd and
+    plf if they are given.
+    """
+    n_epochs, n_channels, n_times = X.shape
+    n_frequencies, n_out = len(bank['Ws']), bank['n_out']
+    if psd is None:
+        psd = np.zeros((n_channels, n_frequencies, n_out))  # PSD
+        plf = np.zeros((n_channels, n_frequencies, n_out), np.complex128)
+    n_block = max(_cwt_block_nbytes // (16 * 2 * n_epochs *
+                                        bank.get('n_fft', n_times)), 1)
+    for c_start in range(0, n_channels, n_block):
+        x = X[:, c_start:c_start + n_block]
+        # signals sorted by channel
+        x = x.transpose(1, 0, 2).reshape(-1, n_times)
+        for sl, tfr in _cwt_iter(x, bank):
+            # sum the epochs of each channel of the block
+            chs = np.arange(sl.start, sl.stop) // n_epochs
+            bounds = np.concatenate([[0], np.where(np.diff(chs))[0] + 1])
+            chs = c_start + chs[bounds]
+            tfr_abs = tfr.real ** 2
+            tfr_abs += tfr.imag ** 2
+            psd[chs] += np.add.reduceat(tfr_abs, bounds, axis=0)
+            tfr /= np.sqrt(tfr_abs, tfr_abs)
+            plf[chs] += np.add.reduceat(tfr, bounds, axis=0)
+    return psd, plf
+
+
+def _iter_epochs_data(epochs, picks, n_batch):
+    """Iterate over the data of the good epochs, in batches of n_batch"""
+    batch = list()
+    for epoch in epochs:
+        batch.append(epoch[picks])
+        if len(batch) == n_batch:
+            yield np.array(batch)
+            batch = list()
+    if len(batch) > 0:
+        yield np.array(batch)
+
+
+def _induced_power_stream(epochs, picks, Ws, use_fft, decim, n_jobs):
+    """Compute induced power and ITC of Epochs, a batch of epochs at a time
+
+    Only running sums of the power and of the unit phase vectors are kept,
+    so non-preloaded epochs are never all loaded in memory. Ws is a list of
+    sets of wavelets (e.g., one per taper) whose power and ITC are averaged.
+    """
+    n_times = len(epochs.times)
+    banks = [_get_wavelet_bank(this_Ws, n_times, 'same', decim, use_fft)
+             for this_Ws in Ws]
+    n_channels, n_frequencies = len(picks), len(Ws[0])
+    n_out = banks[0]['n_out']
+    psd = np.zeros((n_channels, n_frequencies, n_out))
+    plf = np.zeros((len(Ws), n_channels, n_frequencies, n_out),
+                   np.complex128)
+    parallel, my_tfr_sums, n_jobs = parallel_func(_tfr_sums, n_jobs,
+                                                  backend='auto')
+    slices = _get_parallel_slices(n_channels, n_jobs)
+    n_batch = max(_tfr_epochs_batch_nbytes // (8 * n_channels * n_times), 1)
+    n_epochs = 0
+    for data in _iter_epochs_data(epochs, picks, n_batch):
+        n_epochs += len(data)
+        for bank, this_plf in zip(banks, plf):
+            if n_jobs == 1:
+                _tfr_sums(data, bank, psd, this_plf)
+                continue
+            sums = parallel(my_tfr_sums(data[:, sl], bank) for sl in slices)
+            for sl, (psd_c, plf_c) in zip(slices, sums):
+                psd[sl] += psd_c
+                this_plf[sl] += plf_c
+    if n_epochs == 0:
+        raise RuntimeError('No good epochs to compute the TFR from')
+    logger.info('Computed the TFR of %d epochs in batches of %d'
+                % (n_epochs, n_batch))
+    psd /= len(Ws) * n_epochs
+    itc = np.abs(plf).mean(axis=0) / n_epochs
+    return psd, itc, n_epochs
+
+
+def _single_trial_power(X, Ws, use_fft, decim):
+    """Aux of single_trial_power for parallel computing over epochs"""
+    n_epochs, n_channels, n_times = X.shape
+    bank = _get_wavelet_bank(Ws, n_times, 'same', decim, use_fft)
+    X = X.reshape(n_epochs * n_channels, n_times)
+    power = np.empty((len(X), len(Ws), bank['n_out']))
+    for sl, tfr in _cwt_iter(X, bank):
+        power[sl] = (tfr * tfr.conj()).real
+    return power.reshape(n_epochs, n_channels, len(Ws), bank['n_out'])
+
+
+def _get_parallel_slices(n, n_jobs):
+    """Split range(n) into at most n_jobs contiguous slices"""
+    bounds = np.linspace(0, n, min(n_jobs, n) + 1).astype(int)
+    return [slice(start, stop) for start, stop in zip(bounds[:-1],
+                                                      bounds[1:])]
+
+
 @verbose
 def single_trial_power(data, sfreq, frequencies, use_fft=True, n_cycles=7,
                        baseline=None, baseline_mode='ratio', times=None,
@@ -409,32 +543,26 @@ def single_trial_power(data, sfreq, frequencies, use_fft=True, n_cycles=7,
     power : 4D array
         Power estimate (Epochs x Channels x Frequencies x Timepoints).
     """
-    mode = 'same'
     n_frequencies = len(frequencies)
     n_epochs, n_channels, n_times = data[:, :, ::decim].shape
 
     # Precompute wavelets for given frequency range to save time
     Ws = morlet(sfreq, frequencies, n_cycles=n_cycles, zero_mean=zero_mean)
 
-    parallel, my_cwt, _ = parallel_func(cwt, n_jobs)
+    parallel, my_power, n_jobs = parallel_func(_single_trial_power, n_jobs,
+                                               backend='auto')
 
     logger.info("Computing time-frequency power on single epochs...")
 
     power = np.empty((n_epochs, n_channels, n_frequencies, n_times),
                      dtype=np.float)
 
-    # Package arguments for `cwt` here to minimize omissions where only one of
-    # the two calls below is updated with new function arguments.
-    cwt_kw = dict(Ws=Ws, use_fft=use_fft, mode=mode, decim=decim)
-    if n_jobs == 1:
-        for k, e in enumerate(data):
-            x = cwt(e, **cwt_kw)
-            power[k] = (x * x.conj()).real
-    else:
-        # Precompute tf decompositions in parallel
-        tfrs = parallel(my_cwt(e, **cwt_kw) for e in data)
-        for k, tfr in enumerate(tfrs):
-            power[k] = (tfr * tfr.conj()).real
+    # The epochs are transformed in blocks, in parallel if n_jobs > 1
+    slices = _get_parallel_slices(n_epochs, n_jobs)
+    powers = parallel(my_power(data[sl], Ws, use_fft, decim)
+                      for sl in slices)
+    for sl, this_power in zip(slices, powers):
+        power[sl] = this_power
 
     # Run baseline correction.  Be sure to decimate the times array as well if
     # needed.
@@ -488,11 +616,14 @@ def _induced_power_cwt(data, sfreq, frequencies, use_fft=True, n_cycles=7,
     psd = np.empty((n_channels, n_frequencies, n_times))
     plf = np.empty((n_channels, n_frequencies, n_times))
     # Separate to save memory for n_jobs=1
-    parallel, my_time_frequency, _ = parallel_func(_time_frequency, n_jobs)
-    psd_plf = parallel(my_time_frequency(data[:, c, :], Ws, use_fft, decim)
-                       for c in range(n_channels))
-    for c, (psd_c, plf_c) in enumerate(psd_plf):
-        psd[c, :, :], plf[c, :, :] = psd_c, plf_c
+    parallel, my_time_frequency, n_jobs = parallel_func(_time_frequency,
+                                                        n_jobs,
+                                                        backend='auto')
+    slices = _get_parallel_slices(n_channels, n_jobs)
+    psd_plf = parallel(my_time_frequency(data[:, sl], Ws, use_fft, decim)
+                       for sl in slices)
+    for sl, (psd_c, plf_c) in zip(slices, psd_plf):
+        psd[sl], plf[sl] = psd_c, plf_c
     return psd, plf
 
 
@@ -1097,7 +1228,8 @@ def tfr_morlet(inst, freqs, n_cycles, use_fft=False,
     Parameters
     ----------
     inst : Epochs | Evoked
-        The epochs or evoked object.
+        The epochs or evoked object. Epochs that are not preloaded are read
+        a batch at a time, so that they are never all loaded in memory.
     freqs : ndarray, shape (n_freqs,)
         The frequencies in Hz.
     n_cycles : float | ndarray, shape (n_freqs,)
@@ -1124,17 +1256,22 @@ def tfr_morlet(inst, freqs, n_cycles, use_fft=False,
     --------
     tfr_multitaper, tfr_stockwell
     """
-    data = _get_data(inst, return_itc)
     picks = pick_types(inst.info, meg=True, eeg=True)
     info = pick_info(inst.info, picks)
-    data = data[:, picks, :]
-    power, itc = _induced_power_cwt(data, sfreq=info['sfreq'],
-                                    frequencies=freqs,
-                                    n_cycles=n_cycles, n_jobs=n_jobs,
-                                    use_fft=use_fft, decim=decim,
-                                    zero_mean=True)
+    if _is_streamed(inst):
+        Ws = morlet(info['sfreq'], freqs, n_cycles=n_cycles, zero_mean=True)
+        power, itc, nave = _induced_power_stream(inst, picks, [Ws], use_fft,
+                                                 decim, n_jobs)
+    else:
+        data = _get_data(inst, return_itc)
+        data = data[:, picks, :]
+        power, itc = _induced_power_cwt(data, sfreq=info['sfreq'],
+                                        frequencies=freqs,
+                                        n_cycles=n_cycles, n_jobs=n_jobs,
+                                        use_fft=use_fft, decim=decim,
+                                        zero_mean=True)
+        nave = len(data)
     times = inst.times[::decim].copy()
-    nave = len(data)
     out = AverageTFR(info, power, times, freqs, nave, method='morlet-power')
     if return_itc:
         out = (out, AverageTFR(info, itc, times, freqs, nave,
@@ -1201,15 +1338,17 @@ def _induced_power_mtm(data, sfreq, frequencies, time_bandwidth=4.0,
                       "Consider reducing n_cycles.")
     psd = np.zeros((n_channels, n_frequencies, n_times))
     itc = np.zeros((n_channels, n_frequencies, n_times))
-    parallel, my_time_frequency, _ = parallel_func(_time_frequency,
-                                                   n_jobs)
+    parallel, my_time_frequency, n_jobs = parallel_func(_time_frequency,
+                                                        n_jobs,
+                                                        backend='auto')
+    slices = _get_parallel_slices(n_channels, n_jobs)
     for m in range(n_taps):
-        psd_itc = parallel(my_time_frequency(data[:, c, :],
-                                             Ws[m], use_fft, decim)
-                           for c in range(n_channels))
-        for c, (psd_c, itc_c) in enumerate(psd_itc):
-            psd[c, :, :] += psd_c
-            itc[c, :, :] += itc_c
+        psd_itc = parallel(my_time_frequency(data[:, sl], Ws[m], use_fft,
+                                             decim)
+                           for sl in slices)
+        for sl, (psd_c, itc_c) in zip(slices, psd_itc):
+            psd[sl] += psd_c
+            itc[sl] += itc_c
     psd /= n_taps
     itc /= n_taps
     return psd, itc
@@ -1222,7 +1361,8 @@ def tfr_multitaper(inst, freqs, n_cycles, time_bandwidth=4.0, use_fft=True,
     Parameters
     ----------
     inst : Epochs | Evoked
-        The epochs or evoked object.
+        The epochs or evoked object. Epochs that are not preloaded are read
+        a batch at a time, so that they are never all loaded in memory.
     freqs : ndarray, shape (n_freqs,)
         The frequencies in Hz.
     n_cycles : float | ndarray, shape (n_freqs,)
@@ -1266,18 +1406,24 @@ def tfr_multitaper(inst, freqs, n_cycles, time_bandwidth=4.0, use_fft=True,
     .. versionadded:: 0.9.0
     """
 
-    data = _get_data(inst, return_itc)
     picks = pick_types(inst.info, meg=True, eeg=True)
     info = pick_info(inst.info, picks)
-    data = data[:, picks, :]
-    power, itc = _induced_power_mtm(data, sfreq=info['sfreq'],
-                                    frequencies=freqs, n_cycles=n_cycles,
-                                    time_bandwidth=time_bandwidth,
-                                    use_fft=use_fft, decim=decim,
-                                    n_jobs=n_jobs, zero_mean=True,
-                                    verbose='INFO')
+    if _is_streamed(inst):
+        Ws = _dpss_wavelet(info['sfreq'], freqs, n_cycles=n_cycles,
+                           time_bandwidth=time_bandwidth, zero_mean=True)
+        power, itc, nave = _induced_power_stream(inst, picks, Ws, use_fft,
+                                                 decim, n_jobs)
+    else:
+        data = _get_data(inst, return_itc)
+        data = data[:, picks, :]
+        power, itc = _induced_power_mtm(data, sfreq=info['sfreq'],
+                                        frequencies=freqs, n_cycles=n_cycles,
+                                        time_bandwidth=time_bandwidth,
+                                        use_fft=use_fft, decim=decim,
+                                        n_jobs=n_jobs, zero_mean=True,
+                                        verbose='INFO')
+        nave = len(data)
     times = inst.times[::decim].copy()
-    nave = len(data)
     out = AverageTFR(info, power, times, freqs, nave,
                      method='mutlitaper-power')
     if return_itc:
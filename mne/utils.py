@@ -18,6 +18,7 @@ from string import Formatter
 import subprocess
 import sys
 import tempfile
+import threading
 import shutil
 from shutil import rmtree
 from math import log, ceil
@@ -402,6 +403,79 @@ def trait_wraith(*args, **kwargs):
     return lambda x: x
 
 
+def _lazy_import(namespace, attrs, submodules):
+    """Import the attributes and submodules of a package when accessed
+
+    Parameters
+    ----------
+    namespace : dict
+        The globals() of the package.
+    attrs : list of tuple
+        The (submodule, names) of the attributes to import, where submodule
+        is a relative dotted name. A name can be a tuple (name, name in the
+        submodule) to alias it.
+    submodules : list of str
+        The submodules that are attributes of the package. Any other
+        submodule is also imported when accessed.
+
+    Returns
+    -------
+    getattr : callable
+        The ``__getattr__`` function of the package (see PEP 562).
+    dir : callable
+        The ``__dir__`` function of the package.
+    all : list of str
+        The names exported by the package.
+
+    Notes
+    -----
+    Python < 3.7 does not support module ``__getattr__`` functions, so
+    everything is imported by this function, in the order of attrs and then
+    submodules.
+    """
+    package = namespace['__name__']
+    path = op.dirname(namespace['__file__'])
+    sources = dict()
+    for module, names in attrs:
+        for name in names:
+            name, source = (name, name) if isinstance(name, string_types) \
+                else name
+            sources[name] = (module, source)
+    all_names = sorted(set(name for name in namespace
+                           if not name.startswith('_')) |
+                       set(sources) | set(submodules))
+
+    def _import_submodule(name):
+        __import__('%s.%s' % (package, name))
+        return sys.modules['%s.%s' % (package, name)]
+
+    def getattr_(name):
+        if name in sources:
+            module, source = sources[name]
+            value = getattr(_import_submodule(module), source)
+            namespace[name] = value
+            return value
+        # any submodule
+        fname = op.join(path, name)
+        if not name.startswith('__') and (op.isfile(fname + '.py') or
+                                          op.isfile(op.join(fname,
+                                                            '__init__.py'))):
+            return _import_submodule(name)
+        raise AttributeError('module %s has no attribute %s'
+                             % (package, name))
+
+    def dir_():
+        return sorted(set(namespace) | set(all_names))
+
+    if sys.version_info < (3, 7):  # no module __getattr__ (PEP 562)
+        for module, names in attrs:
+            for name in names:
+                getattr_(name if isinstance(name, string_types) else name[0])
+        for name in submodules:
+            _import_submodule(name)
+    return getattr_, dir_, all_names
+
+
 ###############################################################################
 # DECORATORS
 
@@ -534,10 +608,10 @@ def verbose(function, *args, **kwargs):
         old_level = set_log_level(verbose_level, True)
         # set it back if we get an exception
         try:
-            return function(*args, **kwargs)
+            return _call_profiled(function, arg_names, args, kwargs)
         finally:
             set_log_level(old_level)
-    return function(*args, **kwargs)
+    return _call_profiled(function, arg_names, args, kwargs)
 
 
 @nottest
@@ -694,6 +768,12 @@ requires_nitime = partial(requires_module, name='nitime',
 requires_traits = partial(requires_module, name='traits',
                           call='import traits')
 requires_h5py = partial(requires_module, name='h5py', call='import h5py')
+requires_joblib = partial(requires_module, name='joblib',
+                          call='import joblib')
+requires_threadpoolctl = partial(requires_module, name='threadpoolctl',
+                                 call='import threadpoolctl')
+requires_pyfftw = partial(requires_module, name='pyFFTW',
+                          call='import pyfftw')
 
 
 def _check_mayavi_version(min_version='4.3.0'):
@@ -896,6 +976,218 @@ def set_log_file(fname=None, output_format='%(message)s', overwrite=None):
     logger.addHandler(lh)
 
 
+###############################################################################
+# PROFILING
+
+# Profiling state: whether it is enabled, the start time, the calls
+# recorded at the top level, and whether we started tracemalloc
+_profile = dict(enabled=False, t0=time.time(), calls=list(),
+                tracemalloc=False)
+_profile_local = threading.local()  # stack of the calls of each thread
+
+
+def set_profile(profile=None):
+    """Enable or disable profiling of the functions decorated with verbose
+
+    When enabled, the calls of the functions and methods of MNE decorated
+    with :func:`verbose` (most of the public ones) are recorded as a call
+    tree with, for each call:
+
+        * ``name``: the name of the function or method.
+        * ``start``: the start time in seconds since the profile was reset.
+        * ``wall_time``: the wall-clock time in seconds.
+        * ``cpu_time``: the CPU time in seconds of the process (all threads).
+        * ``peak_rss_delta``: the increase of the peak resident set size of
+          the process in bytes, i.e., how much more memory the process
+          needed at most during the call (None if not available, e.g., on
+          Windows).
+        * ``array_bytes``: the peak number of bytes allocated by the call
+          (including NumPy arrays), i.e., the largest increase of the traced
+          memory during the call, which includes temporaries freed before
+          it returns (None with Python 2, which does not have
+          ``tracemalloc``). Before Python 3.9, the peak cannot be reset
+          and this is the same as ``array_bytes_net``.
+        * ``array_bytes_net``: the net number of bytes allocated by the call
+          and still in use when it returns, e.g., the size of the arrays it
+          returns or stores (None with Python 2).
+        * ``children``: the calls made during this call.
+
+    Parameters
+    ----------
+    profile : bool | None
+        If True, enable profiling. If False, disable it. If None, the config
+        variable MNE_PROFILE is read (profiling is enabled if it is "true").
+
+    Returns
+    -------
+    old_profile : bool
+        Whether profiling was enabled.
+
+    See Also
+    --------
+    get_profile, reset_profile, save_profile
+
+    Notes
+    -----
+    Tracing memory allocations slows down Python code, so profiling should
+    only be enabled to find which steps of a pipeline are slow.
+
+    .. versionadded:: 0.10
+    """
+    if profile is None:
+        profile = get_config('MNE_PROFILE', 'false').lower() == 'true'
+    profile = bool(profile)
+    old_profile = _profile['enabled']
+    try:
+        import tracemalloc
+    except ImportError:
+        tracemalloc = None
+    if tracemalloc is not None:
+        if profile and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _profile['tracemalloc'] = True
+        elif not profile and _profile['tracemalloc']:
+            tracemalloc.stop()
+            _profile['tracemalloc'] = False
+    _profile['enabled'] = profile
+    return old_profile
+
+
+def reset_profile():
+    """Discard the calls recorded by the profiler
+
+    .. versionadded:: 0.10
+    """
+    _profile['t0'] = time.time()
+    _profile['calls'] = list()
+
+
+def get_profile():
+    """Get the calls recorded by the profiler
+
+    Returns
+    -------
+    calls : list of dict
+        The top-level calls, see :func:`set_profile` for the content of
+        each call.
+
+    .. versionadded:: 0.10
+    """
+    return _profile['calls']
+
+
+def save_profile(fname, fmt='json'):
+    """Save the calls recorded by the profiler
+
+    Parameters
+    ----------
+    fname : str
+        The output file name.
+    fmt : str
+        The format, can be "json" to save the call tree returned by
+        :func:`get_profile`, or "chrome" to save it in the Trace Event
+        Format, which can be displayed by Chrome (chrome://tracing) or
+        https://ui.perfetto.dev.
+
+    .. versionadded:: 0.10
+    """
+    if fmt == 'json':
+        out = dict(calls=_profile['calls'])
+    elif fmt == 'chrome':
+        out = dict(traceEvents=list(), displayTimeUnit='ms')
+        calls = list(_profile['calls'])
+        while len(calls) > 0:
+            call = calls.pop(0)
+            out['traceEvents'].append(dict(
+                name=call['name'], ph='X', pid=os.getpid(),
+                tid=call['thread'], ts=call['start'] * 1e6,
+                dur=call['wall_time'] * 1e6,
+                args=dict((key, call[key]) for key in
+                          ('cpu_time', 'peak_rss_delta', 'array_bytes',
+                           'array_bytes_net'))))
+            calls.extend(call['children'])
+    else:
+        raise ValueError('fmt must be "json" or "chrome", got %s' % (fmt,))
+    with open(fname, 'w') as fid:
+        json.dump(out, fid)
+
+
+def _get_peak_rss():
+    """Get the peak resident set size of the process in bytes"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on OSX
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _get_traced_memory(reset_peak=False):
+    """Get the current and peak memory allocated according to tracemalloc
+
+    If reset_peak is True, the peak is reset to the current memory after
+    being read (if supported, i.e., with Python 3.9+).
+    """
+    try:
+        import tracemalloc
+    except ImportError:
+        return None, None
+    current, peak = tracemalloc.get_traced_memory()
+    if not hasattr(tracemalloc, 'reset_peak'):
+        peak = None  # peak since tracing started, not since the call
+    elif reset_peak:
+        tracemalloc.reset_peak()
+    return current, peak
+
+
+def _call_profiled(function, arg_names, args, kwargs):
+    """Call a function, recording it if profiling is enabled"""
+    if not _profile['enabled']:
+        return function(*args, **kwargs)
+    name = function.__name__
+    if len(arg_names) > 0 and arg_names[0] == 'self':
+        name = '%s.%s' % (type(args[0]).__name__, name)
+    else:
+        name = '%s.%s' % (function.__module__, name)
+    call = dict(name=name, thread=threading.current_thread().ident,
+                children=list())
+    stack = getattr(_profile_local, 'stack', None)
+    if stack is None:
+        stack = _profile_local.stack = list()
+        _profile_local.peaks = list()
+    peaks = _profile_local.peaks  # running traced peak of each call
+    (stack[-1]['children'] if len(stack) > 0 else
+     _profile['calls']).append(call)
+    # the traced peak is global, so keep the one reached so far by the
+    # parent before resetting it for this call
+    traced, peak = _get_traced_memory(reset_peak=True)
+    if len(peaks) > 0 and peak is not None:
+        peaks[-1] = max(peaks[-1], peak)
+    stack.append(call)
+    peaks.append(traced)
+    peak_rss = _get_peak_rss()
+    t0, cpu_t0 = time.time(), sum(os.times()[:2])
+    try:
+        return function(*args, **kwargs)
+    finally:
+        call['wall_time'] = time.time() - t0
+        call['cpu_time'] = sum(os.times()[:2]) - cpu_t0
+        call['start'] = t0 - _profile['t0']
+        call['peak_rss_delta'] = (None if peak_rss is None else
+                                  _get_peak_rss() - peak_rss)
+        current, peak = _get_traced_memory()
+        stack.pop()
+        # include the peaks of the children, which reset the traced one
+        call_peak = peaks.pop()
+        peak = current if peak is None else max(peak, call_peak)
+        if len(peaks) > 0 and peak is not None:
+            peaks[-1] = max(peaks[-1], peak)
+        call['array_bytes'] = None if traced is None else peak - traced
+        call['array_bytes_net'] = (None if traced is None else
+                                   current - traced)
+
+
 ###############################################################################
 # CONFIG / PREFS
 
@@ -1015,6 +1307,81 @@ def set_memmap_min_size(memmap_min_size):
     set_config('MNE_MEMMAP_MIN_SIZE', memmap_min_size)
 
 
+def set_disk_cache_dir(cache_dir):
+    """Set the directory used to cache intermediate results on disk
+
+    Some intermediate results that are costly to compute and only depend on
+    their inputs, e.g., the connectivity of a source space, are stored in
+    this directory so that they can be reused across sessions. The files are
+    named after a hash of the inputs, so the directory can be safely shared
+    and emptied at any time.
+
+    Parameters
+    ----------
+    cache_dir : str | None
+        Directory to use for the cache. None disables the cache.
+
+    Notes
+    -----
+    .. versionadded:: 0.10
+    """
+    if cache_dir is not None and not op.isdir(cache_dir):
+        raise IOError('Directory %s does not exist' % cache_dir)
+
+    set_config('MNE_DISK_CACHE_DIR', cache_dir)
+
+
+def _get_disk_cache_fname(kind, key):
+    """Get the name of the file caching a result, None if caching is off
+
+    ``key`` is anything that :func:`object_hash` accepts and must contain
+    all the inputs the result depends on.
+    """
+    cache_dir = get_config('MNE_DISK_CACHE_DIR', None)
+    if cache_dir is None:
+        return None
+    return op.join(cache_dir, '%s-%032x.npz' % (kind, object_hash(key)))
+
+
+def _read_disk_cache(fname):
+    """Read the arrays of a cache file, None if there is none"""
+    if fname is None or not op.isfile(fname):
+        return None
+    try:
+        npz = np.load(fname)
+        try:
+            arrays = dict((key, npz[key]) for key in npz.files)
+        finally:
+            npz.close()
+    except Exception as exp:
+        logger.warning('Could not read cache file %s (%s), ignoring it'
+                       % (fname, exp))
+        return None
+    logger.debug('Read cache file %s' % fname)
+    return arrays
+
+
+def _write_disk_cache(fname, **arrays):
+    """Write arrays to a cache file (no-op if fname is None)"""
+    if fname is None:
+        return
+    # write to a temporary file first so that concurrent readers never see
+    # a partially written file
+    tmp_fname = '%s.%d.tmp' % (fname, os.getpid())
+    try:
+        with open(tmp_fname, 'wb') as fid:
+            np.savez(fid, **arrays)
+        if op.isfile(fname):  # os.rename does not overwrite on Windows
+            os.remove(fname)
+        os.rename(tmp_fname, fname)
+    except (IOError, OSError) as exp:
+        logger.warning('Could not write cache file %s (%s)' % (fname, exp))
+        if op.isfile(tmp_fname):
+            os.remove(tmp_fname)
+    else:
+        logger.debug('Wrote cache file %s' % fname)
+
+
 # List the known configuration values
 known_config_types = [
     'MNE_BROWSE_RAW_SIZE',
@@ -1026,13 +1393,18 @@ known_config_types = [
     'MNE_DATASETS_SPM_FACE_PATH',
     'MNE_DATASETS_EEGBCI_PATH',
     'MNE_DATASETS_TESTING_PATH',
+    'MNE_FFT_BACKEND',
+    'MNE_FFT_N_JOBS',
     'MNE_LOGGING_LEVEL',
     'MNE_USE_CUDA',
     'SUBJECTS_DIR',
     'MNE_CACHE_DIR',
+    'MNE_DISK_CACHE_DIR',
     'MNE_MEMMAP_MIN_SIZE',
+    'MNE_PROFILE',
     'MNE_SKIP_TESTING_DATASET_TESTS',
-    'MNE_DATASETS_SPM_FACE_DATASETS_TESTS'
+    'MNE_DATASETS_SPM_FACE_DATASETS_TESTS',
+    'MNE_THREAD_BUDGET',
 ]
 
 # These allow for partial matches, e.g. 'MNE_STIM_CHANNEL_1' is okay key